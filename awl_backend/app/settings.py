@@ -105,6 +105,24 @@ DATABASES = {
         "PORT": env("POSTGRES_PORT"),
     }
 }
+# second connection to the same database, used to commit progress of long running jobs (e.g. schedule import)
+# outside of their transaction, so it is visible before the job is finished
+DATABASES["progress"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": env.str("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env.str("CACHE_LOCATION", "awl-schedule"),
+        "OPTIONS": {
+            # entries over the limit are culled (1 / CULL_FREQUENCY of them at once)
+            "MAX_ENTRIES": env.int("CACHE_MAX_ENTRIES", 1000),
+            "CULL_FREQUENCY": env.int("CACHE_CULL_FREQUENCY", 3),
+        },
+    }
+}
 
 # AUTH
 AUTH_USER_MODEL = "users.User"
@@ -177,3 +195,40 @@ USE_TZ = False
 STATIC_URL = "static/"
 
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
+
+# SCHEDULE IMPORT
+
+# "walk" (column by column) or "components" (whole day block labelled at once)
+SCHEDULE_MODULE_DETECTION_ENGINE = env.str("SCHEDULE_MODULE_DETECTION_ENGINE", "walk")
+
+# "openpyxl" (whole workbook loaded) or "streaming" (worksheet and styles xml streamed straight into snapshot)
+SCHEDULE_EXCEL_READER = env.str("SCHEDULE_EXCEL_READER", "openpyxl")
+
+# days of the month are parsed in a process pool when more than one worker is set
+SCHEDULE_PARSE_WORKERS = env.int("SCHEDULE_PARSE_WORKERS", 1)
+
+# parsed files are cached on disk (keyed by file content), disabled when directory is not set,
+# directory should be private to the app (it is created with 0700 mode), never a shared one like /tmp
+SCHEDULE_PARSE_CACHE_DIR = env.str("SCHEDULE_PARSE_CACHE_DIR", "")
+SCHEDULE_PARSE_CACHE_MAX_SIZE = env.int("SCHEDULE_PARSE_CACHE_MAX_SIZE", 100 * 1024 * 1024)
+
+# imported schedule blocks (with their groups, rooms and lecturers) are saved in batches of this size
+SCHEDULE_IMPORT_BATCH_SIZE = env.int("SCHEDULE_IMPORT_BATCH_SIZE", 500)
+
+# database alias used to report progress of schedule imports (committed right away, outside of the import transaction)
+SCHEDULE_PROGRESS_DATABASE = env.str("SCHEDULE_PROGRESS_DATABASE", "progress")
+# how long (in seconds) import worker waits before checking the queue again when there are no jobs
+SCHEDULE_IMPORT_WORKER_SLEEP = env.int("SCHEDULE_IMPORT_WORKER_SLEEP", 5)
+# running import jobs started earlier (in seconds) are failed, their worker is assumed dead (killed, OOM, deploy),
+# should be longer than the longest import
+SCHEDULE_IMPORT_JOB_TIMEOUT = env.int("SCHEDULE_IMPORT_JOB_TIMEOUT", 2 * 60 * 60)
+
+# SCHEDULE API
+
+# /api/schedule/ is paginated only when `cursor` or `page_size` is given, page size is capped by the max size
+SCHEDULE_PAGE_SIZE = env.int("SCHEDULE_PAGE_SIZE", 500)
+SCHEDULE_MAX_PAGE_SIZE = env.int("SCHEDULE_MAX_PAGE_SIZE", 2000)
+
+# responses of /api/schedule/ are cached (per version of published data) for this many seconds, 0 disables the cache
+SCHEDULE_RESPONSE_CACHE_ALIAS = env.str("SCHEDULE_RESPONSE_CACHE_ALIAS", "default")
+SCHEDULE_RESPONSE_CACHE_TIMEOUT = env.int("SCHEDULE_RESPONSE_CACHE_TIMEOUT", 24 * 60 * 60)
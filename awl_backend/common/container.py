@@ -5,7 +5,7 @@ from dependencies import Injector
 from courses.services import CourseService
 from lecturers.services import LecturerService
 from rooms.services import RoomService
-from schedule.services import ScheduleBlockService, ExcelScheduleService, ScheduleService
+from schedule.services import ScheduleBlockService, ExcelScheduleService, ScheduleService, ScheduleImportJobService
 from users.services import UserService, GroupService
 
 
@@ -36,6 +36,7 @@ class Container(Injector):
     schedule_service = cast(ScheduleService, ScheduleService)
     schedule_block_service = cast(ScheduleBlockService, ScheduleBlockService)
     excel_schedule_service = cast(ExcelScheduleService, ExcelScheduleService)
+    schedule_import_job_service = cast(ScheduleImportJobService, ScheduleImportJobService)
 
 
 def container() -> Type[Container]:
@@ -74,4 +74,8 @@ class ModelDifferenceMixin(models.Model):
 
     @property
     def _dict(self):
-        return model_to_dict(self, fields=[field.name for field in self._meta.fields])
+        # fields deferred by `only()` are not tracked, reading them would query database for every object
+        deferred_fields = self.get_deferred_fields()
+        return model_to_dict(
+            self, fields=[field.name for field in self._meta.fields if field.attname not in deferred_fields]
+        )
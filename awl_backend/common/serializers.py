@@ -0,0 +1,48 @@
+from typing import Any, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from rest_framework import serializers
+
+FIELDS_QUERY_PARAM = "fields"
+EXCLUDE_QUERY_PARAM = "exclude"
+SPARSE_FIELDS_QUERY_PARAMS = (FIELDS_QUERY_PARAM, EXCLUDE_QUERY_PARAM)
+
+
+def get_requested_fields(query_params: QueryDict, available: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Fields of the response given by `fields` and `exclude` query params (comma separated or repeated),
+    in the order of available fields. All fields are returned when none of the params is given.
+    """
+    requested = {}
+    for param in SPARSE_FIELDS_QUERY_PARAMS:
+        values = {field.strip() for value in query_params.getlist(param) for field in value.split(",")} - {""}
+        if unknown := values - set(available):
+            raise ValidationError({param: f"Nieznane pola: {', '.join(sorted(unknown))}"})
+        requested[param] = values
+
+    fields = tuple(
+        field for field in available
+        if (not requested[FIELDS_QUERY_PARAM] or field in requested[FIELDS_QUERY_PARAM])
+        and field not in requested[EXCLUDE_QUERY_PARAM]
+    )
+    if not fields:
+        raise ValidationError({FIELDS_QUERY_PARAM: "Nie wybrano żadnego pola"})
+    return fields
+
+
+class SparseFieldsQuerySerializer(serializers.Serializer):
+    """Query of sparse fieldsets (used only for the schema, views read it with `get_requested_fields`)"""
+
+    fields = serializers.CharField(required=False, help_text="Zwracane pola, oddzielone przecinkami")
+    exclude = serializers.CharField(required=False, help_text="Pomijane pola, oddzielone przecinkami")
+
+
+class SparseFieldsSerializerMixin:
+    """Serializer giving only fields passed in `fields` argument (all fields when it is not given)"""
+
+    def __init__(self, *args: Any, fields: Optional[Sequence[str]] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field in set(self.fields) - set(fields):
+                self.fields.pop(field)
@@ -1,4 +1,6 @@
-from typing import Any
+import json
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Type
 
 from django.contrib.admin.models import LogEntry, ACTION_FLAG_CHOICES
 from django.contrib.admin.options import get_content_type_for_model
@@ -7,10 +9,31 @@ from users.models import User
 
 
 DICT_ACTION_FLAG_CHOICES = dict(ACTION_FLAG_CHOICES)
+LOG_ENTRIES_BATCH_SIZE = 1000
+
+# buffer used by `django_log_action` while `BulkLogActions` context is open
+active_bulk_log: ContextVar[Optional["BulkLogActions"]] = ContextVar("active_bulk_log", default=None)
+
+
+def build_log_entry(user: User, content_type_id: int, obj: Any, action_flag: int, change_message: Any) -> LogEntry:
+    """Not saved log entry, with the same values as `LogEntry.objects.log_action` saves"""
+    change_message = change_message or DICT_ACTION_FLAG_CHOICES.get(action_flag, "")
+    if isinstance(change_message, list):
+        change_message = json.dumps(change_message)
+    return LogEntry(
+        user_id=user.pk,
+        content_type_id=content_type_id,
+        object_id=str(obj.pk),
+        object_repr=obj.__str__()[:200],
+        action_flag=action_flag,
+        change_message=change_message,
+    )
 
 
 def django_log_action(user: User, obj: Any, action_flag: int, change_message: Any = "") -> LogEntry:
     """Small util so we can save logs for objects that can be read in django admin history page."""
+    if bulk_log := active_bulk_log.get():
+        return bulk_log.log_action(user=user, obj=obj, action_flag=action_flag, change_message=change_message)
     return LogEntry.objects.log_action(
         user_id=user.pk,
         content_type_id=get_content_type_for_model(obj).pk,
@@ -19,3 +42,53 @@ def django_log_action(user: User, obj: Any, action_flag: int, change_message: An
         action_flag=action_flag,
         change_message=change_message or DICT_ACTION_FLAG_CHOICES.get(action_flag, ""),
     )
+
+
+class BulkLogActions:
+    """
+    Buffers admin log entries and saves them with one `bulk_create` per batch (and when context is closed).
+    While it is open, every `django_log_action` call is buffered too, so existing code can opt in just by
+    wrapping it:
+
+        with BulkLogActions():
+            ...
+            django_log_action(user=user, obj=obj, action_flag=ADDITION)
+
+    Nested contexts use the outermost buffer. Entries are not saved when context is closed with an exception.
+    """
+
+    def __init__(self, batch_size: int = LOG_ENTRIES_BATCH_SIZE) -> None:
+        self.batch_size = batch_size
+        self.entries: List[LogEntry] = []
+        self.content_type_ids: Dict[Type, int] = {}
+        self.token = None
+
+    def __enter__(self) -> "BulkLogActions":
+        if active_bulk_log.get() is None:
+            self.token = active_bulk_log.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, *args: Any) -> None:
+        if self.token is not None:
+            active_bulk_log.reset(self.token)
+            self.token = None
+        if exc_type is None:
+            self.flush()
+
+    def get_content_type_id(self, obj: Any) -> int:
+        if type(obj) not in self.content_type_ids:
+            self.content_type_ids[type(obj)] = get_content_type_for_model(obj).pk
+        return self.content_type_ids[type(obj)]
+
+    def log_action(self, user: User, obj: Any, action_flag: int, change_message: Any = "") -> LogEntry:
+        """Same as `django_log_action`, but entry is saved later (it has no id until then)"""
+        entry = build_log_entry(user, self.get_content_type_id(obj), obj, action_flag, change_message)
+        self.entries.append(entry)
+        if len(self.entries) >= self.batch_size:
+            self.flush()
+        return entry
+
+    def flush(self) -> None:
+        if self.entries:
+            LogEntry.objects.bulk_create(self.entries)
+            self.entries = []
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from courses.models import Course, LecturerCourseThrough, GroupCourseThrough
+from schedule.response_cache import BumpDataVersionAdminMixin
 
 
 class GroupCourseThroughInline(admin.TabularInline):
@@ -15,7 +16,7 @@ class LecturerCourseThroughInline(admin.TabularInline):
 
 # Register your models here.
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     list_display = ("name",)
     inlines = (GroupCourseThroughInline, LecturerCourseThroughInline)
     search_fields = ("name",)
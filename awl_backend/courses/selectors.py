@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
 from django.shortcuts import render
 
 from courses.models import Course
@@ -14,7 +14,9 @@ class CourseSelector:
 
     @classmethod
     def publicated(cls) -> QuerySet[Course]:
-        return cls.all().filter(is_public=True)
+        # courses added by the schedule are visible while the schedule is published
+        published = Course.objects.filter(schedules__publication__isnull=False).values("id")
+        return cls.all().filter(Q(is_public=True) | Q(id__in=published))
 
     @staticmethod
     def get_by_id(pk: UUID) -> Course:
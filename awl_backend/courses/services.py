@@ -10,6 +10,7 @@ from common.validators import validate_user_permission
 from courses.models import Course, GroupCourseThrough, LecturerCourseThrough
 from courses.selectors import CourseSelector
 from lecturers.selectors import LecturerSelector
+from schedule.response_cache import bump_data_version, SCHEDULE_DATA
 from users.models import User, Group
 from users.selectors import GroupSelector
 
@@ -51,6 +52,7 @@ class CourseService:
         course.delete()
 
         django_log_action(user=user, obj=course, action_flag=DELETION)
+        bump_data_version(SCHEDULE_DATA)
         return None
 
     @staticmethod
@@ -1,11 +1,12 @@
 from django.contrib import admin
 
 from lecturers.models import Lecturer
+from schedule.response_cache import BumpDataVersionAdminMixin, SCHEDULE_DATA, LECTURERS_DATA
 
 
 # Register your models here.
 @admin.register(Lecturer)
-class LecturerAdmin(admin.ModelAdmin):
+class LecturerAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     list_display = (
         "last_name",
         "_first_name",
@@ -13,6 +14,7 @@ class LecturerAdmin(admin.ModelAdmin):
         "job_position",
     )
     search_fields = ("first_name", "last_name", "contact_email")
+    data_versions = (SCHEDULE_DATA, LECTURERS_DATA)
 
     def _first_name(self, obj: Lecturer) -> str:
         return obj.first_name or "-"
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
 
 from lecturers.models import Lecturer
 
@@ -13,7 +13,9 @@ class LecturerSelector:
 
     @classmethod
     def publicated(cls) -> QuerySet[Lecturer]:
-        return cls.all().filter(is_public=True)
+        # lecturers added by the schedule are visible while the schedule is published
+        published = Lecturer.objects.filter(schedules__publication__isnull=False).values("id")
+        return cls.all().filter(Q(is_public=True) | Q(id__in=published))
 
     @staticmethod
     def get_by_id(pk: UUID) -> Lecturer:
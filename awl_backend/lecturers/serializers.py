@@ -1,10 +1,11 @@
 from rest_framework import serializers
 
+from common.serializers import SparseFieldsSerializerMixin
 from lecturers.models import Lecturer
 
 
 # Create your views here.
-class LecturerSerializer(serializers.ModelSerializer):
+class LecturerSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Lecturer
         fields = (
@@ -9,6 +9,7 @@ from common.utils import django_log_action
 from common.validators import validate_user_permission
 from lecturers.models import Lecturer
 from lecturers.selectors import LecturerSelector
+from schedule.response_cache import bump_data_version, SCHEDULE_DATA, LECTURERS_DATA
 from users.models import User
 
 
@@ -37,6 +38,7 @@ class LecturerService:
         lecturer.save()
 
         django_log_action(user=user, obj=lecturer, action_flag=ADDITION)
+        bump_data_version(LECTURERS_DATA)
         return lecturer
 
     @staticmethod
@@ -57,6 +59,7 @@ class LecturerService:
             if changed:
                 change_message = [{"changed": {"fields": changed}}]
                 django_log_action(user=user, obj=lecturer, action_flag=CHANGE, change_message=change_message)
+        bump_data_version(SCHEDULE_DATA, LECTURERS_DATA)
         return lecturer
 
     @staticmethod
@@ -67,4 +70,5 @@ class LecturerService:
         lecturer.delete()
 
         django_log_action(user=user, obj=lecturer, action_flag=DELETION)
+        bump_data_version(SCHEDULE_DATA, LECTURERS_DATA)
         return None
@@ -1,8 +1,12 @@
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from common.container import container
 from lecturers.models import Lecturer
 from lecturers.serializers import LecturerSerializer
+from users.models import User
 
 
 class TestLecturerListViewGet(TestCase):
@@ -29,3 +33,34 @@ class TestLecturerListViewGet(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertIn(LecturerSerializer(lecturer1).data, response.data)
         self.assertNotIn(LecturerSerializer(lecturer2).data, response.data)
+
+    def test_not_modified_is_returned_until_lecturers_are_changed(self):
+        user = User.objects.create_superuser("test_user", "test@test.django.com")
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, 200)
+
+        not_modified = self.client.get(self.endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        lecturer = container().lecturer_service.create_lecturer(user, first_name="Lecturer", last_name="1")
+        container().lecturer_service.update_lecturer(user, lecturer.id, is_public=True)
+        changed = self.client.get(self.endpoint, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.data, [LecturerSerializer(lecturer).data])
+
+    def test_only_requested_fields_are_read_and_returned(self):
+        lecturer = Lecturer.objects.create(first_name="Lecturer", last_name="1", contact_email="a@b.pl", is_public=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.endpoint + "?fields=id,last_name")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{"id": str(lecturer.id), "last_name": "1"}])
+        self.assertNotIn("contact_email", queries.captured_queries[-1]["sql"])
+
+        response = self.client.get(self.endpoint + "?exclude=contact_email&exclude=title")
+        self.assertEqual(response.data, [{"id": str(lecturer.id), "first_name": "Lecturer", "last_name": "1"}])
+
+    def test_unknown_fields_are_rejected(self):
+        for query in ("?fields=id,job_position", "?exclude=password", "?fields=id&exclude=id"):
+            response = self.client.get(self.endpoint + query)
+            self.assertEqual(response.status_code, 400, query)
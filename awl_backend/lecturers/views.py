@@ -1,6 +1,7 @@
 from typing import Union, Type
 from uuid import UUID
 
+from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
@@ -8,8 +9,10 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from common.container import container
+from common.serializers import get_requested_fields, SparseFieldsQuerySerializer
 from lecturers.selectors import LecturerSelector
 from lecturers.serializers import LecturerSerializer, LecturerDetailSerializer
+from schedule.response_cache import conditional_on_data_version, LECTURERS_DATA
 
 
 class LecturerListView(GenericAPIView):
@@ -22,10 +25,13 @@ class LecturerListView(GenericAPIView):
             return self.create_serializer_class
         return self.serializer_class
 
+    @extend_schema(parameters=[SparseFieldsQuerySerializer])
+    @conditional_on_data_version(LECTURERS_DATA)
     def get(self, request: Request) -> Response:
-        """Returns list of lecturers"""
-        result = LecturerSelector.publicated().order_by("last_name")
-        return Response(self.get_serializer(result, many=True).data, status=status.HTTP_200_OK)
+        """Returns list of lecturers (only `fields` / `exclude` requested fields are read and returned)"""
+        fields = get_requested_fields(request.query_params, self.serializer_class.Meta.fields)
+        result = LecturerSelector.publicated().only(*fields).order_by("last_name")
+        return Response(self.get_serializer(result, many=True, fields=fields).data, status=status.HTTP_200_OK)
 
     def post(self, request: Request) -> Response:
         """Updates single lecturer details"""
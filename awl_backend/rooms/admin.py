@@ -1,10 +1,12 @@
 from django.contrib import admin
 
 from rooms.models import Room
+from schedule.response_cache import BumpDataVersionAdminMixin, SCHEDULE_DATA, ROOMS_DATA
 
 
 # Register your models here.
 @admin.register(Room)
-class RoomAdmin(admin.ModelAdmin):
+class RoomAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     list_display = ("name",)
     search_fields = ("name",)
+    data_versions = (SCHEDULE_DATA, ROOMS_DATA)
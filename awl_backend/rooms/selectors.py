@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
 
 from rooms.models import Room
 
@@ -13,7 +13,9 @@ class RoomSelector:
 
     @classmethod
     def publicated(cls) -> QuerySet[Room]:
-        return cls.all().filter(is_public=True)
+        # rooms added by the schedule are visible while the schedule is published
+        published = Room.objects.filter(schedules__publication__isnull=False).values("id")
+        return cls.all().filter(Q(is_public=True) | Q(id__in=published))
 
     @staticmethod
     def get_by_id(pk: UUID) -> Room:
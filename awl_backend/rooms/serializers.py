@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
+from common.serializers import SparseFieldsSerializerMixin
 from rooms.models import Room
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = (
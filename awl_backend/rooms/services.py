@@ -8,6 +8,7 @@ from common.utils import django_log_action
 from common.validators import validate_user_permission
 from rooms.models import Room
 from rooms.selectors import RoomSelector
+from schedule.response_cache import bump_data_version, SCHEDULE_DATA, ROOMS_DATA
 from users.models import User
 
 
@@ -23,6 +24,7 @@ class RoomService:
         room.save()
 
         django_log_action(user=user, obj=room, action_flag=ADDITION)
+        bump_data_version(ROOMS_DATA)
         return room
 
     @staticmethod
@@ -33,4 +35,5 @@ class RoomService:
         room.delete()
 
         django_log_action(user=user, obj=room, action_flag=DELETION)
+        bump_data_version(SCHEDULE_DATA, ROOMS_DATA)
         return None
@@ -29,3 +29,10 @@ class TestRoomListViewGet(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertIn(RoomSerializer(room1).data, response.data)
         self.assertNotIn(RoomSerializer(room2).data, response.data)
+
+    def test_excluded_fields_are_not_returned(self):
+        room = Room.objects.create(name="Room1", is_public=True)
+
+        response = self.client.get(self.endpoint + "?exclude=name")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{"id": str(room.id)}])
@@ -1,5 +1,6 @@
 from uuid import UUID
 
+from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
@@ -7,8 +8,10 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from common.container import container
+from common.serializers import get_requested_fields, SparseFieldsQuerySerializer
 from rooms.selectors import RoomSelector
 from rooms.serializers import RoomSerializer
+from schedule.response_cache import conditional_on_data_version, ROOMS_DATA
 
 
 # Create your views here.
@@ -16,10 +19,13 @@ class RoomListView(GenericAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    @extend_schema(parameters=[SparseFieldsQuerySerializer])
+    @conditional_on_data_version(ROOMS_DATA)
     def get(self, request: Request) -> Response:
-        """Returns all rooms"""
-        groups = RoomSelector.publicated().order_by("name")
-        return Response(self.get_serializer(groups, many=True).data, status=status.HTTP_200_OK)
+        """Returns all rooms (only `fields` / `exclude` requested fields are read and returned)"""
+        fields = get_requested_fields(request.query_params, self.serializer_class.Meta.fields)
+        groups = RoomSelector.publicated().only(*fields).order_by("name")
+        return Response(self.get_serializer(groups, many=True, fields=fields).data, status=status.HTTP_200_OK)
 
     def post(self, request: Request) -> Response:
         """Creates new room"""
@@ -1,4 +1,4 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Sequence
 from uuid import UUID
 
 from django import forms
@@ -8,7 +8,8 @@ from django.urls import reverse, URLPattern, path
 from django.utils.html import format_html
 
 from common.container import container
-from schedule.models import Schedule, ScheduleBlock, LecturerScheduleBlockThrough
+from schedule.models import Schedule, ScheduleBlock, LecturerScheduleBlockThrough, ScheduleImportJob
+from schedule.response_cache import BumpDataVersionAdminMixin, PUBLISHED_DATA
 
 
 class ScheduleAdminForm(forms.ModelForm):
@@ -30,14 +31,33 @@ class ScheduleAdminForm(forms.ModelForm):
         }
         exclude = ()
 
+    def clean(self) -> Dict[str, Any]:
+        cleaned_data = super().clean()
+        if not {"file", "worksheet_name", "year", "month"} & set(self.changed_data):
+            return cleaned_data
+
+        file = cleaned_data.get("file")
+        worksheet_name = cleaned_data.get("worksheet_name")
+        year, month = cleaned_data.get("year"), cleaned_data.get("month")
+        if file and worksheet_name and year and month:
+            # sprawdzamy tylko arkusz z pliku (bez wczytywania całego skoroszytu)
+            file.open("rb")
+            try:
+                container().excel_schedule_service.validate_excel_file(file, worksheet_name, year, month)
+            finally:
+                file.seek(0)
+        return cleaned_data
+
 
 # Register your models here.
 @admin.register(Schedule)
-class ScheduleAdmin(admin.ModelAdmin):
+class ScheduleAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     form = ScheduleAdminForm
     list_display = ("name", "status", "progress", "created_at")
     list_filter = ("status",)
     search_fields = ("name",)
+    # entities of the schedule are public while it is published
+    data_versions = PUBLISHED_DATA
     filter_horizontal = (
         "replaced_schedule_blocks",
         "schedule_blocks",
@@ -80,9 +100,12 @@ class ScheduleAdmin(admin.ModelAdmin):
     ) -> HttpResponse:
         schedule: Schedule = self.get_object(request, schedule_id)  # type: ignore
         if schedule:
+            # import is run in background by `manage.py run_schedule_import_worker`
             try:
-                container().schedule_service.update_schedule_from_excel(schedule)
-                self.message_user(request, f"Pobrano plan z pliku {schedule.file}!", level=messages.INFO)
+                container().schedule_import_job_service.enqueue_schedule_import(schedule)
+                self.message_user(
+                    request, f"Dodano pobieranie planu z pliku {schedule.file} do kolejki!", level=messages.INFO
+                )
             except Exception as ex:
                 self.message_user(request, f"Błąd! [{ex}]", level=messages.ERROR)
         return HttpResponseRedirect(
@@ -145,13 +168,19 @@ class LecturerScheduleBlockThroughInline(admin.TabularInline):
 
 
 @admin.register(ScheduleBlock)
-class ScheduleBlockAdmin(admin.ModelAdmin):
+class ScheduleBlockAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     list_display = ("course_name", "type", "start", "end", "get_groups", "get_lecturers", "is_public", "created_at")
     list_filter = ("groups", "lecturers", "rooms")
     search_fields = ("course_name", "groups__name", "lecturers__first_name", "lecturers__last_name", "rooms__name")
     filter_horizontal = ("groups", "rooms")
     inlines = (LecturerScheduleBlockThroughInline,)
 
+    def get_readonly_fields(self, request: HttpRequest, obj: Optional[ScheduleBlock] = None) -> Sequence[str]:
+        # visibility of imported blocks is decided by publication of their schedule
+        if obj and obj.revision_id:
+            return (*super().get_readonly_fields(request, obj), "is_public")
+        return super().get_readonly_fields(request, obj)
+
     def get_groups(self, obj: ScheduleBlock) -> str:
         return ", ".join(obj.groups.values_list("name", flat=True))
 
@@ -161,3 +190,11 @@ class ScheduleBlockAdmin(admin.ModelAdmin):
         return ", ".join([f"{lecturer}" for lecturer in obj.lecturers.all()])
 
     get_lecturers.short_description = "lecturers"
+
+
+@admin.register(ScheduleImportJob)
+class ScheduleImportJobAdmin(admin.ModelAdmin):
+    list_display = ("schedule", "status", "worker", "created_at", "started_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("schedule__name",)
+    readonly_fields = ("schedule", "status", "worker", "error", "started_at", "finished_at")
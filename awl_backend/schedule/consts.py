@@ -29,3 +29,28 @@ MODULE_TYPES_TUPLE = [
     ("-L", "laboratorium"),
     ("-F", "fakultet"),
 ]
+
+# sposób wykrywania modułów w arkuszu (patrz ExcelScheduleService.get_schedule_for_single_day)
+MODULE_DETECTION_ENGINE_WALK = "walk"
+MODULE_DETECTION_ENGINE_COMPONENTS = "components"
+MODULE_DETECTION_ENGINES = (MODULE_DETECTION_ENGINE_WALK, MODULE_DETECTION_ENGINE_COMPONENTS)
+
+# sposób odczytu arkusza (patrz ExcelScheduleService.init_excel_worksheet)
+EXCEL_READER_OPENPYXL = "openpyxl"
+EXCEL_READER_STREAMING = "streaming"
+EXCEL_READERS = (EXCEL_READER_OPENPYXL, EXCEL_READER_STREAMING)
+
+# wersja parsera, zapisana w kluczu cache sparsowanych plików (do zmiany przy każdej zmianie wyniku parsowania)
+SCHEDULE_PARSER_VERSION = 1
+
+# statusy zadań importu planu z pliku (kolejka obsługiwana przez `manage.py run_schedule_import_worker`)
+IMPORT_JOB_QUEUED = "QUEUED"
+IMPORT_JOB_RUNNING = "RUNNING"
+IMPORT_JOB_FINISHED = "FINISHED"
+IMPORT_JOB_FAILED = "FAILED"
+IMPORT_JOB_STATUSES = (
+    (IMPORT_JOB_QUEUED, "W kolejce"),
+    (IMPORT_JOB_RUNNING, "W trakcie"),
+    (IMPORT_JOB_FINISHED, "Zakończony"),
+    (IMPORT_JOB_FAILED, "Błąd"),
+)
@@ -0,0 +1,134 @@
+"""
+Disk cache of parsed schedule files.
+Results are keyed by file content hash (so the same file uploaded again is a hit), worksheet, month and parser
+version. They are stored as compressed pickles signed with HMAC of the secret key (entries not written by the app
+are never unpickled) in a directory private to the app, oldest used entries are removed when cache grows over its size.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from django.utils.crypto import salted_hmac
+from openpyxl.utils import get_column_letter
+
+from schedule.excel_parallel import detach_day
+
+log = logging.getLogger("schedule")
+
+CACHE_FILE_SUFFIX = ".cache"
+CACHE_DIRECTORY_MODE = 0o700
+CACHE_SIGNATURE_SALT = "schedule.excel_cache.ParseCache"
+CACHE_SIGNATURE_SIZE = hashlib.sha256().digest_size
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class CachedCell(NamedTuple):
+    """Coordinates of the cell read from the cache (worksheet is not loaded on cache hit)"""
+
+    row: int
+    column: int
+
+    @property
+    def column_letter(self) -> str:
+        return get_column_letter(self.column)
+
+    @property
+    def coordinate(self) -> str:
+        return f"{self.column_letter}{self.row}"
+
+
+def get_file_hash(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def dump_schedule_days(schedule_days: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Day infos without worksheet, cells are replaced with their coordinates"""
+    return [
+        day_schedule_info if "error" in day_schedule_info else detach_day(day_schedule_info)
+        for day_schedule_info in schedule_days
+    ]
+
+
+def load_schedule_days(schedule_days: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Reverse of `dump_schedule_days`, cells are returned as `CachedCell`"""
+    for day_schedule_info in schedule_days:
+        if "error" in day_schedule_info:
+            continue
+        for info in (day_schedule_info, *day_schedule_info["schedule"]):
+            info["starting_cell"] = CachedCell(*info["starting_cell"])
+            info["ending_cell"] = CachedCell(*info["ending_cell"])
+    return schedule_days
+
+
+@dataclass
+class ParseCache:
+    directory: str
+    max_size: int
+
+    @staticmethod
+    def get_key(file_hash: str, worksheet: str, year: int, month: int, version: str) -> str:
+        return hashlib.sha256(f"{file_hash}:{worksheet}:{year}:{month}:{version}".encode()).hexdigest()
+
+    def get_path(self, key: str) -> Path:
+        return Path(self.directory) / f"{key}{CACHE_FILE_SUFFIX}"
+
+    @staticmethod
+    def sign(data: bytes) -> bytes:
+        return salted_hmac(CACHE_SIGNATURE_SALT, data, algorithm="sha256").digest()
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self.get_path(key)
+        try:
+            content = path.read_bytes()
+            signature, data = content[:CACHE_SIGNATURE_SIZE], content[CACHE_SIGNATURE_SIZE:]
+            if not hmac.compare_digest(signature, self.sign(data)):
+                raise ValueError("invalid signature")
+            value = pickle.loads(zlib.decompress(data))
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            log.warning(f"Broken schedule parse cache entry {path.name} removed [{ex}]")
+            path.unlink(missing_ok=True)
+            return None
+        # modification time is used as last access time by eviction
+        os.utime(path)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        directory = Path(self.directory)
+        directory.mkdir(mode=CACHE_DIRECTORY_MODE, parents=True, exist_ok=True)
+        path = self.get_path(key)
+        temporary_path = path.with_suffix(f".{os.getpid()}.tmp")
+        data = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        temporary_path.write_bytes(self.sign(data) + data)
+        # other processes never see partially written entry
+        temporary_path.replace(path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes least recently used entries until cache fits in its max size"""
+        entries = []
+        for path in Path(self.directory).glob(f"*{CACHE_FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries, key=lambda entry: entry[0]):
+            if size <= self.max_size:
+                break
+            log.debug(f"Removing schedule parse cache entry {path.name}")
+            path.unlink(missing_ok=True)
+            size -= entry_size
@@ -1,4 +1,6 @@
 from colorsys import rgb_to_hls, hls_to_rgb
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 # From: https://stackoverflow.com/questions/58429823/getting-excel-cell-background-themed-color-as-hex-with-openpyxl/58443509#58443509
 #   which refers to: https://pastebin.com/B2nGEGX2 (October 2020)
 #       Updated to use list(elem) instead of the deprecated elem.getchildren() method
@@ -11,6 +13,11 @@ RGBMAX = 0xff  # Corresponds to 255
 HLSMAX = 240  # MS excel's tint function expects that HLS is base 240. see:
 # https://social.msdn.microsoft.com/Forums/en-US/e9d8c136-6d62-4098-9b1b-dac786149f43/excel-color-tint-algorithm-incorrect?forum=os_binaryfile#d3c2ac95-52e0-476b-86f1-e2a697f24969
 
+TINTED_COLORS_CACHE_SIZE = 1024  # distinct (colour, tint) pairs remembered by tint_rgb
+
+# theme palette parsed once per workbook, entries are dropped together with the workbook
+theme_colors_cache = WeakKeyDictionary()
+
 
 def rgb_to_ms_hls(red, green=None, blue=None):
     """Converts rgb values in range (0,1) or a hex string of the form '[#aa]rrggbb' to HLSMAX based HLS, (alpha values are ignored)"""
@@ -43,10 +50,15 @@ def rgb_to_hex(red, green=None, blue=None):
 
 def get_theme_colors(wb):
     """Gets theme colors from the workbook"""
+    return parse_theme_colors(wb.loaded_theme)
+
+
+def parse_theme_colors(theme):
+    """Gets theme colors from the theme xml"""
     # see: https://groups.google.com/forum/#!topic/openpyxl-users/I0k3TfqNLrc
     from openpyxl.xml.functions import QName, fromstring
     xlmns = 'http://schemas.openxmlformats.org/drawingml/2006/main'
-    root = fromstring(wb.loaded_theme)
+    root = fromstring(theme)
     themeEl = root.find(QName(xlmns, 'themeElements').text)
     colorSchemes = themeEl.findall(QName(xlmns, 'clrScheme').text)
     firstColorScheme = colorSchemes[0]
@@ -73,8 +85,20 @@ def tint_luminance(tint, lum):
         return int(round(lum * (1.0 - tint) + (HLSMAX - HLSMAX * (1.0 - tint))))
 
 
-def theme_and_tint_to_rgb(wb, theme, tint):
-    """Given a workbook, a theme number and a tint return a hex based rgb"""
-    rgb = get_theme_colors(wb)[theme]
+def get_cached_theme_colors(wb):
+    """Gets theme colors from the workbook, theme xml is parsed only once per workbook"""
+    if wb not in theme_colors_cache:
+        theme_colors_cache[wb] = tuple(get_theme_colors(wb))
+    return theme_colors_cache[wb]
+
+
+@lru_cache(maxsize=TINTED_COLORS_CACHE_SIZE)
+def tint_rgb(rgb, tint):
+    """Given a hex based rgb and a tint return tinted hex based rgb"""
     h, l, s = rgb_to_ms_hls(rgb)
     return rgb_to_hex(ms_hls_to_rgb(h, tint_luminance(tint, l), s))
+
+
+def theme_and_tint_to_rgb(wb, theme, tint):
+    """Given a workbook, a theme number and a tint return a hex based rgb"""
+    return tint_rgb(get_cached_theme_colors(wb)[theme], tint)
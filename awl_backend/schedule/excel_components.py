@@ -0,0 +1,124 @@
+from typing import List, Tuple
+
+from schedule.excel_snapshot import (
+    WorksheetSnapshot, CellMask, BORDER_TOP, BORDER_BOTTOM, BORDER_LEFT, BORDER_RIGHT, NO_COLOUR
+)
+
+# cells with this colour can be a part of module with any colour (vertically)
+NEUTRAL_COLOUR = "FFFFFF00"
+# every module is built from 3 rows high slots
+SLOT_HEIGHT = 3
+
+
+def get_slot_rows(excluded_cells: CellMask, column: int, start_row: int, end_row: int) -> List[int]:
+    """Top rows of the slots in the day block, same ones that are visited when walking down the hour column"""
+    slot_rows = []
+    row = start_row
+    while row < end_row:
+        if (row, column) in excluded_cells:
+            row += 1
+            continue
+        slot_rows.append(row)
+        row += SLOT_HEIGHT
+    return slot_rows
+
+
+def find_root(parents: List[int], unit: int) -> int:
+    while parents[unit] != unit:
+        parents[unit] = parents[parents[unit]]
+        unit = parents[unit]
+    return unit
+
+
+def union(parents: List[int], first: int, second: int) -> None:
+    first, second = find_root(parents, first), find_root(parents, second)
+    # smaller id (upper left slot) becomes the root
+    if first < second:
+        parents[second] = first
+    elif second < first:
+        parents[first] = second
+
+
+def label_module_ranges(
+    snapshot: WorksheetSnapshot,
+    excluded_cells: CellMask,
+    start_row: int,
+    end_row: int,
+    first_column: int,
+    last_column: int,
+) -> List[Tuple[int, int, int, int]]:
+    """
+    Labels all modules of the day block in one sweep.
+    Block is divided into slots (3 rows x 1 column), neighbouring slots are joined with union-find when there is
+    no border between them and fill colour of the next slot matches colour of the root (upper left slot) of the
+    module (same rules as used by `get_module_range`, which grows module to the right along its top row and down
+    along its first column, comparing cells with colour of its starting cell).
+    Returns (start_row, start_column, end_row, end_column) of every module, ordered by column and row.
+    Groups of slots without module name in their upper left cell are skipped (empty cells or unaligned fragments).
+    """
+    slot_rows = get_slot_rows(excluded_cells, first_column, start_row, end_row)
+    columns = last_column - first_column + 1
+    parents = list(range(len(slot_rows) * columns))
+
+    def get_root_colour(unit: int) -> str:
+        slot, offset = divmod(find_root(parents, unit), columns)
+        return snapshot.get_colour(slot_rows[slot], first_column + offset)
+
+    # horizontally slots are checked in their top row (where module name is), root of the slot is the first slot
+    # of its row joined so far
+    joined_left = [False] * len(parents)
+    for slot, row in enumerate(slot_rows):
+        for offset in range(columns - 1):
+            column = first_column + offset
+            if snapshot.has_border(row, column, BORDER_RIGHT) or snapshot.has_border(row, column + 1, BORDER_LEFT):
+                continue
+            unit = slot * columns + offset
+            colour = get_root_colour(unit)
+            if colour == NO_COLOUR or snapshot.get_colour(row, column + 1) == colour:
+                union(parents, unit, unit + 1)
+                joined_left[unit + 1] = True
+
+    # vertically only first columns of the slots (module starting column) are checked, between bottom row of the
+    # slot and top row of the next one, root of the slot is the top slot of its column joined so far
+    for slot, row in enumerate(slot_rows[:-1]):
+        next_slot_row = slot_rows[slot + 1]
+        if next_slot_row != row + SLOT_HEIGHT:
+            continue
+        for offset in range(columns):
+            unit = slot * columns + offset
+            if joined_left[unit] or joined_left[unit + columns]:
+                continue
+            column = first_column + offset
+            if (
+                snapshot.has_border(next_slot_row - 1, column, BORDER_BOTTOM)
+                or snapshot.has_border(next_slot_row, column, BORDER_TOP)
+            ):
+                continue
+            colour = get_root_colour(unit)
+            next_colour = snapshot.get_colour(next_slot_row, column)
+            if colour in (NO_COLOUR, NEUTRAL_COLOUR) or next_colour in (colour, NEUTRAL_COLOUR):
+                union(parents, unit, unit + columns)
+
+    bounds = {}
+    for unit in range(len(parents)):
+        root = find_root(parents, unit)
+        slot, offset = divmod(unit, columns)
+        if root not in bounds:
+            bounds[root] = [slot, offset, slot, offset]
+        else:
+            _bounds = bounds[root]
+            _bounds[0] = min(_bounds[0], slot)
+            _bounds[1] = min(_bounds[1], offset)
+            _bounds[2] = max(_bounds[2], slot)
+            _bounds[3] = max(_bounds[3], offset)
+
+    modules = []
+    for root, (first_slot, first_offset, last_slot, last_offset) in bounds.items():
+        # upper left corner of the bounding box has to be a part of the module (and hold its name)
+        if find_root(parents, first_slot * columns + first_offset) != root:
+            continue
+        row, column = slot_rows[first_slot], first_column + first_offset
+        if not snapshot.get_value(row, column):
+            continue
+        modules.append((row, column, slot_rows[last_slot] + SLOT_HEIGHT - 1, first_column + last_offset))
+    return sorted(modules, key=lambda module: (module[1], module[0]))
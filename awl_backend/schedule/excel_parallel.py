@@ -0,0 +1,74 @@
+"""
+Parsing days of the worksheet in worker processes.
+Every worker gets a copy of the worksheet snapshot once (when it starts), then only day numbers are sent to it.
+Cells can not be sent back with their worksheet (it would be pickled with every day), so results are returned
+with (row, column) coordinates in place of cells and are bound back to the worksheet in the main process.
+"""
+from datetime import date
+from typing import Any, Callable, Dict, Optional
+
+import django
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+
+from schedule.excel_snapshot import WorksheetSnapshot
+
+CELL_KEYS = ("starting_cell", "ending_cell")
+
+worker_service = None
+worker_snapshot: Optional[WorksheetSnapshot] = None
+
+
+def init_worker(service_path: str, snapshot: WorksheetSnapshot) -> None:
+    global worker_service, worker_snapshot
+    # processes which are not forked from the main one have to set up django on their own
+    django.setup()
+    worker_service = import_string(service_path)()
+    worker_snapshot = snapshot
+
+
+def parse_day(year: int, month: int, day: int, engine: str) -> Dict[str, Any]:
+    """Finds the day in the worksheet snapshot and all its modules (stored under `schedule` key)"""
+    try:
+        day_schedule_info = worker_service.get_single_day_schedule_info(worker_snapshot, year, month, day)
+    except ValidationError as ex:
+        return {"date": date(day=day, month=month, year=year), "error": f"{ex}"}
+    day_schedule_info["schedule"] = worker_service.get_schedule_for_single_day(day_schedule_info, engine=engine)
+    return detach_day(day_schedule_info)
+
+
+def detach_cells(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: (value.row, value.column) if key in CELL_KEYS else value for key, value in info.items()}
+
+
+def attach_cells(info: Dict[str, Any], get_cell: Callable[[int, int], Any]) -> Dict[str, Any]:
+    for key in CELL_KEYS:
+        row, column = info[key]
+        info[key] = get_cell(row, column)
+    return info
+
+
+def detach_day(day_schedule_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Replaces cells with their coordinates and drops the worksheet, so day can be sent to the main process"""
+    day_schedule_info = detach_cells(day_schedule_info)
+    day_schedule_info.pop("worksheet")
+    day_schedule_info.pop("snapshot")
+    day_schedule_info["schedule"] = [detach_cells(module) for module in day_schedule_info["schedule"]]
+    return day_schedule_info
+
+
+def attach_day(
+    day_schedule_info: Dict[str, Any], worksheet: Any, snapshot: WorksheetSnapshot
+) -> Dict[str, Any]:
+    """Reverse of `detach_day`, cells are taken from the worksheet of the main process"""
+    if "error" in day_schedule_info:
+        return day_schedule_info
+
+    def get_cell(row: int, column: int) -> Any:
+        return worksheet.cell(row=row, column=column)
+
+    day_schedule_info = attach_cells(day_schedule_info, get_cell)
+    day_schedule_info["worksheet"] = worksheet
+    day_schedule_info["snapshot"] = snapshot
+    day_schedule_info["schedule"] = [attach_cells(module, get_cell) for module in day_schedule_info["schedule"]]
+    return day_schedule_info
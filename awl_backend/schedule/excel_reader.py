@@ -0,0 +1,388 @@
+"""
+Lightweight access to xlsx files, reading only the parts of the zip container that are needed.
+Used when loading whole workbook with openpyxl (every sheet, style and shared string) would be a waste.
+"""
+import posixpath
+from array import array
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
+from xml.etree.ElementTree import Element, iterparse, parse
+from zipfile import ZipFile
+
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
+from openpyxl.utils.datetime import from_excel, from_ISO8601, MAC_EPOCH, WINDOWS_EPOCH
+from openpyxl.xml.constants import ARC_THEME
+
+from schedule.excel_colours import parse_theme_colors, tint_rgb
+from schedule.excel_snapshot import (
+    WorksheetSnapshot, BORDER_TOP, BORDER_BOTTOM, BORDER_LEFT, BORDER_RIGHT, BORDER_OUTLINED, NO_COLOUR
+)
+
+WORKBOOK_PART = "xl/workbook.xml"
+WORKBOOK_RELS_PART = "xl/_rels/workbook.xml.rels"
+STYLES_PART = "xl/styles.xml"
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+# relationship id of sheets, in transitional and in strict xlsx files
+REL_ID_ATTRIBUTES = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id",
+    "{http://purl.oclc.org/ooxml/officeDocument/relationships}id",
+)
+
+BORDER_SIDES = {"top": BORDER_TOP, "bottom": BORDER_BOTTOM, "left": BORDER_LEFT, "right": BORDER_RIGHT}
+# fill colour as (colour type, rgb or theme index, tint), None when fill has no pattern colour (e.g. gradient)
+FillColour = Optional[Tuple[str, Any, float]]
+
+
+class WorksheetNotFoundError(KeyError):
+    pass
+
+
+def local_name(tag: str) -> str:
+    """Strips namespace from the tag, both transitional and strict xlsx files are supported"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def cast_number(value: str) -> Union[int, float]:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+@dataclass
+class CellFormats:
+    """Cell formats (`cellXfs` of styles.xml), cells refer to them by position (style id)"""
+
+    number_formats: List[str] = field(default_factory=list)
+    border_ids: List[int] = field(default_factory=list)
+    fill_ids: List[int] = field(default_factory=list)
+    date_style_ids: Set[int] = field(default_factory=set)
+    timedelta_style_ids: Set[int] = field(default_factory=set)
+    # borders (as bitmasks) and fill colours, cell formats refer to them by border and fill id
+    border_masks: List[int] = field(default_factory=list)
+    fill_colours: List[FillColour] = field(default_factory=list)
+
+
+def open_workbook_archive(file: Union[str, BinaryIO]) -> ZipFile:
+    return ZipFile(file)
+
+
+def read_sheet_parts(archive: ZipFile) -> Dict[str, str]:
+    """Maps worksheet names (in workbook order) to paths of their xml parts"""
+    targets = {}
+    for element in parse(archive.open(WORKBOOK_RELS_PART)).getroot():
+        target = element.get("Target", "")
+        if target.startswith("/"):
+            targets[element.get("Id")] = target.lstrip("/")
+        else:
+            targets[element.get("Id")] = posixpath.normpath(posixpath.join("xl", target))
+
+    sheets = {}
+    for element in parse(archive.open(WORKBOOK_PART)).getroot().iter():
+        if local_name(element.tag) == "sheet":
+            rel_id = next((element.get(name) for name in REL_ID_ATTRIBUTES if element.get(name)), None)
+            sheets[element.get("name")] = targets.get(rel_id)
+    return sheets
+
+
+def read_epoch(archive: ZipFile) -> datetime:
+    for element in parse(archive.open(WORKBOOK_PART)).getroot():
+        if local_name(element.tag) == "workbookPr":
+            if element.get("date1904") in ("1", "true"):
+                return MAC_EPOCH
+    return WINDOWS_EPOCH
+
+
+def read_cell_formats(archive: ZipFile) -> CellFormats:
+    formats = CellFormats()
+    if STYLES_PART not in archive.namelist():
+        return formats
+
+    root = parse(archive.open(STYLES_PART)).getroot()
+    custom_formats = {}
+    for element in root:
+        if local_name(element.tag) == "numFmts":
+            for number_format in element:
+                custom_formats[int(number_format.get("numFmtId"))] = number_format.get("formatCode")
+        elif local_name(element.tag) == "borders":
+            formats.border_masks = [read_border_mask(border) for border in element]
+        elif local_name(element.tag) == "fills":
+            formats.fill_colours = [read_fill_colour(fill) for fill in element]
+        elif local_name(element.tag) == "cellXfs":
+            for style_id, xf in enumerate(element):
+                number_format_id = int(xf.get("numFmtId", 0))
+                number_format = custom_formats.get(number_format_id) or builtin_format_code(number_format_id)
+                formats.number_formats.append(number_format)
+                formats.border_ids.append(int(xf.get("borderId", 0)))
+                formats.fill_ids.append(int(xf.get("fillId", 0)))
+                if is_date_format(number_format):
+                    formats.date_style_ids.add(style_id)
+                if is_timedelta_format(number_format):
+                    formats.timedelta_style_ids.add(style_id)
+    return formats
+
+
+def read_border_mask(border: Element) -> int:
+    """Same bitmask as `get_border_mask` returns for openpyxl cell with this border"""
+    mask = 0
+    for side in border:
+        name = local_name(side.tag)
+        if name not in BORDER_SIDES:
+            continue
+        style = side.get("style")
+        if style and style != "none":
+            mask |= BORDER_SIDES[name]
+        # side with only a colour is not equal to `Side()` either
+        if name in ("top", "bottom") and ((style and style != "none") or len(side)):
+            mask |= BORDER_OUTLINED
+    return mask
+
+
+def read_fill_colour(fill: Element) -> FillColour:
+    """Foreground colour of pattern fill, resolved the same way as openpyxl `Color` does"""
+    if not len(fill) or local_name(fill[0].tag) != "patternFill":
+        return None
+    for colour in fill[0]:
+        if local_name(colour.tag) != "fgColor":
+            continue
+        tint = float(colour.get("tint", 0))
+        if colour.get("indexed") is not None:
+            return "indexed", int(colour.get("indexed")), tint
+        if colour.get("theme") is not None:
+            return "theme", int(colour.get("theme")), tint
+        if colour.get("auto") is not None:
+            return "auto", colour.get("auto"), tint
+        rgb = colour.get("rgb", NO_COLOUR)
+        return "rgb", "00" + rgb if len(rgb) == 6 else rgb, tint
+    return "rgb", NO_COLOUR, 0.0
+
+
+def read_theme_colours(archive: ZipFile) -> Optional[List[str]]:
+    if ARC_THEME not in archive.namelist():
+        return None
+    return parse_theme_colors(archive.read(ARC_THEME))
+
+
+def resolve_fill_colour(fill_colour: FillColour, theme_colours: Optional[List[str]]) -> str:
+    """Same value as `ExcelScheduleService.get_cell_colour` gives, empty string if colour can not be resolved"""
+    if fill_colour is None:
+        return ""
+    colour_type, colour, tint = fill_colour
+    if colour_type == "theme":
+        try:
+            return tint_rgb(theme_colours[colour], tint)
+        except (IndexError, TypeError, ValueError):
+            return ""
+    if colour_type == "rgb":
+        return colour
+    return NO_COLOUR
+
+
+def read_text(element: Element) -> str:
+    """Text of shared or inline string, phonetic runs are skipped (as in openpyxl `Text.content`)"""
+    snippets = []
+    for child in element:
+        name = local_name(child.tag)
+        if name == "t":
+            snippets.append(child.text or "")
+        elif name == "r":
+            snippets.extend(text.text or "" for text in child if local_name(text.tag) == "t")
+    return "".join(snippets)
+
+
+def read_shared_strings(archive: ZipFile) -> List[str]:
+    if SHARED_STRINGS_PART not in archive.namelist():
+        return []
+    strings = []
+    for _, element in iterparse(archive.open(SHARED_STRINGS_PART)):
+        if local_name(element.tag) == "si":
+            strings.append(read_text(element).replace("x005F_", ""))
+            element.clear()
+    return strings
+
+
+def read_dimensions(archive: ZipFile, part: str) -> Optional[str]:
+    """Returns `dimension` reference of the worksheet (it is placed before the cells, so rest of file is not read)"""
+    for _, element in iterparse(archive.open(part), events=("start",)):
+        name = local_name(element.tag)
+        if name == "dimension":
+            return element.get("ref")
+        if name == "sheetData":
+            return None
+    return None
+
+
+def read_max_cell(archive: ZipFile, part: str) -> Tuple[int, int]:
+    """Returns (max row, max column) of cells of the worksheet, for worksheets without `dimension` reference"""
+    max_row, max_column = 0, 0
+    for row, column, _, _, _ in iter_sheet_cells(archive, part):
+        max_row, max_column = max(max_row, row), max(max_column, column)
+    return max_row, max_column
+
+
+def read_dates(archive: ZipFile, part: str) -> Set[date]:
+    """Returns dates of cells with date format of the worksheet (every cell of the worksheet is read)"""
+    formats = read_cell_formats(archive)
+    epoch = read_epoch(archive)
+    dates = set()
+    for _, _, data_type, value, style_id in iter_sheet_cells(archive, part):
+        if data_type == "n" and value and style_id in formats.date_style_ids:
+            try:
+                _date = cast_date(value, style_id, formats, epoch)
+            except (OverflowError, ValueError):
+                continue
+            if isinstance(_date, datetime):
+                dates.add(_date.date())
+    return dates
+
+
+def iter_sheet_cells(archive: ZipFile, part: str) -> Iterator[Tuple[int, int, str, Any, int]]:
+    """
+    Streams (row, column, data type, raw value, style id) of every cell of the worksheet.
+    Raw value is the text of `v` element (or of inline string), it is not casted to python type.
+    """
+    row, column = 0, 0
+    for event, element in iterparse(archive.open(part), events=("start", "end")):
+        name = local_name(element.tag)
+        if event == "start":
+            if name == "row":
+                row = int(element.get("r", row + 1))
+                column = 0
+            continue
+
+        if name == "c":
+            if coordinate := element.get("r"):
+                row, column = coordinate_to_tuple(coordinate)
+            else:
+                column += 1
+            data_type = element.get("t", "n")
+            value = None
+            for child in element:
+                child_name = local_name(child.tag)
+                if child_name == "v":
+                    value = child.text
+                elif child_name == "is":
+                    value = read_text(child)
+            yield row, column, data_type, value, int(element.get("s", 0))
+        elif name == "row":
+            element.clear()
+
+
+def cast_date(value: str, style_id: int, formats: CellFormats, epoch: datetime) -> Any:
+    """Casts numeric value of the cell with date format, the same way openpyxl does it"""
+    return from_excel(cast_number(value), epoch, timedelta=style_id in formats.timedelta_style_ids)
+
+
+def cast_value(
+    data_type: str, value: Optional[str], style_id: int, formats: CellFormats, epoch: datetime, shared_strings: List[str]
+) -> Any:
+    """Casts raw value of the cell to python type, the same way openpyxl does it when workbook is read with data only"""
+    if data_type == "inlineStr":
+        return value
+    if not value:
+        return None
+    if data_type == "n":
+        if style_id in formats.date_style_ids:
+            try:
+                return cast_date(value, style_id, formats, epoch)
+            except (OverflowError, ValueError):
+                return "#VALUE!"
+        return cast_number(value)
+    if data_type == "s":
+        return shared_strings[int(value)]
+    if data_type == "b":
+        return bool(int(value))
+    if data_type == "d":
+        return from_ISO8601(value)
+    return value
+
+
+def read_worksheet_snapshot(file: Union[str, BinaryIO], worksheet: str) -> WorksheetSnapshot:
+    """
+    Builds snapshot of the worksheet straight from xlsx file, without loading the workbook with openpyxl.
+    Worksheet xml is streamed into compact (row, column, value, style id) records, style ids are resolved to
+    border bitmask and colour through lookup table built from styles.xml, so no style objects are created.
+    """
+    with open_workbook_archive(file) as archive:
+        sheet_parts = read_sheet_parts(archive)
+        if worksheet not in sheet_parts:
+            raise WorksheetNotFoundError(worksheet)
+
+        formats = read_cell_formats(archive)
+        epoch = read_epoch(archive)
+        shared_strings = read_shared_strings(archive)
+        theme_colours = read_theme_colours(archive)
+
+        records = []
+        max_row, max_column = 1, 1
+        for row, column, data_type, value, style_id in iter_sheet_cells(archive, sheet_parts[worksheet]):
+            max_row, max_column = max(max_row, row), max(max_column, column)
+            records.append(
+                (row, column, cast_value(data_type, value, style_id, formats, epoch, shared_strings), style_id)
+            )
+
+    size = max_row * max_column
+    values: List[Any] = [None] * size
+    borders = bytearray(size)
+    colours = array("H", bytes(2 * size))
+    palette = [NO_COLOUR]
+    palette_ids = {NO_COLOUR: 0}
+
+    # style id -> (border bitmask, colour id)
+    styles: Dict[int, Tuple[int, int]] = {}
+    for row, column, value, style_id in records:
+        index = (row - 1) * max_column + column - 1
+        values[index] = value
+        if style_id not in styles:
+            border_id = formats.border_ids[style_id] if style_id < len(formats.border_ids) else 0
+            fill_id = formats.fill_ids[style_id] if style_id < len(formats.fill_ids) else 0
+            border_mask = formats.border_masks[border_id] if border_id < len(formats.border_masks) else 0
+            fill_colour = formats.fill_colours[fill_id] if fill_id < len(formats.fill_colours) else None
+            colour = resolve_fill_colour(fill_colour, theme_colours)
+            if colour not in palette_ids:
+                palette_ids[colour] = len(palette)
+                palette.append(colour)
+            styles[style_id] = (border_mask, palette_ids[colour])
+        borders[index], colours[index] = styles[style_id]
+
+    return WorksheetSnapshot(
+        title=worksheet,
+        max_row=max_row,
+        max_column=max_column,
+        values=values,
+        borders=borders,
+        colours=colours,
+        palette=palette,
+    )
+
+
+def probe_workbook(
+    file: Union[str, BinaryIO], worksheet: Optional[str] = None, with_dates: bool = False
+) -> Dict[str, Any]:
+    """
+    Returns worksheet names of the workbook, and if worksheet is given also its dimensions
+    (and dates found in it, when `with_dates` is given).
+    Worksheet xml is read only up to its `dimension`, whole worksheet is streamed only for dates
+    (or when the worksheet has no dimension).
+    """
+    with open_workbook_archive(file) as archive:
+        sheet_parts = read_sheet_parts(archive)
+        result: Dict[str, Any] = {"worksheets": list(sheet_parts.keys())}
+        if worksheet is None or worksheet not in sheet_parts:
+            return result
+
+        part = sheet_parts[worksheet]
+        dimensions = read_dimensions(archive, part)
+        if dimensions and ":" in dimensions:
+            _, _, max_column, max_row = range_boundaries(dimensions)
+        else:
+            max_row, max_column = read_max_cell(archive, part)
+        result.update(
+            {"worksheet": worksheet, "dimensions": dimensions, "max_row": max_row, "max_column": max_column}
+        )
+
+        if with_dates:
+            dates = read_dates(archive, part)
+            result.update({"dates": sorted(dates), "months": sorted({(_date.year, _date.month) for _date in dates})})
+    return result
@@ -0,0 +1,212 @@
+from array import array
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from openpyxl.cell import Cell
+from openpyxl.styles.borders import Side
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.worksheet import Worksheet
+
+BORDER_TOP = 1
+BORDER_BOTTOM = 2
+BORDER_LEFT = 4
+BORDER_RIGHT = 8
+# top or bottom side differs from `Side()` (it can have a colour without a style)
+BORDER_OUTLINED = 16
+
+NO_COLOUR = "00000000"
+
+# types of values that are used as anchors by the parser (days are found by their date)
+ANCHOR_VALUE_TYPES = (date,)
+
+
+def get_border_mask(cell: Cell) -> int:
+    border = cell.border
+    mask = 0
+    if border.top.style:
+        mask |= BORDER_TOP
+    if border.bottom.style:
+        mask |= BORDER_BOTTOM
+    if border.left.style:
+        mask |= BORDER_LEFT
+    if border.right.style:
+        mask |= BORDER_RIGHT
+    if border.top != Side() or border.bottom != Side():
+        mask |= BORDER_OUTLINED
+    return mask
+
+
+@dataclass
+class WorksheetSnapshot:
+    """
+    Read-only copy of worksheet data needed by schedule parser.
+    Values, border bitmasks and colour ids are kept in flat row-major arrays, so reading them
+    is a plain list lookup instead of going through openpyxl cell and style proxy objects.
+    Coordinates outside of the snapshot behave like empty, not styled cells.
+    """
+
+    title: str
+    max_row: int
+    max_column: int
+    values: List[Any]
+    borders: bytearray
+    colours: array
+    palette: List[str]
+    anchors: Optional[Dict[Any, Tuple[int, int]]] = field(default=None, repr=False, compare=False)
+    column_profile: Optional[array] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_worksheet(cls, worksheet: Worksheet, colour_resolver: Callable[[Cell], str]) -> "WorksheetSnapshot":
+        max_row, max_column = worksheet.max_row, worksheet.max_column
+        size = max_row * max_column
+        values: List[Any] = [None] * size
+        borders = bytearray(size)
+        colours = array("H", bytes(2 * size))
+        palette = [NO_COLOUR]
+        palette_ids = {NO_COLOUR: 0}
+
+        # cells share border and fill objects, so every style is resolved only once
+        border_masks: Dict[int, int] = {}
+        fill_colour_ids: Dict[int, int] = {}
+        for row in worksheet.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=max_column):
+            for cell in row:
+                index = (cell.row - 1) * max_column + cell.column - 1
+                values[index] = cell.value
+
+                # cells without style use first border and fill, same way as openpyxl does
+                style = cell._style
+                border_id = style.borderId if style else 0
+                if border_id not in border_masks:
+                    border_masks[border_id] = get_border_mask(cell)
+                borders[index] = border_masks[border_id]
+
+                fill_id = style.fillId if style else 0
+                if fill_id not in fill_colour_ids:
+                    try:
+                        colour = colour_resolver(cell)
+                    except Exception:
+                        colour = ""
+                    if colour not in palette_ids:
+                        palette_ids[colour] = len(palette)
+                        palette.append(colour)
+                    fill_colour_ids[fill_id] = palette_ids[colour]
+                colours[index] = fill_colour_ids[fill_id]
+
+        return cls(
+            title=worksheet.title,
+            max_row=max_row,
+            max_column=max_column,
+            values=values,
+            borders=borders,
+            colours=colours,
+            palette=palette,
+        )
+
+    def cell(self, row: int, column: int) -> "SnapshotCell":
+        return SnapshotCell(parent=self, row=row, column=column)
+
+    def get_index(self, row: int, column: int) -> Optional[int]:
+        if 1 <= row <= self.max_row and 1 <= column <= self.max_column:
+            return (row - 1) * self.max_column + column - 1
+        return None
+
+    def get_value(self, row: int, column: int) -> Any:
+        index = self.get_index(row, column)
+        return None if index is None else self.values[index]
+
+    def get_border(self, row: int, column: int) -> int:
+        index = self.get_index(row, column)
+        return 0 if index is None else self.borders[index]
+
+    def has_border(self, row: int, column: int, side: int) -> bool:
+        return bool(self.get_border(row, column) & side)
+
+    def get_colour_id(self, row: int, column: int) -> int:
+        index = self.get_index(row, column)
+        return 0 if index is None else self.colours[index]
+
+    def get_colour(self, row: int, column: int) -> str:
+        return self.palette[self.get_colour_id(row, column)]
+
+    def get_anchor_index(self) -> Dict[Any, Tuple[int, int]]:
+        """
+        Maps anchor values to (row, column) of their first occurrence (rows are read top to bottom).
+        Index is built in a single pass over the snapshot, so finding all days of a month costs O(cells) in total.
+        """
+        if self.anchors is None:
+            anchors = {}
+            for index, value in enumerate(self.values):
+                if isinstance(value, ANCHOR_VALUE_TYPES) and value not in anchors:
+                    row, column = divmod(index, self.max_column)
+                    anchors[value] = (row + 1, column + 1)
+            self.anchors = anchors
+        return self.anchors
+
+    def find_anchor(self, value: Any) -> Optional[Tuple[int, int]]:
+        return self.get_anchor_index().get(value)
+
+    def get_column_profile(self) -> array:
+        """Last row with top or bottom border defined for every column (0 when column has no borders)"""
+        if self.column_profile is None:
+            profile = array("I", bytes(4 * (self.max_column + 1)))
+            for index, mask in enumerate(self.borders):
+                if mask & BORDER_OUTLINED:
+                    row, column = divmod(index, self.max_column)
+                    profile[column + 1] = row + 1
+            self.column_profile = profile
+        return self.column_profile
+
+    def get_last_outlined_row(self, column: int) -> int:
+        if 1 <= column <= self.max_column:
+            return self.get_column_profile()[column]
+        return 0
+
+
+@dataclass(frozen=True)
+class SnapshotCell:
+    """
+    Cell of the snapshot, it has the part of openpyxl `Cell` interface which is used by schedule parser,
+    so snapshot can be parsed in place of the worksheet.
+    """
+
+    parent: WorksheetSnapshot = field(repr=False, compare=False)
+    row: int
+    column: int
+
+    @property
+    def value(self) -> Any:
+        return self.parent.get_value(self.row, self.column)
+
+    @property
+    def column_letter(self) -> str:
+        return get_column_letter(self.column)
+
+    @property
+    def coordinate(self) -> str:
+        return f"{self.column_letter}{self.row}"
+
+
+class CellMask:
+    """
+    Set of worksheet coordinates, kept as one integer bitmap (bit per column) for every row.
+    Whole rectangles are marked with a single bitwise OR per row.
+    """
+
+    def __init__(self) -> None:
+        self.rows: Dict[int, int] = {}
+
+    def add(self, row: int, column: int) -> None:
+        self.rows[row] = self.rows.get(row, 0) | (1 << column)
+
+    def add_range(self, min_row: int, min_column: int, max_row: int, max_column: int) -> None:
+        columns = ((1 << (max_column - min_column + 1)) - 1) << min_column
+        for row in range(min_row, max_row + 1):
+            self.rows[row] = self.rows.get(row, 0) | columns
+
+    def __contains__(self, item: Union[Tuple[int, int], Cell]) -> bool:
+        row, column = item if isinstance(item, tuple) else (item.row, item.column)
+        return bool(self.rows.get(row, 0) >> column & 1)
+
+    def __len__(self) -> int:
+        return sum(columns.bit_count() for columns in self.rows.values())
@@ -0,0 +1,178 @@
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from django.core.management import BaseCommand, CommandParser
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from rest_framework.renderers import JSONRenderer
+
+from lecturers.models import Lecturer
+from rooms.models import Room
+from schedule.models import ScheduleBlock, Schedule, SchedulePublication, LecturerScheduleBlockThrough
+from schedule.renderers import CompactJSONRenderer
+from schedule.selectors import ScheduleBlockSelector
+from schedule.serializers import (
+    ScheduleBlockSerializer, ScheduleBlockListSerializer, ScheduleBlockCompactListSerializer
+)
+from users.models import Group, User
+
+SEMESTER_MONTHS = 5
+GROUPS_PER_YEAR = 5
+ROOMS_PER_BLOCK = 2
+BENCHMARK_PREFIX = "BENCHMARK"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a multi-semester schedule (rolled back at the end) and compares plans and times "
+        "of schedule block queries and serializers."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--semesters", type=int, default=4, help="Number of semesters to generate")
+        parser.add_argument("--groups", type=int, default=20, help="Number of groups to generate")
+        parser.add_argument("--blocks-per-day", type=int, default=5, help="Blocks of every year of groups in every day")
+        parser.add_argument("--repeat", type=int, default=5, help="How many times every query is run")
+        parser.add_argument("--no-plans", action="store_true", help="Print only times, without query plans")
+        parser.add_argument("--serialized-blocks", type=int, default=10000, help="Blocks listed by serializers")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            first_day = self.create_dataset(options["semesters"], options["groups"], options["blocks_per_day"])
+            for name, get_queryset in self.get_cases(first_day, options["semesters"]).items():
+                self.run_case(name, get_queryset, options["repeat"], not options["no_plans"])
+            for name, serialize in self.get_serializer_cases(options["serialized_blocks"]).items():
+                self.run_serializer_case(name, serialize, options["repeat"])
+            transaction.set_rollback(True)
+
+    def create_dataset(self, semesters: int, groups_count: int, blocks_per_day: int) -> date:
+        """Every month is imported and published as its own schedule, like in production"""
+        creator = User.objects.create_user(f"{BENCHMARK_PREFIX}_user")
+        groups = [Group.objects.create(name=f"{BENCHMARK_PREFIX}_{i}") for i in range(groups_count)]
+        rooms = Room.objects.bulk_create([Room(name=f"{BENCHMARK_PREFIX}_{i}") for i in range(groups_count)])
+        lecturers = Lecturer.objects.bulk_create([
+            Lecturer(first_name=BENCHMARK_PREFIX, last_name=str(i), title="dr") for i in range(groups_count)
+        ])
+
+        first_day = date(2020, 10, 1)
+        day, blocks_count = first_day, 0
+        for _ in range(semesters * SEMESTER_MONTHS):
+            schedule = Schedule.objects.create(
+                creator=creator, name=BENCHMARK_PREFIX, year=day.year, month=day.month, status="PUBLICATED"
+            )
+            SchedulePublication.objects.create(schedule=schedule)
+            schedule_blocks, group_relations, room_relations, lecturer_relations = [], [], [], []
+            month = day.month
+            while day.month == month:
+                for year_start in range(0, groups_count, GROUPS_PER_YEAR):
+                    # like lectures, every block is shared by groups of the same year and is held in a few rooms
+                    year_groups = groups[year_start:year_start + GROUPS_PER_YEAR]
+                    year_rooms = rooms[year_start:year_start + ROOMS_PER_BLOCK]
+                    for i in range(blocks_per_day):
+                        start = datetime.combine(day, datetime.min.time()) + timedelta(hours=8 + 2 * i)
+                        schedule_block = ScheduleBlock(
+                            course_name=BENCHMARK_PREFIX, start=start, end=start + timedelta(hours=1, minutes=30),
+                            type="W", revision=schedule,
+                        )
+                        schedule_blocks.append(schedule_block)
+                        group_relations += [
+                            ScheduleBlock.groups.through(scheduleblock=schedule_block, group=group)
+                            for group in year_groups
+                        ]
+                        room_relations += [
+                            ScheduleBlock.rooms.through(scheduleblock=schedule_block, room=room) for room in year_rooms
+                        ]
+                        lecturer_relations.append(LecturerScheduleBlockThrough(
+                            schedule_block=schedule_block, lecturer=lecturers[year_start + i % GROUPS_PER_YEAR],
+                            room=year_rooms[0],
+                        ))
+                day += timedelta(days=1)
+            ScheduleBlock.objects.bulk_create(schedule_blocks)
+            ScheduleBlock.groups.through.objects.bulk_create(group_relations)
+            ScheduleBlock.rooms.through.objects.bulk_create(room_relations)
+            LecturerScheduleBlockThrough.objects.bulk_create(lecturer_relations)
+            blocks_count += len(schedule_blocks)
+
+        with connection.cursor() as cursor:
+            for model in (
+                ScheduleBlock, ScheduleBlock.groups.through, ScheduleBlock.rooms.through,
+                LecturerScheduleBlockThrough, SchedulePublication,
+            ):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        self.stdout.write(f"Generated {blocks_count} blocks from {first_day} to {day}")
+        self.group_ids = [group.id for group in groups]
+        self.room_ids = [room.id for room in rooms]
+        return first_day
+
+    def get_cases(self, first_day: date, semesters: int) -> Dict[str, Callable[[], QuerySet]]:
+        """
+        Week of one group in the middle of the dataset, read with `__date` lookups and with datetime ranges.
+        Semester of many groups and rooms, filtered by joins with DISTINCT and by EXISTS subqueries.
+        """
+        date_from = first_day + timedelta(days=semesters * SEMESTER_MONTHS * 30 // 2)
+        date_to = date_from + timedelta(days=6)
+        groups = [self.group_ids[0]]
+        semester_to = date_from + timedelta(days=SEMESTER_MONTHS * 30)
+        many_groups, many_rooms = self.group_ids[::2], self.room_ids
+        return {
+            "date lookups (start__date, end__date)": lambda: ScheduleBlockSelector.publicated().filter(
+                start__date__gte=date_from, end__date__lte=date_to, groups__in=groups
+            ).distinct(),
+            "half-open datetime ranges": lambda: ScheduleBlockSelector.filtered(
+                date_from=date_from, date_to=date_to, groups=groups
+            ),
+            "semester of many groups (joins with DISTINCT)": lambda: ScheduleBlockSelector.publicated().filter(
+                start__gte=date_from, start__lt=semester_to, end__lt=semester_to,
+                groups__in=many_groups, rooms__in=many_rooms,
+            ).distinct(),
+            "semester of many groups (EXISTS)": lambda: ScheduleBlockSelector.filtered(
+                date_from=date_from, date_to=semester_to - timedelta(days=1), groups=many_groups, rooms=many_rooms
+            ),
+        }
+
+    def run_case(self, name: str, get_queryset: Callable[[], QuerySet], repeat: int, print_plan: bool) -> None:
+        times: List[float] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = len(get_queryset())
+            times.append(time.perf_counter() - started)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(f"{count} blocks, median {statistics.median(times) * 1000:.2f} ms of {repeat} runs")
+        if print_plan:
+            self.stdout.write(get_queryset().explain(analyze=connection.vendor == "postgresql"))
+
+    @staticmethod
+    def get_serializer_cases(blocks_count: int) -> Dict[str, Callable[[], bytes]]:
+        """Blocks (with lecturers, groups and rooms) of days with about given number of blocks, like in the list view"""
+        starts = ScheduleBlockSelector.publicated().order_by("start").values_list("start", flat=True)
+        filters = {"date_from": starts[0].date(), "date_to": starts[min(blocks_count, starts.count()) - 1].date()}
+        return {
+            "ScheduleBlockSerializer (prefetched relations)": lambda: JSONRenderer().render(
+                ScheduleBlockSerializer(
+                    ScheduleBlockSelector.with_details(ScheduleBlockSelector.filtered(**filters)), many=True
+                ).data
+            ),
+            "ScheduleBlockListSerializer (values_list rows)": lambda: JSONRenderer().render(
+                ScheduleBlockListSerializer(ScheduleBlockSelector.filtered(**filters)).data
+            ),
+            "ScheduleBlockCompactListSerializer (format=compact)": lambda: CompactJSONRenderer().render(
+                ScheduleBlockCompactListSerializer(ScheduleBlockSelector.filtered(**filters)).data
+            ),
+        }
+
+    def run_serializer_case(self, name: str, render: Callable[[], bytes], repeat: int) -> None:
+        """Times of reading and rendering the list to JSON"""
+        times: List[float] = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            size = len(render())
+            times.append(time.perf_counter() - started)
+
+        median = statistics.median(times)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(
+            f"{size / 1024:.0f} KiB, median {median * 1000:.2f} ms ({1 / median:.2f} ops/sec) of {repeat} runs"
+        )
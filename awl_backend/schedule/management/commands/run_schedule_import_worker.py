@@ -0,0 +1,42 @@
+import os
+import socket
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandParser
+from django.db import close_old_connections
+
+from common.container import container
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs schedule imports queued in the database (admin 'Pobierz z pliku' action). "
+        "Many workers can be run at once, every job is taken by one of them."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--once", action="store_true", help="Run all queued jobs and exit instead of waiting for new ones"
+        )
+        parser.add_argument(
+            "--sleep",
+            type=int,
+            default=settings.SCHEDULE_IMPORT_WORKER_SLEEP,
+            help="Seconds to wait before checking the queue again when it is empty",
+        )
+
+    def handle(self, *args: Any, once: bool = False, sleep: int = 0, **options: Any) -> None:
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Schedule import worker {worker} started")
+        while True:
+            # long running worker has to drop connections which were closed or are too old
+            close_old_connections()
+            job = container().schedule_import_job_service.run_next_schedule_import_job(worker)
+            if job:
+                self.stdout.write(f"{job.schedule}: {job.status} {job.error}".strip())
+                continue
+            if once:
+                return
+            time.sleep(sleep)
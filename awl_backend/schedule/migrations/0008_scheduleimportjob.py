@@ -0,0 +1,36 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0007_scheduleblock_colour_alter_schedule_month_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('QUEUED', 'W kolejce'), ('RUNNING', 'W trakcie'), ('FINISHED', 'Zakończony'), ('FAILED', 'Błąd')], default='QUEUED', max_length=32)),
+                ('worker', models.CharField(blank=True, max_length=128)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to='schedule.schedule')),
+            ],
+            options={
+                'ordering': ('-created_at',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='scheduleimportjob',
+            index=models.Index(fields=['status', 'created_at'], name='schedule_sc_status_af3bb8_idx'),
+        ),
+    ]
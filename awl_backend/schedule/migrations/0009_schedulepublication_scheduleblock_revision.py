@@ -0,0 +1,73 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+ENTITY_MODELS = (("lecturers", "Lecturer"), ("rooms", "Room"), ("courses", "Course"), ("users", "Group"))
+
+
+def create_publications(apps, schema_editor):
+    Schedule = apps.get_model("schedule", "Schedule")
+    ScheduleBlock = apps.get_model("schedule", "ScheduleBlock")
+    SchedulePublication = apps.get_model("schedule", "SchedulePublication")
+
+    for schedule in Schedule.objects.all():
+        ScheduleBlock.objects.filter(schedules=schedule, revision__isnull=True).update(revision=schedule)
+    SchedulePublication.objects.bulk_create(
+        [SchedulePublication(schedule=schedule) for schedule in Schedule.objects.filter(status="PUBLICATED")]
+    )
+    # blocks added outside of schedules are hidden by publications which replaced them, not by their flag
+    ScheduleBlock.objects.filter(revision__isnull=True, schedules_replaced__status="PUBLICATED").update(is_public=True)
+    # flags of imported objects are not needed anymore, they are visible while their schedule is published
+    for app_label, model_name in ENTITY_MODELS:
+        apps.get_model(app_label, model_name).objects.filter(schedules__status="PUBLICATED").update(is_public=False)
+
+
+def remove_publications(apps, schema_editor):
+    SchedulePublication = apps.get_model("schedule", "SchedulePublication")
+
+    for publication in SchedulePublication.objects.select_related("schedule").order_by("created_at"):
+        schedule = publication.schedule
+        schedule.replaced_schedule_blocks.update(is_public=False)
+        schedule.schedule_blocks.update(is_public=True)
+        for relation in (schedule.lecturers, schedule.rooms, schedule.courses, schedule.groups):
+            relation.update(is_public=True)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lecturers', '0002_lecturer_is_public'),
+        ('rooms', '0002_room_is_public'),
+        ('courses', '0003_course_is_public'),
+        ('users', '0003_group_is_public'),
+        ('schedule', '0008_scheduleimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scheduleblock',
+            name='revision',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revision_blocks', to='schedule.schedule'),
+        ),
+        migrations.AlterField(
+            model_name='scheduleblock',
+            name='is_public',
+            field=models.BooleanField(default=False, help_text='Dotyczy tylko bloczków dodanych poza planem'),
+        ),
+        migrations.CreateModel(
+            name='SchedulePublication',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('schedule', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='publication', to='schedule.schedule')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(create_publications, remove_publications),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:37
+
+from django.db import migrations, models
+
+# tables of `ScheduleBlock.groups` and `ScheduleBlock.rooms` are created by django, so their indexes are added by sql
+THROUGH_TABLE_INDEXES = (
+    ("schedule_scheduleblock_groups", "group_id", "schedule_sc_groups_reverse_idx"),
+    ("schedule_scheduleblock_rooms", "room_id", "schedule_sc_rooms_reverse_idx"),
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0009_schedulepublication_scheduleblock_revision'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lecturerscheduleblockthrough',
+            index=models.Index(fields=['lecturer', 'schedule_block'], name='schedule_le_lecture_1c09a9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleblock',
+            index=models.Index(fields=['start', 'end'], name='schedule_sc_start_323404_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleblock',
+            index=models.Index(fields=['end'], name='schedule_sc_end_01df33_idx'),
+        ),
+    ] + [
+        migrations.RunSQL(
+            sql=f"CREATE INDEX {index_name} ON {table} ({column}, scheduleblock_id);",
+            reverse_sql=f"DROP INDEX {index_name};",
+        )
+        for table, column, index_name in THROUGH_TABLE_INDEXES
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.1.3 on 2026-10-18 03:43
+
+from django.db import migrations, models
+import uuid
+
+
+def create_schedule_data_version(apps, schema_editor):
+    # row is created up front, so bumping the version is always a single update
+    apps.get_model("schedule", "DataVersion").objects.get_or_create(name="schedule")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0010_scheduleblock_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(create_schedule_data_version, migrations.RunPython.noop),
+    ]
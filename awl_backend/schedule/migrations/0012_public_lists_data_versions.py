@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def create_public_lists_data_versions(apps, schema_editor):
+    # lists of lecturers, rooms and groups are versioned (and served conditionally) separately from the schedule
+    DataVersion = apps.get_model("schedule", "DataVersion")
+    for name in ("lecturers", "rooms", "groups"):
+        DataVersion.objects.get_or_create(name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0011_dataversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_public_lists_data_versions, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.utils import timezone
 
+from schedule.consts import IMPORT_JOB_STATUSES, IMPORT_JOB_QUEUED
 from schedule.utils import get_current_year, get_current_month
 from users.models import Group, User
 from django.db import models
@@ -36,8 +37,25 @@ class Schedule(BaseDatabaseModel, TimestampMixin):
         ordering = ("-created_at",)
 
 
+class SchedulePublication(BaseDatabaseModel, TimestampMixin):
+    """
+    Set of active schedule revisions. Blocks (and new lecturers, rooms, groups, courses) of published schedules are
+    visible and blocks replaced by them are not, so publication is switched by creating or deleting one row.
+    """
+
+    # published schedule can not be deleted (its blocks would be hidden and blocks replaced by them shown again),
+    # its publication has to be reverted first
+    schedule = models.OneToOneField(Schedule, on_delete=models.PROTECT, related_name="publication")
+
+    def __str__(self) -> str:
+        return f"{self.schedule}"
+
+
 class ScheduleBlock(BaseDatabaseModel, TimestampMixin, ModelDifferenceMixin):
-    is_public = models.BooleanField(default=False)
+    is_public = models.BooleanField(default=False, help_text="Dotyczy tylko bloczków dodanych poza planem")
+    revision = models.ForeignKey(
+        Schedule, on_delete=models.SET_NULL, related_name="revision_blocks", null=True, blank=True
+    )
     course_name = models.CharField(max_length=128)
     course = models.ForeignKey(Course, on_delete=models.SET_NULL, related_name="schedule_blocks", null=True)
     start = models.DateTimeField()
@@ -55,6 +73,12 @@ class ScheduleBlock(BaseDatabaseModel, TimestampMixin, ModelDifferenceMixin):
 
     class Meta:
         ordering = ("-created_at", "start")
+        # visibility is decided by publications of revisions (see `ScheduleBlockSelector.publicated`),
+        # so reads are narrowed by ranges of start and end first
+        indexes = [
+            models.Index(fields=["start", "end"]),
+            models.Index(fields=["end"]),
+        ]
 
 
 class LecturerScheduleBlockThrough(BaseDatabaseModel, TimestampMixin):
@@ -64,3 +88,37 @@ class LecturerScheduleBlockThrough(BaseDatabaseModel, TimestampMixin):
 
     def __str__(self) -> str:
         return f"{self.lecturer}{f' / {self.room.name}' if self.room else ''}"
+
+    class Meta:
+        indexes = [models.Index(fields=["lecturer", "schedule_block"])]
+
+
+class ScheduleImportJob(BaseDatabaseModel, TimestampMixin):
+    """Import of the schedule from its file, queued by admin and run by `manage.py run_schedule_import_worker`"""
+
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name="import_jobs")
+    status = models.CharField(max_length=32, choices=IMPORT_JOB_STATUSES, default=IMPORT_JOB_QUEUED)
+    worker = models.CharField(max_length=128, blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.schedule} / {self.get_status_display()}"
+
+    class Meta:
+        ordering = ("-created_at",)
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+
+class DataVersion(BaseDatabaseModel, TimestampMixin):
+    """
+    Version of data read by public endpoints. Every change of that data bumps it in its own transaction,
+    so responses cached for the version are never served after the change is committed.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.name} / {self.version}"
@@ -0,0 +1,79 @@
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q, QuerySet
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from schedule.models import ScheduleBlock
+
+CURSOR_QUERY_PARAM = "cursor"
+PAGE_SIZE_QUERY_PARAM = "page_size"
+PAGINATION_QUERY_PARAMS = (CURSOR_QUERY_PARAM, PAGE_SIZE_QUERY_PARAM)
+
+
+def encode_cursor(schedule_block: ScheduleBlock) -> str:
+    return urlsafe_b64encode(f"{schedule_block.start.isoformat()}|{schedule_block.id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        start, block_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(start), UUID(block_id)
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValidationError({CURSOR_QUERY_PARAM: "Nieprawidłowy kursor"})
+
+
+class ScheduleBlockCursorPagination(BasePagination):
+    """
+    Keyset pagination of schedule blocks ordered by (start, id), enabled when `cursor` or `page_size` is given.
+    Cursor points at the last block of the previous page, so next page is read with a range (never with OFFSET)
+    and only blocks of the page are loaded.
+    """
+
+    def __init__(self) -> None:
+        self.request: Optional[Request] = None
+        self.next_cursor: Optional[str] = None
+
+    @staticmethod
+    def get_page_size(request: Request) -> int:
+        try:
+            page_size = int(request.query_params.get(PAGE_SIZE_QUERY_PARAM, settings.SCHEDULE_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({PAGE_SIZE_QUERY_PARAM: "Rozmiar strony musi być liczbą"})
+        if page_size < 1:
+            raise ValidationError({PAGE_SIZE_QUERY_PARAM: "Rozmiar strony musi być większy od zera"})
+        return min(page_size, settings.SCHEDULE_MAX_PAGE_SIZE)
+
+    def paginate_queryset(
+        self, queryset: QuerySet[ScheduleBlock], request: Request, view: Any = None
+    ) -> Optional[List[ScheduleBlock]]:
+        if not set(PAGINATION_QUERY_PARAMS) & set(request.query_params.keys()):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by("start", "id")
+        if cursor := request.query_params.get(CURSOR_QUERY_PARAM):
+            start, block_id = decode_cursor(cursor)
+            queryset = queryset.filter(Q(start__gt=start) | Q(start=start, id__gt=block_id))
+
+        # one block more tells whether there is a next page
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), CURSOR_QUERY_PARAM, self.next_cursor)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response({"next": self.get_next_link(), "results": data})
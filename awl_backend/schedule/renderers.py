@@ -0,0 +1,13 @@
+from rest_framework.renderers import JSONRenderer
+
+COMPACT_FORMAT = "compact"
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON renderer selected by `?format=compact`, views give compact form of their data when it is accepted.
+    Compact data is already small, so it is rendered without spaces.
+    """
+
+    format = COMPACT_FORMAT
+    compact = True
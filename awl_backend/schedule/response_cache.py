@@ -0,0 +1,128 @@
+"""
+Cache of public schedule responses and conditional GET of public lists.
+Responses are cached under the current version of data they are read from (see `DataVersion`), so every change
+bumps the version and old responses are never read again (they expire or are culled by the cache).
+The same version (with the negotiated format) is the ETag of responses. Last-Modified is not sent, HTTP dates have whole seconds only,
+so two changes in the same second would give the same date and a stale response would be taken as not modified.
+"""
+import hashlib
+import json
+from typing import Any, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+
+from schedule.models import DataVersion
+
+# blocks with their lecturers, groups, rooms and courses
+SCHEDULE_DATA = "schedule"
+# public lists of lecturers, rooms and groups
+LECTURERS_DATA = "lecturers"
+ROOMS_DATA = "rooms"
+GROUPS_DATA = "groups"
+# publication of the schedule changes visibility of all of them
+PUBLISHED_DATA = (SCHEDULE_DATA, LECTURERS_DATA, ROOMS_DATA, GROUPS_DATA)
+
+
+def get_data_version(name: str) -> int:
+    """Single row read by unique index"""
+    return DataVersion.objects.filter(name=name).values_list("version", flat=True).first() or 0
+
+
+def get_request_data_version(request: Any, name: str) -> int:
+    """Same as `get_data_version`, but read once per request (conditional GET and response cache need it both)"""
+    versions = request.__dict__.setdefault("_data_versions", {})
+    if name not in versions:
+        versions[name] = get_data_version(name)
+    return versions[name]
+
+
+def bump_data_version(*names: str) -> None:
+    """Should be called in the transaction of the change, new version is visible when the change is committed"""
+    # all versions are bumped with a single update, missing rows are created (and bumped) one by one
+    names = set(names)
+    if DataVersion.objects.filter(name__in=names).update(version=F("version") + 1, updated_at=timezone.now()) == len(
+        names
+    ):
+        return
+    for name in names - set(DataVersion.objects.filter(name__in=names).values_list("name", flat=True)):
+        _, created = DataVersion.objects.get_or_create(name=name, defaults={"version": 1})
+        if not created:
+            DataVersion.objects.filter(name=name).update(version=F("version") + 1, updated_at=timezone.now())
+
+
+def normalize_query(query: Dict[str, Any]) -> Dict[str, Any]:
+    """Same filters given in other order (or empty) give the same query"""
+    return {
+        key: sorted(set(value), key=str) if isinstance(value, list) else value
+        for key, value in query.items()
+        if value not in (None, [])
+    }
+
+
+def get_response_cache_key(name: str, version: int, query: Any) -> str:
+    payload = json.dumps(query, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{name}:response:{version}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def get_cached_response_data(
+    name: str, query: Any, get_data: Callable[[], Any], version: Optional[int] = None
+) -> Any:
+    """Response data of the query from the cache, `get_data` is called (and cached) only on cache miss"""
+    if not settings.SCHEDULE_RESPONSE_CACHE_TIMEOUT:
+        return get_data()
+
+    cache = caches[settings.SCHEDULE_RESPONSE_CACHE_ALIAS]
+    version = get_data_version(name) if version is None else version
+    key = get_response_cache_key(name, version, query)
+    if (data := cache.get(key)) is None:
+        data = get_data()
+        cache.set(key, data, settings.SCHEDULE_RESPONSE_CACHE_TIMEOUT)
+    return data
+
+
+def conditional_on_data_version(name: str) -> Callable:
+    """
+    Conditional GET (If-None-Match) of the view method reading data of the version.
+    When data was not changed, 304 is returned before the view reads (and serializes) anything.
+    Representation is negotiated by Accept header too, so its renderer is a part of the ETag.
+    """
+
+    def get_etag(request: Any, *args: Any, **kwargs: Any) -> str:
+        version = get_request_data_version(request, name)
+        query = sorted((key, sorted(values)) for key, values in request.GET.lists())
+        renderer_format = request.accepted_renderer.format
+        payload = json.dumps([name, version, request.path, query, renderer_format], separators=(",", ":"))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def decorator(view_func: Callable) -> Callable:
+        return vary_on_headers("Accept")(condition(etag_func=get_etag)(view_func))
+
+    return method_decorator(decorator)
+
+
+class BumpDataVersionAdminMixin:
+    """Changes made in django admin bump versions of data too"""
+
+    data_versions = (SCHEDULE_DATA,)
+
+    def save_model(self, request: Any, obj: Any, form: Any, change: bool) -> None:
+        super().save_model(request, obj, form, change)
+        bump_data_version(*self.data_versions)
+
+    def save_related(self, request: Any, form: Any, formsets: Any, change: bool) -> None:
+        super().save_related(request, form, formsets, change)
+        bump_data_version(*self.data_versions)
+
+    def delete_model(self, request: Any, obj: Any) -> None:
+        super().delete_model(request, obj)
+        bump_data_version(*self.data_versions)
+
+    def delete_queryset(self, request: Any, queryset: Any) -> None:
+        super().delete_queryset(request, queryset)
+        bump_data_version(*self.data_versions)
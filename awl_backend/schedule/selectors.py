@@ -1,10 +1,12 @@
-from datetime import date
+from datetime import date, datetime, time, timedelta
 from typing import Optional, List
 from uuid import UUID
 
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q, Exists, OuterRef, Prefetch
 
-from schedule.models import ScheduleBlock
+from rooms.models import Room
+from schedule.models import ScheduleBlock, Schedule, SchedulePublication, LecturerScheduleBlockThrough
+from users.models import Group
 
 
 class ScheduleBlockSelector:
@@ -14,7 +16,17 @@ class ScheduleBlockSelector:
 
     @classmethod
     def publicated(cls) -> QuerySet[ScheduleBlock]:
-        return cls.all().filter(is_public=True)
+        """
+        Blocks of published schedules (and public blocks added outside of schedules),
+        without blocks replaced by any published schedule.
+        """
+        published_schedules = SchedulePublication.objects.values("schedule_id")
+        replaced = Schedule.replaced_schedule_blocks.through.objects.filter(
+            scheduleblock_id=OuterRef("pk"), schedule_id__in=published_schedules
+        )
+        return cls.all().filter(
+            Q(revision__isnull=True, is_public=True) | Q(revision_id__in=published_schedules), ~Exists(replaced)
+        )
 
     @classmethod
     def filtered(
@@ -26,18 +38,66 @@ class ScheduleBlockSelector:
         rooms: Optional[List[UUID]] = None,
     ) -> QuerySet[ScheduleBlock]:
         qs = cls.publicated()
+        # half-open datetime ranges (instead of `__date` lookups), so indexes on start and end can be used
         if date_from:
-            qs = qs.filter(start__date__gte=date_from)
+            qs = qs.filter(start__gte=datetime.combine(date_from, time.min))
         if date_to:
-            qs = qs.filter(end__date__lte=date_to)
+            date_to_end = datetime.combine(date_to + timedelta(days=1), time.min)
+            # block starts before its end, so start is bounded too and its index is read only for the range
+            qs = qs.filter(start__lt=date_to_end, end__lt=date_to_end)
+        # every facet is a correlated subquery (not a join), so rows are not multiplied and need no DISTINCT
         if groups:
-            qs = qs.filter(groups__in=groups)
+            qs = qs.filter(
+                Exists(
+                    ScheduleBlock.groups.through.objects.filter(scheduleblock_id=OuterRef("pk"), group_id__in=groups)
+                )
+            )
         if lecturers:
-            qs = qs.filter(lecturers__in=lecturers)
+            qs = qs.filter(
+                Exists(
+                    LecturerScheduleBlockThrough.objects.filter(
+                        schedule_block_id=OuterRef("pk"), lecturer_id__in=lecturers
+                    )
+                )
+            )
         if rooms:
-            qs = qs.filter(rooms__in=rooms)
-        return qs.distinct()
+            qs = qs.filter(
+                Exists(
+                    ScheduleBlock.rooms.through.objects.filter(scheduleblock_id=OuterRef("pk"), room_id__in=rooms)
+                )
+            )
+        return qs
+
+    @staticmethod
+    def with_details(qs: QuerySet[ScheduleBlock]) -> QuerySet[ScheduleBlock]:
+        """
+        Loads only fields used by `ScheduleBlockSerializer` and prefetches its relations,
+        so list of blocks is read with the same number of queries whatever its length.
+        Relations are ordered like in `ScheduleBlockListSerializer`.
+        """
+        lecturers = LecturerScheduleBlockThrough.objects.select_related("lecturer", "room").order_by(
+            "lecturer__last_name", "lecturer__first_name"
+        ).only(
+            "schedule_block_id",
+            "lecturer__id",
+            "lecturer__first_name",
+            "lecturer__last_name",
+            "lecturer__title",
+            "lecturer__contact_email",
+            "room__id",
+            "room__name",
+        )
+        qs = qs.only("id", "course_name", "course_id", "start", "end", "type", "colour", "created_at")
+        return qs.prefetch_related(
+            Prefetch("lecturerscheduleblockthrough_set", queryset=lecturers),
+            Prefetch("groups", queryset=Group.objects.only("id", "name").order_by("name")),
+            Prefetch("rooms", queryset=Room.objects.only("id", "name").order_by("name")),
+        )
 
     @staticmethod
     def get_by_id(block_id: UUID) -> ScheduleBlock:
         return ScheduleBlock.objects.get(id=block_id)
+
+    @classmethod
+    def get_by_id_with_details(cls, block_id: UUID) -> ScheduleBlock:
+        return cls.with_details(cls.all()).get(id=block_id)
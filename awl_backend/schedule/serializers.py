@@ -1,11 +1,41 @@
+from collections import defaultdict
+from datetime import datetime, tzinfo
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from django.db.models import QuerySet
+from django.utils import timezone
 from rest_framework import serializers
 
+from courses.models import Course
 from lecturers.serializers import LecturerSerializer
 from rooms.serializers import RoomSerializer
 from schedule.models import ScheduleBlock, LecturerScheduleBlockThrough
 from users.serializers import GroupSerializer
 
 
+def to_text(value: Any) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def get_column_getter(index: int, convert: Optional[Callable[[Any], Any]] = None) -> Callable[[Tuple], Any]:
+    if convert is None:
+        return itemgetter(index)
+    return lambda row: convert(row[index])
+
+
+def get_relation_getter(by_block: Dict[UUID, List[Any]]) -> Callable[[Tuple], List[Any]]:
+    return lambda row: by_block.get(row[0], [])
+
+
+def to_epoch_minutes(value: datetime, tz: tzinfo) -> int:
+    """Naive datetimes are in `tz` (current timezone of the list is read once, not for every value)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return int(value.timestamp()) // 60
+
+
 class ScheduleFilterQuerySerializer(serializers.Serializer):
     date_from = serializers.DateField(allow_null=True, required=False)
     date_to = serializers.DateField(allow_null=True, required=False)
@@ -14,6 +44,21 @@ class ScheduleFilterQuerySerializer(serializers.Serializer):
     rooms = serializers.ListField(child=serializers.UUIDField(), allow_null=True, required=False)
 
 
+class ScheduleBlockPageQuerySerializer(serializers.Serializer):
+    """Query of `ScheduleBlockCursorPagination` (used only for the schema, pagination reads it on its own)"""
+
+    cursor = serializers.CharField(required=False, help_text="Kursor następnej strony")
+    page_size = serializers.IntegerField(min_value=1, required=False, help_text="Liczba bloczków na stronie")
+
+
+class ScheduleBlockFormatQuerySerializer(serializers.Serializer):
+    """Format of the list (used only for the schema, format is read by renderers negotiation)"""
+
+    format = serializers.ChoiceField(
+        choices=["json", "compact"], required=False, help_text="compact - słowniki prowadzących, sal, grup i kursów"
+    )
+
+
 class ScheduleBlockLecturerCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = LecturerScheduleBlockThrough
@@ -49,6 +94,177 @@ class ScheduleBlockSerializer(serializers.ModelSerializer):
         )
 
 
+class ScheduleBlockListSerializer:
+    """
+    Read-only serializer of schedule block lists, gives the same data as `ScheduleBlockSerializer(many=True)`.
+    Blocks and their relations are read as flat rows (one query each) and put together as plain dicts,
+    without model instances and serializer fields built for every block.
+    Ids are read as UUIDs and turned to strings in Python (text of UUID columns depends on the database).
+    When `fields` are given, only their columns are read and relations which were not requested are not queried.
+    """
+
+    fields = ScheduleBlockSerializer.Meta.fields
+    relation_fields = ("lecturers", "groups", "rooms")
+    columns = {
+        "id": "id",
+        "course_name": "course_name",
+        "course": "course_id",
+        "start": "start",
+        "end": "end",
+        "type": "type",
+        "colour": "colour",
+    }
+    datetime_field = serializers.DateTimeField()
+
+    def __init__(self, queryset: QuerySet[ScheduleBlock], fields: Optional[Sequence[str]] = None) -> None:
+        self.queryset = queryset
+        if fields is not None:
+            self.fields = tuple(fields)
+
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        return self.get_blocks()
+
+    def get_blocks(self) -> List[Dict[str, Any]]:
+        # id of blocks is always read (relations are grouped by it), but it is returned only when requested
+        columns = [field for field in self.fields if field not in self.relation_fields and field != "id"]
+        rows = self.queryset.values_list(self.columns["id"], *(self.columns[field] for field in columns))
+        # relations of blocks are read by the same query (as a subquery), not by a list of their ids
+        relations = self.get_relations(self.queryset.order_by().values("id"))
+        converters = self.get_converters()
+
+        getters = []
+        for field in self.fields:
+            if field in relations:
+                getters.append((field, get_relation_getter(relations[field])))
+            else:
+                index = columns.index(field) + 1 if field != "id" else 0
+                getters.append((field, get_column_getter(index, converters.get(field))))
+        return [{field: get(row) for field, get in getters} for row in rows]
+
+    def get_converters(self) -> Dict[str, Callable[[Any], Any]]:
+        to_datetime = self.datetime_field.to_representation
+        return {"id": str, "start": to_datetime, "end": to_datetime}
+
+    def get_relations(self, ids: QuerySet[ScheduleBlock]) -> Dict[str, Dict[UUID, List[Any]]]:
+        relations = {}
+        if "lecturers" in self.fields:
+            lecturers = relations["lecturers"] = defaultdict(list)
+            for block_id, lecturer_id, first_name, last_name, title, contact_email, room_id, room_name in (
+                self.get_lecturer_rows(ids)
+            ):
+                lecturers[block_id].append({
+                    "lecturer": {
+                        "id": str(lecturer_id),
+                        "first_name": first_name,
+                        "last_name": last_name,
+                        "title": title,
+                        "contact_email": contact_email,
+                    },
+                    "room": {"id": str(room_id), "name": room_name} if room_id else None,
+                })
+        if "groups" in self.fields:
+            groups = relations["groups"] = defaultdict(list)
+            for block_id, group_id, name in self.get_group_rows(ids):
+                groups[block_id].append({"id": group_id, "name": name})
+        if "rooms" in self.fields:
+            rooms = relations["rooms"] = defaultdict(list)
+            for block_id, room_id, name in self.get_room_rows(ids):
+                rooms[block_id].append({"id": str(room_id), "name": name})
+        return relations
+
+    @staticmethod
+    def get_lecturer_rows(ids: QuerySet[ScheduleBlock]) -> QuerySet:
+        return LecturerScheduleBlockThrough.objects.filter(schedule_block_id__in=ids).order_by(
+            "lecturer__last_name", "lecturer__first_name"
+        ).values_list(
+            "schedule_block_id",
+            "lecturer_id",
+            "lecturer__first_name",
+            "lecturer__last_name",
+            "lecturer__title",
+            "lecturer__contact_email",
+            "room_id",
+            "room__name",
+        )
+
+    @staticmethod
+    def get_group_rows(ids: QuerySet[ScheduleBlock]) -> QuerySet:
+        return ScheduleBlock.groups.through.objects.filter(scheduleblock_id__in=ids).order_by(
+            "group__name"
+        ).values_list("scheduleblock_id", "group_id", "group__name")
+
+    @staticmethod
+    def get_room_rows(ids: QuerySet[ScheduleBlock]) -> QuerySet:
+        return ScheduleBlock.rooms.through.objects.filter(scheduleblock_id__in=ids).order_by(
+            "room__name"
+        ).values_list("scheduleblock_id", "room_id", "room__name")
+
+
+class ScheduleBlockCompactListSerializer(ScheduleBlockListSerializer):
+    """
+    Compact form of schedule block lists (`?format=compact`).
+    Lecturers, rooms, groups and courses are given once, in dictionaries by their ids, and blocks reference them
+    by ids. `start` and `end` of blocks are minutes since epoch (UTC).
+    """
+
+    def __init__(self, queryset: QuerySet[ScheduleBlock], fields: Optional[Sequence[str]] = None) -> None:
+        super().__init__(queryset, fields)
+        self.dictionaries: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        blocks = self.get_blocks()
+        if "course" in self.fields:
+            self.dictionaries["courses"] = {
+                str(course_id): {"name": name}
+                for course_id, name in Course.objects.filter(
+                    id__in=self.queryset.order_by().values("course_id")
+                ).values_list("id", "name")
+            }
+        return {"blocks": blocks, **self.dictionaries}
+
+    def get_converters(self) -> Dict[str, Callable[[Any], Any]]:
+        tz = timezone.get_current_timezone()
+        return {
+            "id": str,
+            "course": to_text,
+            "start": lambda value: to_epoch_minutes(value, tz),
+            "end": lambda value: to_epoch_minutes(value, tz),
+        }
+
+    def get_relations(self, ids: QuerySet[ScheduleBlock]) -> Dict[str, Dict[UUID, List[Any]]]:
+        relations = {}
+        if "lecturers" in self.fields:
+            lecturers = self.dictionaries["lecturers"] = {}
+            rooms = self.dictionaries.setdefault("rooms", {})
+            block_lecturers = relations["lecturers"] = defaultdict(list)
+            for block_id, lecturer_id, first_name, last_name, title, contact_email, room_id, room_name in (
+                self.get_lecturer_rows(ids)
+            ):
+                lecturer_id, room_id = str(lecturer_id), to_text(room_id)
+                lecturers[lecturer_id] = {
+                    "first_name": first_name, "last_name": last_name, "title": title, "contact_email": contact_email
+                }
+                if room_id:
+                    rooms[room_id] = {"name": room_name}
+                block_lecturers[block_id].append({"lecturer": lecturer_id, "room": room_id})
+        if "groups" in self.fields:
+            groups = self.dictionaries["groups"] = {}
+            block_groups = relations["groups"] = defaultdict(list)
+            for block_id, group_id, name in self.get_group_rows(ids):
+                groups[group_id] = {"name": name}
+                block_groups[block_id].append(group_id)
+        if "rooms" in self.fields:
+            rooms = self.dictionaries.setdefault("rooms", {})
+            block_rooms = relations["rooms"] = defaultdict(list)
+            for block_id, room_id, name in self.get_room_rows(ids):
+                room_id = str(room_id)
+                rooms[room_id] = {"name": name}
+                block_rooms[block_id].append(room_id)
+        return relations
+
+
 class ScheduleBlockCreateSerializer(serializers.ModelSerializer):
     lecturers = ScheduleBlockLecturerCreateSerializer(many=True)
 
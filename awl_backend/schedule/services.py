@@ -1,30 +1,47 @@
 import calendar
 import logging
-from dataclasses import dataclass
-from datetime import datetime, date
-from typing import Dict, Any, Optional, List, Union, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, date, time, timedelta
+from itertools import repeat
+from typing import Dict, Any, Optional, List, Union, Tuple, BinaryIO, Sequence, Type
 from uuid import UUID
 
-from django.db.models import F
+from django.conf import settings
+from django.db.models import F, Model, Q
+from django.utils import timezone
 from openpyxl import Workbook
 
 from django.contrib.admin.models import ADDITION, CHANGE, DELETION
 from django.core.exceptions import ValidationError
-from django.db import transaction, IntegrityError
+from django.db import transaction, IntegrityError, DatabaseError, DEFAULT_DB_ALIAS
 from openpyxl.cell import Cell
 from openpyxl.reader.excel import load_workbook
-from openpyxl.styles.borders import Side
+from openpyxl.utils import get_column_letter
 from openpyxl.worksheet.worksheet import Worksheet
 
-from common.utils import django_log_action
+from common.utils import django_log_action, BulkLogActions
 from common.validators import validate_user_permission
 from courses.models import Course
 from lecturers.models import Lecturer
 from rooms.models import Room
 from schedule.consts import AMOUNT_OF_TIME_BLOCK_PER_DAY, HOUR_BLOCK_START_TIMESPANS, DEFAULT_MODULE_TYPE, \
-    MODULE_TYPES_TUPLE
+    MODULE_TYPES_TUPLE, MODULE_DETECTION_ENGINE_WALK, MODULE_DETECTION_ENGINE_COMPONENTS, EXCEL_READER_OPENPYXL, \
+    EXCEL_READER_STREAMING, SCHEDULE_PARSER_VERSION, IMPORT_JOB_QUEUED, IMPORT_JOB_RUNNING, IMPORT_JOB_FINISHED, \
+    IMPORT_JOB_FAILED
+from schedule.excel_cache import ParseCache, get_file_hash, dump_schedule_days, load_schedule_days
+from schedule.excel_components import label_module_ranges
+from schedule.excel_parallel import init_worker, parse_day, attach_day
+from schedule.excel_reader import probe_workbook, read_worksheet_snapshot, WorksheetNotFoundError
 from schedule.excel_colours import theme_and_tint_to_rgb
-from schedule.models import ScheduleBlock, Schedule, LecturerScheduleBlockThrough
+from schedule.excel_snapshot import (
+    WorksheetSnapshot, SnapshotCell, CellMask, BORDER_TOP, BORDER_BOTTOM, BORDER_LEFT, BORDER_RIGHT, NO_COLOUR,
+    ANCHOR_VALUE_TYPES
+)
+from schedule.models import (
+    ScheduleBlock, Schedule, LecturerScheduleBlockThrough, ScheduleImportJob, SchedulePublication
+)
+from schedule.response_cache import bump_data_version, SCHEDULE_DATA, PUBLISHED_DATA
 from schedule.selectors import ScheduleBlockSelector
 from users.models import User, Group
 
@@ -105,6 +122,7 @@ class ScheduleBlockService:
         if rooms:
             self.set_schedule_block_rooms(user, schedule_block, rooms)
 
+        bump_data_version(SCHEDULE_DATA)
         return schedule_block
 
     @transaction.atomic()
@@ -138,6 +156,7 @@ class ScheduleBlockService:
         if rooms is not None:
             self.set_schedule_block_rooms(user, schedule_block, rooms)
 
+        bump_data_version(SCHEDULE_DATA)
         return schedule_block
 
     @staticmethod
@@ -148,12 +167,15 @@ class ScheduleBlockService:
         schedule_block.delete()
 
         django_log_action(user=user, obj=schedule_block, action_flag=DELETION)
+        bump_data_version(SCHEDULE_DATA)
         return None
 
 
 @dataclass
 class ExcelScheduleService:
     current_workbook = None
+    current_worksheet = None
+    current_snapshot = None
 
     @staticmethod
     def load_workbook(path: str) -> Workbook:
@@ -170,28 +192,140 @@ class ExcelScheduleService:
             raise ValidationError("Arkusz nie istnieje w pliku")
 
     @staticmethod
-    def get_cell(worksheet: Worksheet, row: int, column: int) -> Cell:
+    def load_worksheet_snapshot(path: str, worksheet: str) -> WorksheetSnapshot:
+        try:
+            return read_worksheet_snapshot(path, worksheet)
+        except WorksheetNotFoundError:
+            raise ValidationError("Arkusz nie istnieje w pliku")
+        except Exception as ex:
+            raise ValidationError(f"Błąd podczas odczytu pliku excel: {ex}")
+
+    @staticmethod
+    def get_cell(worksheet: Union[Worksheet, WorksheetSnapshot], row: int, column: int) -> Union[Cell, SnapshotCell]:
         return worksheet.cell(row=row, column=column)
 
+    def get_worksheet_snapshot(self, worksheet: Union[Worksheet, WorksheetSnapshot]) -> WorksheetSnapshot:
+        """Returns snapshot of the worksheet, it is built only once per worksheet"""
+        if isinstance(worksheet, WorksheetSnapshot):
+            return worksheet
+        if self.current_worksheet is not worksheet:
+            log.debug(f"Building snapshot of worksheet {worksheet.title}")
+            self.current_snapshot = WorksheetSnapshot.from_worksheet(worksheet, self.get_cell_colour)
+            self.current_worksheet = worksheet
+        return self.current_snapshot
+
+    @staticmethod
+    def get_excel_file_metadata(
+        file: Union[str, BinaryIO], worksheet: Optional[str] = None, with_dates: bool = False
+    ) -> Dict[str, Any]:
+        """Reads worksheet names (and worksheet dimensions and dates) without loading the whole workbook"""
+        try:
+            return probe_workbook(file, worksheet, with_dates)
+        except Exception as ex:
+            raise ValidationError(f"Błąd podczas odczytu pliku excel: {ex}")
+
     def get_excel_file_worksheet_list(self, path: str) -> List[str]:
-        wb = self.load_workbook(path)
-        return wb.sheetnames
+        return self.get_excel_file_metadata(path)["worksheets"]
+
+    def validate_excel_file(self, file: Union[str, BinaryIO], worksheet: str, year: int, month: int) -> Dict[str, Any]:
+        """Checks if worksheet exists in the file and has days of given month, before it is fully parsed"""
+        metadata = self.get_excel_file_metadata(file, worksheet, with_dates=True)
+        if worksheet not in metadata["worksheets"]:
+            raise ValidationError(
+                {"worksheet_name": f"Arkusz nie istnieje w pliku (dostępne: {', '.join(metadata['worksheets'])})"}
+            )
+        if (year, month) not in metadata["months"]:
+            found = ", ".join(f"{_month:02}/{_year}" for _year, _month in metadata["months"]) or "brak"
+            raise ValidationError(
+                {"month": f"Brak dni w arkuszu dla podanego miesiąca (znalezione miesiące: {found})"}
+            )
+        return metadata
+
+    @staticmethod
+    def get_parse_cache() -> Optional[ParseCache]:
+        if not settings.SCHEDULE_PARSE_CACHE_DIR:
+            return None
+        return ParseCache(
+            directory=settings.SCHEDULE_PARSE_CACHE_DIR, max_size=settings.SCHEDULE_PARSE_CACHE_MAX_SIZE
+        )
+
+    def parse_excel_file(self, path: str, worksheet: str, year: int, month: int) -> Dict[str, Any]:
+        """
+        Parses every day of the month with its modules (under `schedule` key of the day info).
+        Result is cached by file content, cached result has no workbook nor worksheet loaded
+        and cells of its days and modules are `CachedCell` (coordinates only).
+        """
+        cache = self.get_parse_cache()
+        if cache:
+            try:
+                file_hash = get_file_hash(path)
+            except OSError as ex:
+                raise ValidationError(f"Błąd podczas odczytu pliku excel: {ex}")
+            version = f"{SCHEDULE_PARSER_VERSION}:{settings.SCHEDULE_MODULE_DETECTION_ENGINE}"
+            key = cache.get_key(file_hash, worksheet, year, month, version)
+            if schedule_days := cache.get(key):
+                log.debug(f"Parsed schedule found in cache [{path}: {worksheet} {month:02}/{year}]")
+                return {
+                    "workbook": None,
+                    "worksheet": None,
+                    "year": year,
+                    "month": month,
+                    "schedule_days": load_schedule_days(schedule_days),
+                }
+
+        excel_schedule_info = self.init_excel_worksheet(path, worksheet, year, month)
+        for day_schedule_info in excel_schedule_info["schedule_days"]:
+            # modules of the day are already found when days were parsed in parallel
+            if "error" not in day_schedule_info and "schedule" not in day_schedule_info:
+                day_schedule_info["schedule"] = self.get_schedule_for_single_day(day_schedule_info)
 
-    def init_excel_worksheet(self, path: str, worksheet: str, year: int, month: int) -> Dict[str, Any]:
-        wb = self.load_workbook(path)
+        if cache:
+            try:
+                cache.set(key, dump_schedule_days(excel_schedule_info["schedule_days"]))
+            except OSError as ex:
+                log.warning(f"Parsed schedule could not be cached [{ex}]")
+        return excel_schedule_info
+
+    def init_excel_worksheet(
+        self, path: str, worksheet: str, year: int, month: int, reader: Optional[str] = None,
+        workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        reader = reader or settings.SCHEDULE_EXCEL_READER
+        if reader == EXCEL_READER_OPENPYXL:
+            wb = self.load_workbook(path)
+            ws = self.load_worksheet(wb, worksheet)
+        elif reader == EXCEL_READER_STREAMING:
+            # snapshot is parsed in place of the worksheet, there is no workbook loaded
+            wb = None
+            ws = self.load_worksheet_snapshot(path, worksheet)
+        else:
+            raise ValidationError(f"Nieznany sposób odczytu pliku excel [{reader}]")
         self.current_workbook = wb
-        ws = self.load_worksheet(wb, worksheet)
+        # days are looked up in the anchor index and their lower boundaries in the column border profile,
+        # both are built with one pass over the worksheet
+        snapshot = self.get_worksheet_snapshot(ws)
+        snapshot.get_anchor_index()
+        snapshot.get_column_profile()
         schedule_days = []
         added_days = 0
         last_day_of_month = calendar.monthrange(year, month)[1]
-        for day in range(1, last_day_of_month):
-            try:
-                schedule_days.append(self.get_single_day_schedule_info(ws, year, month, day))
-                added_days += 1
-            except ValidationError as ex:
-                error = {"date": date(day=day, month=month, year=year), "error": f"{ex}"}
-                log.warning(error)
-                schedule_days.append(error)
+        workers = workers or settings.SCHEDULE_PARSE_WORKERS
+        if workers > 1:
+            schedule_days = self.parse_schedule_days_in_parallel(ws, year, month, range(1, last_day_of_month), workers)
+            for day_schedule_info in schedule_days:
+                if "error" in day_schedule_info:
+                    log.warning(day_schedule_info)
+                else:
+                    added_days += 1
+        else:
+            for day in range(1, last_day_of_month):
+                try:
+                    schedule_days.append(self.get_single_day_schedule_info(ws, year, month, day))
+                    added_days += 1
+                except ValidationError as ex:
+                    error = {"date": date(day=day, month=month, year=year), "error": f"{ex}"}
+                    log.warning(error)
+                    schedule_days.append(error)
 
         if not added_days:
             raise ValidationError("Brak dni w arkuszu dla podenego miesiąca")
@@ -204,9 +338,30 @@ class ExcelScheduleService:
             "schedule_days": schedule_days,
         }
 
+    def parse_schedule_days_in_parallel(
+        self, worksheet: Worksheet, year: int, month: int, days: Sequence[int], workers: int,
+        engine: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Parses days in a process pool, every day info has its modules already found (under `schedule` key).
+        Days are returned in the given order, cells of the results belong to the given worksheet.
+        """
+        snapshot = self.get_worksheet_snapshot(worksheet)
+        engine = engine or settings.SCHEDULE_MODULE_DETECTION_ENGINE
+        service_path = f"{type(self).__module__}.{type(self).__qualname__}"
+        log.debug(f"Parsing {len(days)} days with {workers} workers")
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(days)), initializer=init_worker, initargs=(service_path, snapshot)
+        ) as executor:
+            return [
+                attach_day(day_schedule_info, worksheet, snapshot)
+                for day_schedule_info in executor.map(parse_day, repeat(year), repeat(month), days, repeat(engine))
+            ]
+
     def get_single_day_schedule_info(self, worksheet: Worksheet, year: int, month: int, day: int) -> Dict[str, Any]:
         _date = datetime(day=day, month=month, year=year)
         log.debug(f"Looking for day {_date.date()}")
+        snapshot = self.get_worksheet_snapshot(worksheet)
 
         date_cell = self.get_cell_with_value(worksheet, _date, exact=True)
 
@@ -217,51 +372,38 @@ class ExcelScheduleService:
         ending_cell = self.find_lower_boundary_of_column(worksheet, date_cell.column + 12)
         log.debug({"starting_cell": starting_cell, "ending_cell": ending_cell})
 
-        excluded_cells = []
+        excluded_cells = CellMask()
 
         groups = []
         groups_column = starting_cell.column
-        group_rows: List[Tuple[Cell]] = worksheet.iter_rows(
-            min_col=groups_column,
-            max_col=groups_column,
-            min_row=starting_cell.row,
-            max_row=ending_cell.row
-        )
         group_name_parts = []
         last_group_start = starting_cell.row
-        for row in group_rows:
-            cell = row[0]
-            cell_under = self.get_cell(worksheet, row=cell.row + 1, column=groups_column)
-            if value := cell.value:
+        for row in range(starting_cell.row, ending_cell.row + 1):
+            if value := snapshot.get_value(row, groups_column):
                 group_name_parts.append(f"{value}")
-            if cell.border.bottom.style or cell_under.border.top.style:
+            if (
+                snapshot.has_border(row, groups_column, BORDER_BOTTOM)
+                or snapshot.has_border(row + 1, groups_column, BORDER_TOP)
+            ):
                 group_name_parts = list(filter(None, group_name_parts))
                 group_name = " ".join(group_name_parts)
                 parsed_group_name = group_name.replace(" ", "")
                 if len(parsed_group_name) <= 2:
-                    for row_in_last_range in range(last_group_start, cell.row + 1):
-                        cells_to_exclude = worksheet.iter_cols(
-                            min_col=starting_cell.column,
-                            max_col=ending_cell.column,
-                            min_row=row_in_last_range,
-                            max_row=row_in_last_range
-                        )
-                        for cell_to_exclude in cells_to_exclude:
-                            if cell_to_exclude[0] not in excluded_cells:
-                                excluded_cells.append(cell_to_exclude[0])
+                    excluded_cells.add_range(last_group_start, starting_cell.column, row, ending_cell.column)
                 else:
                     _group = {
                         "name": group_name,
                         "start_row": last_group_start,
-                        "end_row": cell.row
+                        "end_row": row
                     }
                     log.debug(f"Group found: {_group}")
                     groups.append(_group)
                 group_name_parts = []
-                last_group_start = cell.row + 1
+                last_group_start = row + 1
 
         return {
             "worksheet": worksheet,
+            "snapshot": snapshot,
             "date": _date.date(),
             "starting_cell": starting_cell,
             "ending_cell": ending_cell,
@@ -269,8 +411,21 @@ class ExcelScheduleService:
             "excluded_cells": excluded_cells,
         }
 
-    def get_schedule_for_single_day(self, single_day_schedule_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def get_schedule_for_single_day(
+        self, single_day_schedule_info: Dict[str, Any], engine: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        engine = engine or settings.SCHEDULE_MODULE_DETECTION_ENGINE
+        if engine == MODULE_DETECTION_ENGINE_WALK:
+            return self.walk_schedule_for_single_day(single_day_schedule_info)
+        if engine == MODULE_DETECTION_ENGINE_COMPONENTS:
+            return self.label_schedule_for_single_day(single_day_schedule_info)
+        raise ValidationError(f"Nieznany silnik wykrywania modułów [{engine}]")
+
+    def walk_schedule_for_single_day(self, single_day_schedule_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Finds modules by walking every hour column of the day, row by row"""
         worksheet: Worksheet = single_day_schedule_info["worksheet"]
+        snapshot: WorksheetSnapshot = single_day_schedule_info["snapshot"]
+        excluded_cells: CellMask = single_day_schedule_info["excluded_cells"]
         end_row = single_day_schedule_info["ending_cell"].row
         schedule = []
 
@@ -279,35 +434,58 @@ class ExcelScheduleService:
         schedule_starting_column = single_day_schedule_info["starting_cell"].column + 1
         for schedule_hour in range(AMOUNT_OF_TIME_BLOCK_PER_DAY):
             current_row = schedule_starting_row
+            current_column = schedule_starting_column + schedule_hour
             while current_row < end_row:
-                cell = self.get_cell(worksheet, row=current_row, column=schedule_starting_column + schedule_hour)
-                if cell in single_day_schedule_info["excluded_cells"]:
-                    log.debug(f"Current cell: {cell.coordinate} excluded")
+                if (current_row, current_column) in excluded_cells:
+                    log.debug(f"Current cell: {get_column_letter(current_column)}{current_row} excluded")
                     current_row += 1
                     continue
-                log.debug(f"Current cell: {cell.coordinate}")
+                log.debug(f"Current cell: {get_column_letter(current_column)}{current_row}")
 
-                if cell.value:
+                if snapshot.get_value(current_row, current_column):
+                    cell = self.get_cell(worksheet, row=current_row, column=current_column)
                     schedule_block = self.get_module_info(single_day_schedule_info, cell)
                     schedule.append(schedule_block)
-                    cells_to_exclude = worksheet.iter_cols(
-                        min_col=schedule_block["starting_cell"].column,
-                        max_col=schedule_block["ending_cell"].column,
-                        min_row=schedule_block["starting_cell"].row,
-                        max_row=schedule_block["ending_cell"].row
+                    excluded_cells.add_range(
+                        schedule_block["starting_cell"].row,
+                        schedule_block["starting_cell"].column,
+                        schedule_block["ending_cell"].row,
+                        schedule_block["ending_cell"].column,
                     )
-                    for column in cells_to_exclude:
-                        single_day_schedule_info["excluded_cells"].extend(column)
 
                     current_row = schedule_block["ending_cell"].row + 1
                 else:
                     current_row += 3
         return schedule
 
-    def get_module_info(self, single_day_schedule_info: Dict[str, Any], starting_cell: Cell) -> Dict[str, Any]:
+    def label_schedule_for_single_day(self, single_day_schedule_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Finds all modules of the day at once, by labelling connected slots of the day block"""
+        worksheet: Worksheet = single_day_schedule_info["worksheet"]
+        module_ranges = label_module_ranges(
+            single_day_schedule_info["snapshot"],
+            single_day_schedule_info["excluded_cells"],
+            start_row=single_day_schedule_info["starting_cell"].row,
+            end_row=single_day_schedule_info["ending_cell"].row,
+            # zaczynamy od drugiej kolumny planu (następna po grupach)
+            first_column=single_day_schedule_info["starting_cell"].column + 1,
+            last_column=single_day_schedule_info["ending_cell"].column,
+        )
+        return [
+            self.get_module_info(
+                single_day_schedule_info,
+                self.get_cell(worksheet, row=start_row, column=start_column),
+                self.get_cell(worksheet, row=end_row, column=end_column),
+            )
+            for start_row, start_column, end_row, end_column in module_ranges
+        ]
+
+    def get_module_info(
+        self, single_day_schedule_info: Dict[str, Any], starting_cell: Cell, ending_cell: Optional[Cell] = None
+    ) -> Dict[str, Any]:
         log.debug(f"Getting module info for cell: {starting_cell.coordinate}")
         worksheet: Worksheet = single_day_schedule_info["worksheet"]
-        starting_cell, ending_cell = self.get_module_range(single_day_schedule_info, starting_cell)
+        if not ending_cell:
+            starting_cell, ending_cell = self.get_module_range(single_day_schedule_info, starting_cell)
         start, end = self.get_module_times(single_day_schedule_info, starting_cell, ending_cell)
         name = self.get_module_name(starting_cell)
         _module_info = {
@@ -328,48 +506,42 @@ class ExcelScheduleService:
     def get_module_range(self, single_day_schedule_info: Dict[str, Any], starting_cell: Cell) -> Tuple[Cell, Cell]:
         log.debug(f"Getting module range [starting cell: {starting_cell.coordinate}]")
         worksheet = single_day_schedule_info["worksheet"]
-        bg_colour = self.get_cell_colour(starting_cell)
+        snapshot = self.get_worksheet_snapshot(worksheet)
+        row, column = starting_cell.row, starting_cell.column
+        bg_colour = snapshot.get_colour(row, column)
 
         log.debug(f"Getting module last column")
-        end_cell_column = starting_cell.column + 0
+        end_cell_column = column + 0
         while True:
             if end_cell_column > single_day_schedule_info["ending_cell"].column:
                 raise ValidationError("Błąd podczas próby pobrania wielkości modułu")
 
-            possible_end_of_module = self.get_cell(
-                worksheet, row=starting_cell.row, column=end_cell_column
-            )
-            possible_start_of_next_module = self.get_cell(
-                worksheet, row=starting_cell.row, column=possible_end_of_module.column + 1
-            )
-            log.debug(f"Current cell: {possible_end_of_module.coordinate}")
-            if possible_end_of_module.border.right.style or possible_start_of_next_module.border.left.style:
+            if (
+                snapshot.has_border(row, end_cell_column, BORDER_RIGHT)
+                or snapshot.has_border(row, end_cell_column + 1, BORDER_LEFT)
+            ):
                 break
 
-            colour_to_check = self.get_cell_colour(possible_start_of_next_module)
-            if bg_colour != "00000000" and colour_to_check != bg_colour:
+            colour_to_check = snapshot.get_colour(row, end_cell_column + 1)
+            if bg_colour != NO_COLOUR and colour_to_check != bg_colour:
                 break
 
             end_cell_column += 1
 
         log.debug(f"Getting module last row")
-        end_cell_row = starting_cell.row + 2
+        end_cell_row = row + 2
         while True:
             if end_cell_row > single_day_schedule_info["ending_cell"].row:
                 raise ValidationError(f"Błąd podczas próby pobrania wielkości modułu [{starting_cell.coordinate}]")
 
-            possible_end_of_module = self.get_cell(
-                worksheet, row=end_cell_row, column=starting_cell.column
-            )
-            possible_start_of_next_module = self.get_cell(
-                worksheet, row=possible_end_of_module.row + 1, column=starting_cell.column
-            )
-            log.debug(f"Current cell: {possible_end_of_module.coordinate}")
-            if possible_end_of_module.border.bottom.style or possible_start_of_next_module.border.top.style:
+            if (
+                snapshot.has_border(end_cell_row, column, BORDER_BOTTOM)
+                or snapshot.has_border(end_cell_row + 1, column, BORDER_TOP)
+            ):
                 break
 
-            bg_colour_to_check = self.get_cell_colour(possible_start_of_next_module)
-            if bg_colour not in ["00000000", "FFFFFF00"] and bg_colour_to_check not in [bg_colour, "FFFFFF00"]:
+            bg_colour_to_check = snapshot.get_colour(end_cell_row + 1, column)
+            if bg_colour not in [NO_COLOUR, "FFFFFF00"] and bg_colour_to_check not in [bg_colour, "FFFFFF00"]:
                 break
 
             end_cell_row += 3
@@ -415,19 +587,14 @@ class ExcelScheduleService:
         )
         return [group["name"] for group in filtered_groups]
 
-    @classmethod
-    def get_module_lecturers(cls, worksheet: Worksheet, starting_cell: Cell, ending_cell: Cell) -> List[Dict[str, Any]]:
+    def get_module_lecturers(
+        self, worksheet: Worksheet, starting_cell: Cell, ending_cell: Cell
+    ) -> List[Dict[str, Any]]:
         log.debug("Getting module lecturers")
+        snapshot = self.get_worksheet_snapshot(worksheet)
         lecturers = []
-        lecturer_rows = worksheet.iter_rows(
-            min_col=starting_cell.column,
-            max_col=starting_cell.column,
-            min_row=starting_cell.row + 1,
-            max_row=ending_cell.row
-        )
-        for row in lecturer_rows:
-            cell = row[0]
-            lecturer_name: Optional[str] = f"{cell.value or ''}"
+        for row in range(starting_cell.row + 1, ending_cell.row + 1):
+            lecturer_name: Optional[str] = f"{snapshot.get_value(row, starting_cell.column) or ''}"
             lecturer_name = lecturer_name.replace("/", ",")
             if not lecturer_name or any(char.isdigit() for char in lecturer_name):
                 return lecturers
@@ -436,8 +603,8 @@ class ExcelScheduleService:
                 # pobieramy salę przypisaną do prowadzącego (sala obok jego nazwiska)
                 # lub jeśli nie ma jej podanej bierzemy domyślną salę z dolnego prawego rogu bloku
                 lecturer_room = (
-                    cls.get_cell(worksheet, row=cell.row, column=ending_cell.column).value
-                    or ending_cell.value
+                    snapshot.get_value(row, ending_cell.column)
+                    or snapshot.get_value(ending_cell.row, ending_cell.column)
                     or "brak"
                 )
                 lecturers.append(
@@ -448,26 +615,19 @@ class ExcelScheduleService:
                 )
         return lecturers
 
-    @classmethod
-    def get_module_rooms(cls, worksheet: Worksheet, starting_cell: Cell, ending_cell: Cell) -> List[str]:
+    def get_module_rooms(self, worksheet: Worksheet, starting_cell: Cell, ending_cell: Cell) -> List[str]:
         log.debug("Getting module rooms")
+        snapshot = self.get_worksheet_snapshot(worksheet)
         rooms = []
-        room_rows = worksheet.iter_rows(
-            min_col=ending_cell.column,
-            max_col=ending_cell.column,
-            min_row=starting_cell.row + 1,
-            max_row=ending_cell.row
-        )
-        for row in room_rows:
-            cell = row[0]
-            room_name: str = f"{cell.value or ''}"
+        for row in range(starting_cell.row + 1, ending_cell.row + 1):
+            room_name: str = f"{snapshot.get_value(row, ending_cell.column) or ''}"
             if not room_name:
                 continue
             rooms.append(room_name)
         return rooms
 
     def get_cell_colour(self, cell: Cell) -> str:
-        colour = "00000000"
+        colour = NO_COLOUR
         if cell.fill.fgColor.type == "theme":
             theme = cell.fill.fgColor.theme
             tint = cell.fill.fgColor.tint
@@ -479,7 +639,8 @@ class ExcelScheduleService:
     def get_module_colour(self, starting_cell: Cell) -> str:
         log.debug("Getting module colour")
         try:
-            colour = self.get_cell_colour(starting_cell)
+            snapshot = self.get_worksheet_snapshot(starting_cell.parent)
+            colour = snapshot.get_colour(starting_cell.row, starting_cell.column)
             if len(colour) == 6:
                 return f"#00{colour}"
             if len(colour) == 8:
@@ -490,39 +651,259 @@ class ExcelScheduleService:
             log.error(f"Wrong colour palette [{starting_cell.coordinate}]")
             return ""
 
-    @classmethod
-    def find_lower_boundary_of_column(cls, worksheet: Worksheet, column: int) -> Cell:
+    def find_lower_boundary_of_column(self, worksheet: Worksheet, column: int) -> Cell:
         log.debug(f"Looking for lower boundary of column [{column}]")
-        for row in range(worksheet.max_row, 1, -1):
-            cell = cls.get_cell(worksheet=worksheet, row=row, column=column)
-            if cell.border.top != Side() or cell.border.bottom != Side():
-                return cell
+        snapshot = self.get_worksheet_snapshot(worksheet)
+        # first row is never treated as a boundary
+        if (row := snapshot.get_last_outlined_row(column)) > 1:
+            return self.get_cell(worksheet=worksheet, row=row, column=column)
 
-    @classmethod
     def get_cell_with_value(
-        cls, worksheet: Worksheet, value: Any, _range: Optional[Tuple[Tuple, Tuple]] = None, exact: bool = False
+        self, worksheet: Worksheet, value: Any, _range: Optional[Tuple[Tuple, Tuple]] = None, exact: bool = False
     ) -> Optional[Cell]:
-        start_row, start_col, end_row, end_col = 1, 1, worksheet.max_row, worksheet.max_column
+        snapshot = self.get_worksheet_snapshot(worksheet)
+        if exact and not _range and isinstance(value, ANCHOR_VALUE_TYPES):
+            if coordinates := snapshot.find_anchor(value):
+                return self.get_cell(worksheet=worksheet, row=coordinates[0], column=coordinates[1])
+            return None
+
+        start_row, start_col, end_row, end_col = 1, 1, snapshot.max_row, snapshot.max_column
         if _range:
             start_row, start_col = _range[0]
             end_row, end_col = _range[1]
 
         for row in range(start_row, end_row):
             for column in range(start_col, end_col):
-                cell: Cell = cls.get_cell(worksheet=worksheet, row=row, column=column)
-                cell_value = cell.value
+                cell_value = snapshot.get_value(row, column)
                 if exact:
                     if cell_value == value:
-                        return cell
+                        return self.get_cell(worksheet=worksheet, row=row, column=column)
                 elif f"{value}" in f"{cell_value}":
-                    return cell
+                    return self.get_cell(worksheet=worksheet, row=row, column=column)
         return None
 
 
+@dataclass
+class ScheduleEntities:
+    """Courses, groups, rooms and lecturers used by parsed modules, mapped by their names"""
+
+    courses: Dict[str, Course] = field(default_factory=dict)
+    groups: Dict[str, Group] = field(default_factory=dict)
+    rooms: Dict[str, Room] = field(default_factory=dict)
+    lecturers: Dict[str, Lecturer] = field(default_factory=dict)
+    created_courses: List[Course] = field(default_factory=list)
+    created_groups: List[Group] = field(default_factory=list)
+    created_rooms: List[Room] = field(default_factory=list)
+    created_lecturers: List[Lecturer] = field(default_factory=list)
+
+
+@dataclass
+class PendingScheduleBlock:
+    """Schedule block waiting to be saved, together with its relations and parsed module it was built from"""
+
+    info: Dict[str, Any]
+    schedule_block: ScheduleBlock
+    groups: List[Group]
+    rooms: List[Room]
+    lecturers: List[LecturerScheduleBlockThrough]
+
+    @property
+    def coordinates(self) -> str:
+        return f"{self.info['starting_cell'].coordinate}:{self.info['ending_cell'].coordinate}"
+
+
 @dataclass
 class ScheduleService:
     excel_schedule_service: ExcelScheduleService
 
+    @staticmethod
+    def get_or_create_by_names(
+        model: Type[Model], field_name: str, names: List[str]
+    ) -> Tuple[Dict[str, Any], List[Any]]:
+        """
+        Returns name -> object map and list of created objects (in order of given names).
+        Existing objects are loaded with one query, if there are more objects with the same name the oldest one is used.
+        Names which do not fit in the field are skipped.
+        """
+        max_length = model._meta.get_field(field_name).max_length
+        names = [name for name in dict.fromkeys(names) if len(name) <= max_length]
+        objects = {}
+        for obj in model.objects.filter(**{f"{field_name}__in": names}).order_by("-created_at"):
+            objects[getattr(obj, field_name)] = obj
+
+        missing = [model(**{field_name: name}) for name in names if name not in objects]
+        if model._meta.parents:
+            # multi-table inherited models (e.g. groups) can not be bulk created
+            created = [model.objects.create(**{field_name: getattr(obj, field_name)}) for obj in missing]
+        else:
+            created = model.objects.bulk_create(missing)
+        objects.update({getattr(obj, field_name): obj for obj in created})
+        return objects, created
+
+    def resolve_schedule_entities(self, user: User, schedule_days: List[Dict[str, Any]]) -> ScheduleEntities:
+        """
+        Collects names used by modules of all days, then loads existing courses, groups, rooms and lecturers
+        with one query per model and creates the missing ones.
+        """
+        names: Dict[str, List[str]] = {"courses": [], "groups": [], "rooms": [], "lecturers": []}
+        for day_schedule_info in schedule_days:
+            if "error" in day_schedule_info:
+                continue
+            for _block in day_schedule_info["schedule"]:
+                names["courses"].append(_block["name"])
+                names["groups"].extend(_block["groups"])
+                names["rooms"].extend(_block["rooms"])
+                for _lecturer in _block["lecturers"]:
+                    names["lecturers"].append(_lecturer["name"])
+                    names["rooms"].append(_lecturer["room"])
+
+        entities = ScheduleEntities()
+        entities.courses, entities.created_courses = self.get_or_create_by_names(Course, "name", names["courses"])
+        entities.groups, entities.created_groups = self.get_or_create_by_names(Group, "name", names["groups"])
+        entities.rooms, entities.created_rooms = self.get_or_create_by_names(Room, "name", names["rooms"])
+        entities.lecturers, entities.created_lecturers = self.get_or_create_by_names(
+            Lecturer, "last_name", names["lecturers"]
+        )
+        with BulkLogActions():
+            for obj in [
+                *entities.created_courses,
+                *entities.created_groups,
+                *entities.created_rooms,
+                *entities.created_lecturers,
+            ]:
+                django_log_action(user=user, obj=obj, action_flag=ADDITION)
+
+        log.debug(
+            f"Nowe: kursy {len(entities.created_courses)} / grupy {len(entities.created_groups)} / "
+            f"sale {len(entities.created_rooms)} / prowadzący {len(entities.created_lecturers)}"
+        )
+        return entities
+
+    @staticmethod
+    def get_replaced_schedule_blocks(schedule_days: List[Dict[str, Any]]) -> List[ScheduleBlock]:
+        """
+        Public blocks of groups found in the parsed days, which are replaced by the import (all days in one query).
+        Days are compared as [day, next day) ranges of start and end, so indexes on them can be used.
+        """
+        days_filter = Q()
+        for day_schedule_info in schedule_days:
+            if "error" in day_schedule_info or not day_schedule_info["groups"]:
+                continue
+            day_start = datetime.combine(day_schedule_info["date"], time.min)
+            day_end = day_start + timedelta(days=1)
+            days_filter |= Q(
+                groups__name__in=[group["name"] for group in day_schedule_info["groups"]],
+                start__gte=day_start,
+                start__lt=day_end,
+                end__gte=day_start,
+                end__lt=day_end,
+            )
+        if not days_filter:
+            return []
+        return list(ScheduleBlockSelector.publicated().filter(days_filter).distinct())
+
+    @staticmethod
+    def get_resolved_entity(entities: Dict[str, Any], name: str) -> Any:
+        if (obj := entities.get(name)) is None:
+            raise ValidationError(f"Nie można utworzyć obiektu o nazwie [{name}]")
+        return obj
+
+    def build_schedule_block(
+        self, _block: Dict[str, Any], entities: ScheduleEntities, revision: Optional[Schedule] = None
+    ) -> PendingScheduleBlock:
+        """Builds not saved schedule block (of the schedule revision) with its relations from parsed module"""
+        schedule_block = ScheduleBlock(
+            is_public=False,
+            revision=revision,
+            course_name=_block["name"],
+            course=self.get_resolved_entity(entities.courses, _block["name"]),
+            start=_block["start"],
+            end=_block["end"],
+            type=_block["type"],
+            colour=_block["colour"],
+        )
+        groups = [self.get_resolved_entity(entities.groups, _group) for _group in _block["groups"]]
+        rooms = [self.get_resolved_entity(entities.rooms, _room) for _room in _block["rooms"]]
+        return PendingScheduleBlock(
+            info=_block,
+            schedule_block=schedule_block,
+            # same as `set()`, every group and room is added to the block only once
+            groups=list(dict.fromkeys(groups)),
+            rooms=list(dict.fromkeys(rooms)),
+            lecturers=[
+                LecturerScheduleBlockThrough(
+                    schedule_block=schedule_block,
+                    lecturer=self.get_resolved_entity(entities.lecturers, _lecturer["name"]),
+                    room=self.get_resolved_entity(entities.rooms, _lecturer["room"]),
+                )
+                for _lecturer in _block["lecturers"]
+            ],
+        )
+
+    @staticmethod
+    def bulk_create_schedule_blocks(pending_blocks: List[PendingScheduleBlock]) -> None:
+        ScheduleBlock.objects.bulk_create([pending.schedule_block for pending in pending_blocks])
+        ScheduleBlock.groups.through.objects.bulk_create(
+            [
+                ScheduleBlock.groups.through(scheduleblock=pending.schedule_block, group=group)
+                for pending in pending_blocks
+                for group in pending.groups
+            ]
+        )
+        ScheduleBlock.rooms.through.objects.bulk_create(
+            [
+                ScheduleBlock.rooms.through(scheduleblock=pending.schedule_block, room=room)
+                for pending in pending_blocks
+                for room in pending.rooms
+            ]
+        )
+        LecturerScheduleBlockThrough.objects.bulk_create(
+            [lecturer for pending in pending_blocks for lecturer in pending.lecturers]
+        )
+
+    def create_schedule_blocks(
+        self, user: User, pending_blocks: List[PendingScheduleBlock], result: Dict[str, Any]
+    ) -> None:
+        """
+        Saves blocks in chunks of `SCHEDULE_IMPORT_BATCH_SIZE`, a few queries per chunk.
+        When chunk can not be saved, its blocks are saved one by one, so wrong blocks are reported by their cells.
+        """
+        batch_size = settings.SCHEDULE_IMPORT_BATCH_SIZE
+        with BulkLogActions():
+            for chunk_start in range(0, len(pending_blocks), batch_size):
+                chunk = pending_blocks[chunk_start:chunk_start + batch_size]
+                try:
+                    with transaction.atomic():
+                        self.bulk_create_schedule_blocks(chunk)
+                except DatabaseError:
+                    saved_chunk = []
+                    for pending in chunk:
+                        try:
+                            with transaction.atomic():
+                                self.bulk_create_schedule_blocks([pending])
+                            saved_chunk.append(pending)
+                        except IntegrityError:
+                            result["errors"].append(f"{pending.coordinates} Błąd odczytu wagonika")
+                        except DatabaseError as ex:
+                            log.error(ex)
+                            result["errors"].append(f"{pending.coordinates} Nieznany błąd")
+                    chunk = saved_chunk
+
+                for pending in chunk:
+                    result["added_blocks"].append(pending.schedule_block)
+                    django_log_action(user=user, obj=pending.schedule_block, action_flag=ADDITION)
+
+    @staticmethod
+    def update_schedule_progress(schedule: Schedule, **fields: Any) -> None:
+        """
+        Progress is saved with separate database connection, so it is committed right away and can be seen
+        while import transaction is still running. Import transaction must not lock the schedule row before.
+        """
+        using = settings.SCHEDULE_PROGRESS_DATABASE
+        if using not in settings.DATABASES:
+            using = DEFAULT_DB_ALIAS
+        Schedule.objects.using(using).filter(id=schedule.id).update(**fields)
+
     @transaction.atomic
     def update_schedule_from_excel(self, schedule: Schedule) -> Dict[str, Any]:
         result = {
@@ -534,17 +915,28 @@ class ScheduleService:
             "added_courses": [],
             "errors": []
         }
-        Schedule.objects.filter(id=schedule.id).update(progress=0, status="ONGOING")
+        self.update_schedule_progress(schedule, progress=0, status="ONGOING")
+        # blocks of the previous import are not part of the schedule revision anymore (are never published with it)
+        schedule.revision_blocks.update(revision=None)
 
-        excel_schedule_info = self.excel_schedule_service.init_excel_worksheet(
+        excel_schedule_info = self.excel_schedule_service.parse_excel_file(
             path=schedule.file.path,
             worksheet=schedule.worksheet_name,
             year=schedule.year,
             month=schedule.month
         )
-        Schedule.objects.filter(id=schedule.id).update(progress=20)
+        entities = self.resolve_schedule_entities(schedule.creator, excel_schedule_info["schedule_days"])
+        result["added_courses"] = entities.created_courses
+        result["added_groups"] = entities.created_groups
+        result["added_rooms"] = entities.created_rooms
+        result["added_lecturers"] = entities.created_lecturers
+        result["replaced_blocks"] = self.get_replaced_schedule_blocks(excel_schedule_info["schedule_days"])
+        log.debug(f"Zamienione wagoniki: {len(result['replaced_blocks'])}")
+        self.update_schedule_progress(schedule, progress=20)
 
         progress_step_par_day = 80 / len(excel_schedule_info["schedule_days"])
+        # blocks are written in batches (with their groups, rooms and lecturers), not one by one
+        pending_blocks: List[PendingScheduleBlock] = []
         for day_schedule_info in excel_schedule_info["schedule_days"]:
             _date = day_schedule_info['date']
             if error := day_schedule_info.get("error", None):
@@ -553,108 +945,19 @@ class ScheduleService:
                 result["errors"].append(ex)
                 continue
 
-            group_names = [group["name"] for group in day_schedule_info["groups"]]
-            active_groups_in_schedule = Group.objects.filter(name__in=group_names)
-            replaced_schedule_blocks = ScheduleBlock.objects.filter(
-                groups__in=active_groups_in_schedule,
-                start__date=_date,
-                end__date=_date,
-                is_public=True,
-            )
-            result["replaced_blocks"].extend(replaced_schedule_blocks)
-
-            added_blocks = 0
-            added_groups = 0
-            added_lecturers = 0
-            added_rooms = 0
-            added_courses = 0
-            for _block in self.excel_schedule_service.get_schedule_for_single_day(day_schedule_info):
+            for _block in day_schedule_info["schedule"]:
                 try:
-                    schedule_block = ScheduleBlock(
-                        is_public=False,
-                        course_name=_block["name"],
-                        course=None,
-                        start=_block["start"],
-                        end=_block["end"],
-                        type=_block["type"],
-                        colour=_block["colour"],
-                    )
-                    course, course_created = Course.objects.get_or_create(name=_block["name"])
-                    if course_created:
-                        django_log_action(user=schedule.creator, obj=course, action_flag=ADDITION)
-                        added_courses += 1
-                        result["added_courses"].append(course)
-
-                    schedule_block.course = course
-
-                    schedule_block_groups = []
-                    for _group in _block["groups"]:
-                        group, group_created = Group.objects.get_or_create(name=_group)
-                        if group_created:
-                            django_log_action(user=schedule.creator, obj=group, action_flag=ADDITION)
-                            added_groups += 1
-                            result["added_groups"].append(group)
-
-                        schedule_block_groups.append(group)
-
-                    schedule_block_rooms = []
-                    for _room in _block["rooms"]:
-                        room, room_created = Room.objects.get_or_create(name=_room)
-                        if room_created:
-                            django_log_action(user=schedule.creator, obj=room, action_flag=ADDITION)
-                            added_rooms += 1
-                            result["added_rooms"].append(room)
-
-                        schedule_block_rooms.append(room)
-
-                    schedule_block_lecturers = []
-                    for _lecturer in _block["lecturers"]:
-                        lecturer, lecturer_created = Lecturer.objects.get_or_create(last_name=_lecturer["name"])
-                        if lecturer_created:
-                            django_log_action(user=schedule.creator, obj=lecturer, action_flag=ADDITION)
-                            added_lecturers += 1
-                            result["added_lecturers"].append(lecturer)
-
-                        room, room_created = Room.objects.get_or_create(name=_lecturer["room"])
-                        # jakby sala nie była stworzona w poprzednim forze
-                        if room_created:
-                            django_log_action(user=schedule.creator, obj=room, action_flag=ADDITION)
-                            added_rooms += 1
-                            result["added_rooms"].append(room)
-
-                        schedule_block_lecturers.append(
-                            LecturerScheduleBlockThrough(schedule_block=schedule_block, lecturer=lecturer, room=room)
-                        )
-
-                    schedule_block.save()
-                    schedule_block.rooms.set(schedule_block_rooms)
-                    schedule_block.groups.set(schedule_block_groups)
-                    LecturerScheduleBlockThrough.objects.bulk_create(schedule_block_lecturers)
-                    added_blocks += 1
-                    result["added_blocks"].append(schedule_block)
-                    django_log_action(user=schedule.creator, obj=schedule_block, action_flag=ADDITION)
+                    pending_blocks.append(self.build_schedule_block(_block, entities, revision=schedule))
                 except ValidationError as ex:
                     result["errors"].append(f"{ex}")
-                except IntegrityError:
-                    result["errors"].append(
-                        f"{_block['starting_cell'].coordinate}:{_block['ending_cell'].coordinate} Błąd odczytu wagonika"
-                    )
-                except Exception as ex:
-                    log.error(ex)
-                    result["errors"].append(
-                        f"{_block['starting_cell'].coordinate}:{_block['ending_cell'].coordinate} Nieznany błąd"
-                    )
 
-            log_dict = {
-                "wagoniki": added_blocks,
-                "grupy": added_groups,
-                "sale": added_rooms,
-                "prowadzący": added_lecturers,
-                "kursy": added_courses
-            }
-            log.debug(f"{_date}: zamieniono {replaced_schedule_blocks.count()} / nowe {log_dict}")
-            Schedule.objects.filter(id=schedule.id).update(progress=F("progress") + progress_step_par_day)
+            if len(pending_blocks) >= settings.SCHEDULE_IMPORT_BATCH_SIZE:
+                self.create_schedule_blocks(schedule.creator, pending_blocks, result)
+                pending_blocks = []
+            self.update_schedule_progress(schedule, progress=F("progress") + progress_step_par_day)
 
+        self.create_schedule_blocks(schedule.creator, pending_blocks, result)
+        # import is finished together with its transaction (progress connection does not touch the row anymore)
         Schedule.objects.filter(id=schedule.id).update(progress=100, status="FINISHED")
 
         schedule.refresh_from_db()
@@ -674,25 +977,94 @@ class ScheduleService:
         if schedule.status not in ["FINISHED", "REVERTED"]:
             raise ValidationError("Plan nie został pobrany z pliku")
 
-        schedule.replaced_schedule_blocks.update(is_public=False)
-        schedule.schedule_blocks.all().update(is_public=True)
-        schedule.lecturers.all().update(is_public=True)
-        schedule.rooms.all().update(is_public=True)
-        schedule.courses.all().update(is_public=True)
-        schedule.groups.all().update(is_public=True)
+        # selectors read visibility through publications, so its size does not depend on size of the schedule
+        SchedulePublication.objects.get_or_create(schedule=schedule)
+        bump_data_version(*PUBLISHED_DATA)
         schedule.status = "PUBLICATED"
-        schedule.save()
+        schedule.save(update_fields=["status", "updated_at"])
 
     @transaction.atomic
     def revert_schedule_publication(self, schedule: Schedule) -> None:
         if schedule.status != "PUBLICATED":
             raise ValidationError("Plan nie został opublikowany")
 
-        schedule.replaced_schedule_blocks.update(is_public=True)
-        schedule.schedule_blocks.all().update(is_public=False)
-        schedule.lecturers.all().update(is_public=False)
-        schedule.rooms.all().update(is_public=False)
-        schedule.courses.all().update(is_public=False)
-        schedule.groups.all().update(is_public=False)
+        SchedulePublication.objects.filter(schedule=schedule).delete()
+        bump_data_version(*PUBLISHED_DATA)
         schedule.status = "REVERTED"
-        schedule.save()
+        schedule.save(update_fields=["status", "updated_at"])
+
+
+@dataclass
+class ScheduleImportJobService:
+    schedule_service: ScheduleService
+
+    @staticmethod
+    def fail_stale_schedule_import_jobs() -> int:
+        """
+        Fails running jobs started longer than `SCHEDULE_IMPORT_JOB_TIMEOUT` ago, their worker died
+        (import transaction was rolled back), so schedule can be imported again.
+        """
+        started_before = timezone.now() - timedelta(seconds=settings.SCHEDULE_IMPORT_JOB_TIMEOUT)
+        stale_jobs = ScheduleImportJob.objects.filter(status=IMPORT_JOB_RUNNING, started_at__lt=started_before)
+        if not (schedule_ids := list(stale_jobs.values_list("schedule_id", flat=True))):
+            return 0
+
+        error = "Import został przerwany (przekroczono czas importu)"
+        count = stale_jobs.update(
+            status=IMPORT_JOB_FAILED, error=error, finished_at=timezone.now(), updated_at=timezone.now()
+        )
+        Schedule.objects.filter(id__in=schedule_ids).update(status="FAILED", errors=[error])
+        log.warning(f"Stale schedule import jobs failed [{', '.join(str(_id) for _id in schedule_ids)}]")
+        return count
+
+    def enqueue_schedule_import(self, schedule: Schedule) -> ScheduleImportJob:
+        self.fail_stale_schedule_import_jobs()
+        # blocks of the import would be public right away, publication has to be reverted first
+        if schedule.status == "PUBLICATED":
+            raise ValidationError("Plan jest opublikowany, cofnij publikacje przed ponownym pobraniem")
+        if schedule.import_jobs.filter(status__in=[IMPORT_JOB_QUEUED, IMPORT_JOB_RUNNING]).exists():
+            raise ValidationError("Import planu jest już w kolejce")
+        job = ScheduleImportJob.objects.create(schedule=schedule)
+        Schedule.objects.filter(id=schedule.id).update(progress=0, status="QUEUED")
+        log.debug(f"Schedule import queued [{schedule.id}]")
+        return job
+
+    def claim_schedule_import_job(self, worker: str) -> Optional[ScheduleImportJob]:
+        """
+        Takes the oldest queued job. Jobs locked by other workers (being claimed at the same time) are skipped,
+        so every job is taken by one worker only. Job is marked as running when its claim is committed.
+        Jobs left running by dead workers are failed first.
+        """
+        self.fail_stale_schedule_import_jobs()
+        with transaction.atomic():
+            job = (
+                ScheduleImportJob.objects.select_for_update(skip_locked=True)
+                .filter(status=IMPORT_JOB_QUEUED)
+                .order_by("created_at")
+                .first()
+            )
+            if job:
+                job.status = IMPORT_JOB_RUNNING
+                job.worker = worker
+                job.started_at = timezone.now()
+                job.save(update_fields=["status", "worker", "started_at", "updated_at"])
+        return job
+
+    def run_schedule_import_job(self, job: ScheduleImportJob) -> ScheduleImportJob:
+        try:
+            self.schedule_service.update_schedule_from_excel(job.schedule)
+            job.status = IMPORT_JOB_FINISHED
+        except Exception as ex:
+            log.error(f"Schedule import failed [{job.schedule_id}]: {ex}")
+            job.status = IMPORT_JOB_FAILED
+            job.error = f"{ex}"
+            # import transaction is rolled back, only its progress was committed
+            Schedule.objects.filter(id=job.schedule_id).update(status="FAILED", errors=[f"{ex}"])
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        return job
+
+    def run_next_schedule_import_job(self, worker: str) -> Optional[ScheduleImportJob]:
+        if job := self.claim_schedule_import_job(worker):
+            return self.run_schedule_import_job(job)
+        return None
@@ -1,29 +1,70 @@
 import logging
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from array import array
 from datetime import timedelta, date, datetime
+from io import BytesIO, StringIO
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+from zipfile import ZipFile
 
 import freezegun
+from django.contrib.admin.models import LogEntry, ADDITION, CHANGE
+from django.contrib.contenttypes.models import ContentType
+from django.conf import settings
+from django.core.cache import caches
 from django.core.exceptions import ValidationError
-from django.test import TestCase, Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction, connection
+from django.db.models import ProtectedError
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import http_date
 from openpyxl.cell import Cell
+from openpyxl.styles.borders import Side
 from openpyxl.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
+from rest_framework.renderers import BrowsableAPIRenderer
 
 from common.container import container
+from common.utils import BulkLogActions, django_log_action
 from courses.models import Course
+from courses.selectors import CourseSelector
 from lecturers.models import Lecturer
+from lecturers.selectors import LecturerSelector
 from rooms.models import Room
-from schedule.models import ScheduleBlock, Schedule
-from schedule.serializers import ScheduleBlockSerializer
-from schedule.services import ExcelScheduleService
+from rooms.selectors import RoomSelector
+from schedule import excel_colours
+from schedule.admin import ScheduleAdminForm
+from schedule.excel_cache import ParseCache, CachedCell
+from schedule.excel_components import NEUTRAL_COLOUR, label_module_ranges
+from schedule import excel_reader
+from schedule.excel_reader import read_worksheet_snapshot
+from schedule.excel_snapshot import (
+    BORDER_TOP, BORDER_BOTTOM, BORDER_LEFT, BORDER_RIGHT, NO_COLOUR, CellMask, WorksheetSnapshot
+)
+from schedule.models import (
+    ScheduleBlock, Schedule, ScheduleImportJob, SchedulePublication, LecturerScheduleBlockThrough
+)
+from schedule.selectors import ScheduleBlockSelector
+from schedule.serializers import ScheduleBlockSerializer, ScheduleBlockListSerializer
+from schedule.services import ExcelScheduleService, ScheduleEntities, ScheduleService
 from users.models import Group, User
+from users.selectors import GroupSelector
 
 
 class TestScheduleBlockListViewGet(TestCase):
     def setUp(self):
         self.endpoint = reverse("schedule-block-list")
         self.client = Client()
+        # blocks are created here without services, so cached responses would not be invalidated
+        caches[settings.SCHEDULE_RESPONSE_CACHE_ALIAS].clear()
 
     def test_all_published_schedule_blocks_will_be_returned(self):
         start = timezone.now()
@@ -294,6 +335,351 @@ class TestScheduleBlockListViewGet(TestCase):
         self.assertNotIn(ScheduleBlockSerializer(schedule_block2).data, response.data)
         self.assertNotIn(ScheduleBlockSerializer(schedule_block3).data, response.data)
 
+    def test_schedule_blocks_are_filtered_by_whole_days(self):
+        def create_block(start: datetime, end: datetime) -> ScheduleBlock:
+            return ScheduleBlock.objects.create(course_name="Course1", start=start, end=end, is_public=True)
+
+        first_block = create_block(datetime(2023, 10, 2, 0, 0), datetime(2023, 10, 2, 1, 30))
+        last_block = create_block(datetime(2023, 10, 3, 22, 0), datetime(2023, 10, 3, 23, 59, 59))
+        create_block(datetime(2023, 10, 1, 22, 0), datetime(2023, 10, 1, 23, 59, 59))
+        create_block(datetime(2023, 10, 4, 0, 0), datetime(2023, 10, 4, 1, 30))
+
+        response = self.client.get(self.endpoint + "?date_from=2023-10-02&date_to=2023-10-03")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({block["id"] for block in response.data}, {str(first_block.id), str(last_block.id)})
+
+    def test_schedule_blocks_are_paginated_by_cursor(self):
+        start = datetime(2023, 10, 2, 8)
+        schedule_blocks = [
+            ScheduleBlock.objects.create(
+                course_name="Course1", start=start + timedelta(hours=hours), end=start + timedelta(hours=5),
+                is_public=True
+            )
+            for hours in (2, 0, 1, 1, 1)
+        ]
+
+        ids, url, pages = [], self.endpoint + "?page_size=2", 0
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 2)
+            self.assertFalse(any("OFFSET" in query["sql"] for query in queries.captured_queries))
+            ids += [block["id"] for block in response.data["results"]]
+            url, pages = response.data["next"], pages + 1
+
+        self.assertEqual(pages, 3)
+        expected = sorted(schedule_blocks, key=lambda schedule_block: (schedule_block.start, schedule_block.id))
+        self.assertEqual(ids, [str(schedule_block.id) for schedule_block in expected])
+
+    @override_settings(SCHEDULE_MAX_PAGE_SIZE=2)
+    def test_page_size_is_capped(self):
+        start = timezone.now()
+        for i in range(3):
+            ScheduleBlock.objects.create(course_name=f"Course{i}", start=start, end=start, is_public=True)
+
+        response = self.client.get(self.endpoint + "?page_size=100")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        for query in ("?cursor=abc", "?cursor=YWJj", "?page_size=0", "?page_size=abc"):
+            response = self.client.get(self.endpoint + query)
+            self.assertEqual(response.status_code, 400)
+
+    def create_schedule_blocks_with_details(self, first: int, last: int) -> List[ScheduleBlock]:
+        start = timezone.now()
+        schedule_blocks = []
+        for i in range(first, last):
+            schedule_block = ScheduleBlock.objects.create(
+                course_name=f"Course{i}", start=start, end=start + timedelta(hours=1), is_public=True
+            )
+            room = Room.objects.create(name=f"Room{i}")
+            schedule_block.groups.add(Group.objects.create(name=f"Group{i}"))
+            schedule_block.rooms.add(room)
+            LecturerScheduleBlockThrough.objects.create(
+                schedule_block=schedule_block,
+                lecturer=Lecturer.objects.create(first_name="Lecturer", last_name=f"{i}"),
+                room=room,
+            )
+            schedule_blocks.append(schedule_block)
+        return schedule_blocks
+
+    @override_settings(SCHEDULE_RESPONSE_CACHE_TIMEOUT=0)
+    def test_schedule_blocks_are_listed_with_constant_number_of_queries(self):
+        schedule_blocks = self.create_schedule_blocks_with_details(0, 2)
+        # data version (ETag), blocks, lecturers (with their rooms), groups, rooms
+        with self.assertNumQueries(5):
+            response = self.client.get(self.endpoint)
+        self.assertEqual(len(response.data), 2)
+
+        schedule_blocks += self.create_schedule_blocks_with_details(2, 12)
+        with self.assertNumQueries(5):
+            response = self.client.get(self.endpoint)
+        self.assertEqual(len(response.data), 12)
+        for schedule_block in schedule_blocks:
+            self.assertIn(ScheduleBlockSerializer(schedule_block).data, response.data)
+
+    @override_settings(SCHEDULE_RESPONSE_CACHE_TIMEOUT=0)
+    def test_only_requested_fields_and_relations_are_read(self):
+        schedule_block = self.create_schedule_blocks_with_details(0, 1)[0]
+        fields = ("id", "course_name", "start", "end", "type", "colour", "groups")
+
+        # data version (ETag), blocks, groups
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.endpoint + f"?fields={','.join(fields)}")
+        self.assertEqual(len(queries.captured_queries), 3)
+        self.assertNotIn("course_id", queries.captured_queries[1]["sql"])
+        expected = ScheduleBlockSerializer(schedule_block).data
+        self.assertEqual(response.data, [{field: expected[field] for field in fields}])
+
+        # data version (ETag), blocks, groups (no courses)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.endpoint + "?format=compact&fields=start,groups")
+        self.assertEqual(list(response.data), ["blocks", "groups"])
+        self.assertEqual(list(response.data["blocks"][0]), ["start", "groups"])
+
+        response = self.client.get(self.endpoint + "?exclude=lecturers,rooms")
+        self.assertNotIn("lecturers", response.data[0])
+        self.assertEqual(self.client.get(self.endpoint + "?fields=name").status_code, 400)
+
+
+class TestScheduleBlockListViewCache(TestCase):
+    def setUp(self):
+        self.endpoint = reverse("schedule-block-list")
+        self.client = Client()
+        caches[settings.SCHEDULE_RESPONSE_CACHE_ALIAS].clear()
+        self.user = User.objects.create_superuser("test_user", "test@test.django.com")
+        self.group1 = Group.objects.create(name="Group1", is_public=True)
+        self.group2 = Group.objects.create(name="Group2", is_public=True)
+        start = datetime(2023, 10, 2, 8)
+        self.schedule_block = ScheduleBlock.objects.create(
+            course_name="Course1",
+            course=Course.objects.create(name="Course1"),
+            start=start,
+            end=start + timedelta(hours=1),
+            type="W",
+            is_public=True,
+        )
+        self.schedule_block.groups.add(self.group1)
+
+    def test_same_query_is_read_from_cache(self):
+        response = self.client.get(self.endpoint + f"?groups={self.group1.id}&groups={self.group2.id}")
+        self.assertEqual(len(response.data), 1)
+
+        # only data version is read, filters given in other order give the same response
+        with self.assertNumQueries(1):
+            cached_response = self.client.get(self.endpoint + f"?groups={self.group2.id}&groups={self.group1.id}")
+        self.assertEqual(cached_response.data, response.data)
+
+    def test_cached_response_is_not_served_after_schedule_block_is_changed(self):
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.data[0]["course_name"], "Course1")
+
+        container().schedule_block_service.update_schedule_block(
+            self.user, self.schedule_block.id, course_name="Course2"
+        )
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.data[0]["course_name"], "Course2")
+
+        container().schedule_block_service.delete_schedule_block(self.user, self.schedule_block.id)
+        self.assertEqual(self.client.get(self.endpoint).data, [])
+
+    def test_cached_response_is_not_served_after_publication(self):
+        schedule = Schedule.objects.create(creator=self.user, name="TEST", worksheet_name="TEST", status="FINISHED")
+        schedule_block = ScheduleBlock.objects.create(
+            course_name="Course3", start=self.schedule_block.start, end=self.schedule_block.end, revision=schedule
+        )
+        schedule.replaced_schedule_blocks.add(self.schedule_block)
+        self.assertEqual([block["course_name"] for block in self.client.get(self.endpoint).data], ["Course1"])
+
+        container().schedule_service.publicate_schedule(schedule)
+        self.assertEqual([block["id"] for block in self.client.get(self.endpoint).data], [str(schedule_block.id)])
+
+        container().schedule_service.revert_schedule_publication(schedule)
+        self.assertEqual([block["course_name"] for block in self.client.get(self.endpoint).data], ["Course1"])
+
+    def test_cached_response_is_not_served_after_change_in_admin(self):
+        self.assertEqual(self.client.get(self.endpoint).data[0]["groups"][0]["name"], "Group1")
+
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(reverse("admin:users_group_change", args=[self.group1.id]), {"name": "Group3"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(self.endpoint).data[0]["groups"][0]["name"], "Group3")
+
+    def test_not_modified_is_returned_without_reading_schedule_blocks(self):
+        response = self.client.get(self.endpoint + f"?groups={self.group1.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        self.assertFalse(response.has_header("Last-Modified"))
+
+        # only data version is read
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(
+                self.endpoint + f"?groups={self.group1.id}", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b"")
+
+        # other filters are other response
+        other = self.client.get(self.endpoint + f"?groups={self.group2.id}", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(other.status_code, 200)
+        self.assertNotEqual(other["ETag"], response["ETag"])
+
+    def test_etag_depends_on_accepted_representation(self):
+        response = self.client.get(self.endpoint, HTTP_ACCEPT="application/json")
+        self.assertIn("Accept", response["Vary"])
+
+        not_modified = self.client.get(
+            self.endpoint, HTTP_ACCEPT="application/json", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertIn("Accept", not_modified["Vary"])
+
+        # browsable API is other representation of the same data (its filter form needs a queryset of the view)
+        with mock.patch.object(BrowsableAPIRenderer, "get_filter_form", return_value=None):
+            other = self.client.get(self.endpoint, HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(other.status_code, 200)
+        self.assertNotEqual(other["ETag"], response["ETag"])
+
+    def test_etag_is_changed_after_schedule_block_is_changed(self):
+        response = self.client.get(self.endpoint)
+        last_modified = http_date()
+        container().schedule_block_service.update_schedule_block(
+            self.user, self.schedule_block.id, course_name="Course2"
+        )
+
+        # changed in the same second, date of the change would not tell it
+        changed = self.client.get(
+            self.endpoint, HTTP_IF_NONE_MATCH=response["ETag"], HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], response["ETag"])
+        self.assertEqual(changed.data[0]["course_name"], "Course2")
+
+
+class TestScheduleBlockDetailsViewGet(TestCase):
+    def test_schedule_block_details_are_read_with_one_query_per_relation(self):
+        start = timezone.now()
+        schedule_block = ScheduleBlock.objects.create(
+            course_name="Course1", start=start, end=start + timedelta(hours=1), is_public=True
+        )
+        schedule_block.groups.add(Group.objects.create(name="Group1"))
+        for i in range(3):
+            room = Room.objects.create(name=f"Room{i}")
+            schedule_block.rooms.add(room)
+            LecturerScheduleBlockThrough.objects.create(
+                schedule_block=schedule_block,
+                lecturer=Lecturer.objects.create(first_name="Lecturer", last_name=f"{i}"),
+                room=room,
+            )
+
+        # block, lecturers (with their rooms), groups, rooms
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("schedule-block-details", args=[schedule_block.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, ScheduleBlockSerializer(schedule_block).data)
+
+
+class TestScheduleBlockListSerializer(TestCase):
+    def setUp(self):
+        caches[settings.SCHEDULE_RESPONSE_CACHE_ALIAS].clear()
+
+    def test_same_data_as_schedule_block_serializer_is_returned(self):
+        start = datetime(2023, 10, 2, 8)
+        course = Course.objects.create(name="Course1")
+        room1, room2 = Room.objects.create(name="Room1"), Room.objects.create(name="Room2")
+        schedule_block1 = ScheduleBlock.objects.create(
+            course_name="Course1", course=course, start=start, end=start + timedelta(hours=1), type="W",
+            colour="#FF00FF00",
+        )
+        schedule_block1.groups.add(Group.objects.create(name="Group2"), Group.objects.create(name="Group1"))
+        schedule_block1.rooms.add(room2, room1)
+        LecturerScheduleBlockThrough.objects.create(
+            schedule_block=schedule_block1,
+            lecturer=Lecturer.objects.create(first_name="Lecturer", last_name="2", title="dr"),
+            room=room2,
+        )
+        LecturerScheduleBlockThrough.objects.create(
+            schedule_block=schedule_block1, lecturer=Lecturer.objects.create(first_name="Lecturer", last_name="1")
+        )
+        schedule_block2 = ScheduleBlock.objects.create(
+            course_name="Course2", start=start, end=start + timedelta(hours=2), type="C"
+        )
+
+        queryset = ScheduleBlock.objects.filter(id__in=[schedule_block1.id, schedule_block2.id])
+        data = ScheduleBlockListSerializer(queryset).data
+        self.assertEqual(data, ScheduleBlockSerializer(ScheduleBlockSelector.with_details(queryset), many=True).data)
+        self.assertEqual([group["name"] for group in data[-1]["groups"]], ["Group1", "Group2"])
+        self.assertIsNone(data[-1]["lecturers"][0]["room"])
+
+    def test_list_is_read_with_one_query_per_relation(self):
+        schedule_block = ScheduleBlock.objects.create(
+            course_name="Course1", start=datetime(2023, 10, 2, 8), end=datetime(2023, 10, 2, 9), type="W"
+        )
+        # blocks, lecturers (with their rooms), groups, rooms
+        with self.assertNumQueries(4):
+            data = ScheduleBlockListSerializer(ScheduleBlock.objects.all()).data
+        self.assertEqual(data, [ScheduleBlockSerializer(schedule_block).data])
+
+    def test_compact_format_references_dictionaries_by_ids(self):
+        start = datetime(2023, 10, 2, 8)
+        course = Course.objects.create(name="Course1")
+        room = Room.objects.create(name="Room1")
+        lecturer = Lecturer.objects.create(first_name="Lecturer", last_name="1", title="dr")
+        group = Group.objects.create(name="Group1")
+        schedule_blocks = []
+        for i in range(2):
+            schedule_block = ScheduleBlock.objects.create(
+                course_name="Course1", course=course, start=start + timedelta(hours=2 * i),
+                end=start + timedelta(hours=2 * i + 1), type="W", is_public=True,
+            )
+            schedule_block.groups.add(group)
+            schedule_block.rooms.add(room)
+            LecturerScheduleBlockThrough.objects.create(schedule_block=schedule_block, lecturer=lecturer, room=room)
+            schedule_blocks.append(schedule_block)
+
+        response = Client().get(reverse("schedule-block-list") + "?format=compact")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = response.json()
+        self.assertEqual(data["lecturers"], {
+            str(lecturer.id): {"first_name": "Lecturer", "last_name": "1", "title": "dr", "contact_email": ""}
+        })
+        self.assertEqual(data["rooms"], {str(room.id): {"name": "Room1"}})
+        self.assertEqual(data["groups"], {str(group.id): {"name": "Group1"}})
+        self.assertEqual(data["courses"], {str(course.id): {"name": "Course1"}})
+        self.assertEqual(len(data["blocks"]), 2)
+        for block in data["blocks"]:
+            schedule_block = next(block_ for block_ in schedule_blocks if str(block_.id) == block["id"])
+            self.assertEqual(block["course"], str(course.id))
+            self.assertEqual(block["lecturers"], [{"lecturer": str(lecturer.id), "room": str(room.id)}])
+            self.assertEqual(block["groups"], [group.id])
+            self.assertEqual(block["rooms"], [str(room.id)])
+            self.assertEqual(block["start"], int(timezone.make_aware(schedule_block.start).timestamp()) // 60)
+            self.assertEqual(block["end"] - block["start"], 60)
+
+    def test_compact_format_is_paginated_and_cached_separately(self):
+        start = datetime(2023, 10, 2, 8)
+        for i in range(3):
+            ScheduleBlock.objects.create(
+                course_name=f"Course{i}", start=start + timedelta(hours=i), end=start + timedelta(hours=i + 1),
+                is_public=True,
+            )
+        endpoint = reverse("schedule-block-list")
+
+        response = Client().get(endpoint)
+        compact_response = Client().get(endpoint + "?format=compact")
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(len(compact_response.data["blocks"]), 3)
+        self.assertNotEqual(compact_response["ETag"], response["ETag"])
+
+        page = Client().get(endpoint + "?format=compact&page_size=2").data
+        self.assertEqual([block["course_name"] for block in page["results"]["blocks"]], ["Course0", "Course1"])
+        self.assertIsNotNone(page["next"])
+
 
 class TestExcelScheduleServiceFile(TestCase):
     def setUp(self):
@@ -310,6 +696,59 @@ class TestExcelScheduleServiceFile(TestCase):
         worksheets = self.service.get_excel_file_worksheet_list(self.path)
         self.assertEqual(worksheets, ["TEMPLATE"])
 
+    def test_can_read_worksheet_metadata(self):
+        # size of the worksheet is read from its dimension, cells are not streamed
+        with mock.patch.object(excel_reader, "iter_sheet_cells") as iter_sheet_cells:
+            metadata = self.service.get_excel_file_metadata(self.path, "TEMPLATE")
+        iter_sheet_cells.assert_not_called()
+        self.assertEqual(metadata["worksheets"], ["TEMPLATE"])
+        self.assertEqual(metadata["dimensions"], "A1:Q11")
+        self.assertEqual((metadata["max_row"], metadata["max_column"]), (11, 17))
+        self.assertNotIn("dates", metadata)
+
+        metadata = self.service.get_excel_file_metadata(self.path, "TEMPLATE", with_dates=True)
+        self.assertEqual(metadata["dates"], [date(2023, 10, 1)])
+        self.assertEqual(metadata["months"], [(2023, 10)])
+
+    def test_can_list_worksheets_of_strict_workbook(self):
+        file = BytesIO()
+        with ZipFile(self.path) as source, ZipFile(file, "w") as strict:
+            for name in source.namelist():
+                content = source.read(name)
+                if name == "xl/workbook.xml":
+                    content = content.replace(
+                        b"http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+                        b"http://purl.oclc.org/ooxml/spreadsheetml/main",
+                    ).replace(
+                        b"http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+                        b"http://purl.oclc.org/ooxml/officeDocument/relationships",
+                    )
+                strict.writestr(name, content)
+
+        metadata = self.service.get_excel_file_metadata(file, "TEMPLATE")
+        self.assertEqual(metadata["worksheets"], ["TEMPLATE"])
+        self.assertEqual(metadata["dimensions"], "A1:Q11")
+
+    def test_validate_excel_file(self):
+        self.service.validate_excel_file(self.path, "TEMPLATE", 2023, 10)
+        with self.assertRaisesMessage(ValidationError, "Arkusz nie istnieje w pliku"):
+            self.service.validate_excel_file(self.path, "WRONG", 2023, 10)
+        with self.assertRaisesMessage(ValidationError, "Brak dni w arkuszu dla podanego miesiąca"):
+            self.service.validate_excel_file(self.path, "TEMPLATE", 2023, 11)
+
+    def test_admin_form_validates_worksheet_and_month(self):
+        with open(self.path, "rb") as file:
+            content = file.read()
+        user = User.objects.create_user("test_user", "test@test.django.com")
+        data = {"creator": user.id, "name": "TEST", "status": "NEW", "worksheet_name": "TEMPLATE", "year": 2023}
+
+        form = ScheduleAdminForm(data={**data, "month": 10}, files={"file": SimpleUploadedFile("a.xlsx", content)})
+        self.assertTrue(form.is_valid(), form.errors)
+
+        form = ScheduleAdminForm(data={**data, "month": 11}, files={"file": SimpleUploadedFile("a.xlsx", content)})
+        self.assertFalse(form.is_valid())
+        self.assertIn("month", form.errors)
+
     def test_can_load_worksheet(self):
         self.assertIsInstance(self.worksheet, Worksheet)
 
@@ -347,11 +786,101 @@ class TestExcelScheduleServiceFile(TestCase):
         self.assertEqual(result["ending_cell"].coordinate, "Q11")
         self.assertEqual(len(result["groups"]), 1)
         self.assertIn({"name": "GROUP1", "start_row": 6, "end_row": 11}, result["groups"])
-        excluded_cells = [cell.coordinate for cell in result["excluded_cells"]]
+        excluded_cells = result["excluded_cells"]
         self.assertEqual(len(excluded_cells), 85)  # top 5 rows x 17 columns
         # test some cells
-        for cell in ["A1", "A2", "A3", "A4", "A5"]:
-            self.assertIn(cell, excluded_cells)
+        for row in range(1, 6):
+            self.assertIn((row, 1), excluded_cells)
+            self.assertIn((row, 17), excluded_cells)
+        self.assertNotIn((6, 1), excluded_cells)
+        self.assertIn(self.service.get_cell(self.worksheet, row=1, column=1), excluded_cells)
+
+
+class TestWorksheetSnapshot(TestCase):
+    def setUp(self):
+        self.service = ExcelScheduleService()
+        self.path = "schedule/test_cassettes/schedule_with_test_cases.xlsx"
+        self.workbook = self.service.load_workbook(self.path)
+        self.worksheet = self.service.load_worksheet(self.workbook, "TEST_CASES")
+        self.service.current_workbook = self.workbook
+        self.snapshot = self.service.get_worksheet_snapshot(self.worksheet)
+
+    def test_snapshot_is_built_once_per_worksheet(self):
+        self.assertIs(self.service.get_worksheet_snapshot(self.worksheet), self.snapshot)
+
+    def test_snapshot_matches_worksheet_cells(self):
+        sides = {BORDER_TOP: "top", BORDER_BOTTOM: "bottom", BORDER_LEFT: "left", BORDER_RIGHT: "right"}
+        for row in range(1, 20):
+            for column in range(1, 200):
+                cell = self.service.get_cell(self.worksheet, row, column)
+                self.assertEqual(self.snapshot.get_value(row, column), cell.value)
+                self.assertEqual(self.snapshot.get_colour(row, column), self.service.get_cell_colour(cell))
+                for side, name in sides.items():
+                    self.assertEqual(
+                        self.snapshot.has_border(row, column, side), bool(getattr(cell.border, name).style)
+                    )
+
+    def test_anchor_index_points_to_first_cell_with_value(self):
+        self.assertEqual(self.snapshot.find_anchor(datetime(2023, 10, 1)), (2, 5))
+        self.assertEqual(self.snapshot.find_anchor(datetime(2023, 10, 2)), (2, 22))
+        self.assertIsNone(self.snapshot.find_anchor(datetime(2024, 10, 1)))
+
+    def test_column_profile_points_to_last_bordered_row(self):
+        for column in (17, 34, 200):
+            expected = 0
+            for row in range(self.snapshot.max_row, 0, -1):
+                border = self.service.get_cell(self.worksheet, row, column).border
+                if border.top != Side() or border.bottom != Side():
+                    expected = row
+                    break
+            self.assertEqual(self.snapshot.get_last_outlined_row(column), expected)
+        self.assertEqual(self.snapshot.get_last_outlined_row(self.snapshot.max_column + 1), 0)
+
+    def test_cell_mask_ranges(self):
+        mask = CellMask()
+        mask.add_range(6, 2, 11, 3)
+        mask.add_range(6, 3, 8, 5)
+        mask.add(20, 1)
+        self.assertEqual(len(mask), 12 + 9 - 3 + 1)
+        self.assertIn((6, 2), mask)
+        self.assertIn((8, 5), mask)
+        self.assertIn((20, 1), mask)
+        self.assertNotIn((9, 5), mask)
+        self.assertNotIn((6, 1), mask)
+        self.assertNotIn((12, 2), mask)
+
+    def test_theme_colours_are_parsed_once_per_workbook(self):
+        with mock.patch.object(excel_colours, "get_theme_colors", wraps=excel_colours.get_theme_colors) as parse:
+            workbook = self.service.load_workbook(self.path)
+            colour = excel_colours.theme_and_tint_to_rgb(workbook, 2, -0.249977111117893)
+            self.assertEqual(colour, excel_colours.theme_and_tint_to_rgb(workbook, 2, -0.249977111117893))
+            excel_colours.theme_and_tint_to_rgb(workbook, 4, 0.5)
+            self.assertEqual(parse.call_count, 1)
+
+    def test_cells_outside_of_snapshot_are_empty(self):
+        self.assertIsNone(self.snapshot.get_value(0, 1))
+        self.assertEqual(self.snapshot.get_border(self.snapshot.max_row + 1, 1), 0)
+        self.assertEqual(self.snapshot.get_colour(1, self.snapshot.max_column + 1), NO_COLOUR)
+
+    def test_streamed_snapshot_matches_worksheet_snapshot(self):
+        cassettes = (
+            ("schedule/test_cassettes/schedule_with_test_cases.xlsx", "TEST_CASES"),
+            ("schedule/test_cassettes/broken_colors_schedule_block.xlsx", "Arkusz1"),
+            ("schedule/test_cassettes/no_colors_schedule_block.xlsx", "Arkusz1"),
+            ("schedule/test_cassettes/full_schedule.xlsx", "PAŹDZIERNIK"),
+        )
+        for path, worksheet_name in cassettes:
+            workbook = self.service.load_workbook(path)
+            self.service.current_workbook = workbook
+            snapshot = self.service.get_worksheet_snapshot(self.service.load_worksheet(workbook, worksheet_name))
+            self.assertEqual(read_worksheet_snapshot(path, worksheet_name), snapshot)
+
+    def test_snapshot_cell_reads_snapshot_value(self):
+        cell = self.snapshot.cell(row=2, column=5)
+        self.assertEqual(cell.coordinate, "E2")
+        self.assertEqual(cell.value, self.service.get_cell(self.worksheet, 2, 5).value)
+        self.assertIs(cell.parent, self.snapshot)
+        self.assertEqual(cell, self.snapshot.cell(row=2, column=5))
 
 
 class TestExcelScheduleServiceModuleInfo(TestCase):
@@ -720,7 +1249,301 @@ class TestExcelScheduleServiceGetSchedule(TestCase):
         self.assertIn(sb3_module_info, schedule)
 
 
+def get_modules(service: ExcelScheduleService, excel_schedule_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Modules of all days, with cells replaced by their coordinates (so results of any reader can be compared)"""
+    modules = []
+    for day_schedule_info in excel_schedule_info["schedule_days"]:
+        if "error" in day_schedule_info:
+            continue
+        day_schedule = day_schedule_info.get("schedule")
+        if day_schedule is None:
+            day_schedule = service.get_schedule_for_single_day(day_schedule_info)
+        for module in day_schedule:
+            modules.append(
+                {**module, "starting_cell": module["starting_cell"].coordinate,
+                 "ending_cell": module["ending_cell"].coordinate}
+            )
+    return modules
+
+
+class TestExcelScheduleServiceStreamingReader(TestCase):
+    def setUp(self):
+        logging.disable()
+        self.service = ExcelScheduleService()
+
+    def test_streaming_reader_finds_same_modules(self):
+        path = "schedule/test_cassettes/schedule_with_test_cases.xlsx"
+        info = self.service.init_excel_worksheet(path, "TEST_CASES", 2023, 10, reader="openpyxl")
+        streaming_service = ExcelScheduleService()
+        streamed_info = streaming_service.init_excel_worksheet(path, "TEST_CASES", 2023, 10, reader="streaming")
+
+        self.assertIsNone(streamed_info["workbook"])
+        self.assertIsInstance(streamed_info["worksheet"], WorksheetSnapshot)
+        modules = get_modules(self.service, info)
+        self.assertTrue(modules)
+        self.assertEqual(get_modules(streaming_service, streamed_info), modules)
+
+    def test_streaming_reader_raises_error_when_worksheet_does_not_exist(self):
+        with self.assertRaises(ValidationError):
+            self.service.init_excel_worksheet(
+                "schedule/test_cassettes/main_template.xlsx", "NOT_EXISTING", 2023, 10, reader="streaming"
+            )
+
+    def test_unknown_reader_raises_error(self):
+        with self.assertRaises(ValidationError):
+            self.service.init_excel_worksheet(
+                "schedule/test_cassettes/main_template.xlsx", "TEMPLATE", 2023, 10, reader="unknown"
+            )
+
+
+class TestExcelScheduleServiceParallelParse(TestCase):
+    def setUp(self):
+        logging.disable()
+        self.service = ExcelScheduleService()
+        self.path = "schedule/test_cassettes/schedule_with_test_cases.xlsx"
+
+    def test_parallel_parse_finds_same_days_and_modules(self):
+        info = self.service.init_excel_worksheet(self.path, "TEST_CASES", 2023, 10, workers=1)
+        parallel_service = ExcelScheduleService()
+        parallel_info = parallel_service.init_excel_worksheet(self.path, "TEST_CASES", 2023, 10, workers=3)
+
+        self.assertEqual(
+            [day_schedule_info["date"] for day_schedule_info in parallel_info["schedule_days"]],
+            [day_schedule_info["date"] for day_schedule_info in info["schedule_days"]],
+        )
+        self.assertEqual(get_modules(parallel_service, parallel_info), get_modules(self.service, info))
+
+    def test_parallel_parse_results_are_bound_to_worksheet(self):
+        info = self.service.init_excel_worksheet(self.path, "TEST_CASES", 2023, 10, workers=2)
+        worksheet = info["worksheet"]
+        day_schedule_info = next(day for day in info["schedule_days"] if day.get("schedule"))
+        module = day_schedule_info["schedule"][0]
+
+        self.assertIs(day_schedule_info["worksheet"], worksheet)
+        self.assertIs(
+            day_schedule_info["starting_cell"],
+            self.service.get_cell(worksheet, day_schedule_info["starting_cell"].row,
+                                  day_schedule_info["starting_cell"].column)
+        )
+        self.assertIs(
+            module["starting_cell"],
+            self.service.get_cell(worksheet, module["starting_cell"].row, module["starting_cell"].column)
+        )
+
+
+class TestExcelScheduleServiceParseCache(TestCase):
+    def setUp(self):
+        logging.disable()
+        self.service = ExcelScheduleService()
+        self.path = "schedule/test_cassettes/schedule_with_test_cases.xlsx"
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.settings = override_settings(SCHEDULE_PARSE_CACHE_DIR=self.cache_dir.name)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.cache_dir.cleanup()
+
+    def test_parsed_file_is_read_from_cache(self):
+        info = self.service.parse_excel_file(self.path, "TEST_CASES", 2023, 10)
+        with mock.patch.object(ExcelScheduleService, "init_excel_worksheet") as init_excel_worksheet:
+            cached_info = ExcelScheduleService().parse_excel_file(self.path, "TEST_CASES", 2023, 10)
+            init_excel_worksheet.assert_not_called()
+
+        self.assertIsNone(cached_info["worksheet"])
+        self.assertEqual(
+            [day_schedule_info["date"] for day_schedule_info in cached_info["schedule_days"]],
+            [day_schedule_info["date"] for day_schedule_info in info["schedule_days"]],
+        )
+        self.assertEqual(get_modules(self.service, cached_info), get_modules(self.service, info))
+
+    def test_cache_key_depends_on_file_content_and_month(self):
+        self.service.parse_excel_file(self.path, "TEST_CASES", 2023, 10)
+        with tempfile.TemporaryDirectory() as directory:
+            copied_path = shutil.copy(self.path, directory)
+            with mock.patch.object(ExcelScheduleService, "init_excel_worksheet") as init_excel_worksheet:
+                self.service.parse_excel_file(copied_path, "TEST_CASES", 2023, 10)
+                init_excel_worksheet.assert_not_called()
+
+        with self.assertRaises(ValidationError):
+            self.service.parse_excel_file(self.path, "TEST_CASES", 2023, 11)
+
+    def test_entries_not_signed_by_the_app_are_not_loaded(self):
+        directory = os.path.join(self.cache_dir.name, "cache")
+        cache = ParseCache(directory=directory, max_size=2500)
+        cache.set("key", ["value"])
+        self.assertEqual(cache.get("key"), ["value"])
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+
+        # planted pickle would run any code when loaded
+        planted = mock.MagicMock()
+        cache.get_path("key").write_bytes(zlib.compress(pickle.dumps(["planted"])))
+        with mock.patch("pickle.loads", planted):
+            self.assertIsNone(cache.get("key"))
+        planted.assert_not_called()
+        self.assertFalse(cache.get_path("key").exists())
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = ParseCache(directory=self.cache_dir.name, max_size=2500)
+        for key in ("first", "second"):
+            cache.set(key, os.urandom(1000))
+        # reading entry marks it as recently used
+        os.utime(cache.get_path("first"), (0, 0))
+        os.utime(cache.get_path("second"), (1, 1))
+        cache.get("first")
+        cache.set("third", os.urandom(1000))
+
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+
+class TestExcelScheduleServiceModuleDetectionEngines(TestCase):
+    def setUp(self):
+        logging.disable()
+        self.service = ExcelScheduleService()
+
+    def assert_engines_are_equal(self, path: str, worksheet_name: str, year: int, month: int) -> int:
+        workbook = self.service.load_workbook(path)
+        worksheet = self.service.load_worksheet(workbook, worksheet_name)
+        self.service.current_workbook = workbook
+        days = 0
+        for day in range(1, 32):
+            try:
+                walk_info = self.service.get_single_day_schedule_info(worksheet, year, month, day)
+                components_info = self.service.get_single_day_schedule_info(worksheet, year, month, day)
+            except ValidationError:
+                continue
+            self.assertEqual(
+                self.service.get_schedule_for_single_day(walk_info, engine="walk"),
+                self.service.get_schedule_for_single_day(components_info, engine="components"),
+            )
+            days += 1
+        return days
+
+    def test_engines_find_same_modules_in_test_cases(self):
+        days = self.assert_engines_are_equal(
+            "schedule/test_cassettes/schedule_with_test_cases.xlsx", "TEST_CASES", 2023, 10
+        )
+        self.assertEqual(days, 12)
+
+    def test_engines_find_same_modules_in_full_schedule(self):
+        days = self.assert_engines_are_equal("schedule/test_cassettes/full_schedule.xlsx", "PAŹDZIERNIK", 2023, 10)
+        self.assertEqual(days, 31)
+
+    @staticmethod
+    def create_snapshot(
+        slot_colours: List[List[str]], values: Dict[Any, str], borders: Dict[Any, int]
+    ) -> WorksheetSnapshot:
+        """Snapshot of slots (3 rows x 1 column) with given colours, values and borders are given by (row, column)"""
+        max_row, max_column = len(slot_colours) * 3, len(slot_colours[0])
+        palette = [NO_COLOUR]
+        colours = []
+        for row in range(max_row):
+            for column in range(max_column):
+                colour = slot_colours[row // 3][column]
+                if colour not in palette:
+                    palette.append(colour)
+                colours.append(palette.index(colour))
+        return WorksheetSnapshot(
+            title="TEST",
+            max_row=max_row,
+            max_column=max_column,
+            values=[values.get((row, column)) for row in range(1, max_row + 1) for column in range(1, max_column + 1)],
+            borders=bytearray(
+                borders.get((row, column), 0) for row in range(1, max_row + 1) for column in range(1, max_column + 1)
+            ),
+            colours=array("H", colours),
+            palette=palette,
+        )
+
+    def assert_module_ranges_are_equal(self, snapshot: WorksheetSnapshot) -> List[Tuple[int, int, int, int]]:
+        module_ranges = label_module_ranges(snapshot, CellMask(), 1, snapshot.max_row, 1, snapshot.max_column)
+        info = {"worksheet": snapshot, "ending_cell": snapshot.cell(snapshot.max_row, snapshot.max_column)}
+        walked_ranges = []
+        for start_row, start_column, _, _ in module_ranges:
+            start, end = self.service.get_module_range(info, snapshot.cell(start_row, start_column))
+            walked_ranges.append((start.row, start.column, end.row, end.column))
+        self.assertEqual(module_ranges, walked_ranges)
+        return module_ranges
+
+    def test_slots_are_compared_with_colour_of_module_start(self):
+        # module without colour is joined with slots of any colour on the right (up to the border)
+        snapshot = self.create_snapshot(
+            [[NO_COLOUR, "FFAAAAAA", "FFBBBBBB"]],
+            values={(1, 1): "Module1"},
+            borders={(1, 3): BORDER_RIGHT, (3, 1): BORDER_BOTTOM, (3, 2): BORDER_BOTTOM, (3, 3): BORDER_BOTTOM},
+        )
+        self.assertEqual(self.assert_module_ranges_are_equal(snapshot), [(1, 1, 3, 3)])
+
+        # neutral slot joins the next slot only when its colour matches module start
+        snapshot = self.create_snapshot(
+            [["FFAAAAAA"], [NEUTRAL_COLOUR], ["FFBBBBBB"]],
+            values={(1, 1): "Module1", (7, 1): "Module2"},
+            borders={(1, 1): BORDER_RIGHT, (7, 1): BORDER_RIGHT, (9, 1): BORDER_BOTTOM},
+        )
+        self.assertEqual(self.assert_module_ranges_are_equal(snapshot), [(1, 1, 6, 1), (7, 1, 9, 1)])
+
+    def test_unknown_engine_raises_error(self):
+        workbook = self.service.load_workbook("schedule/test_cassettes/main_template.xlsx")
+        worksheet = self.service.load_worksheet(workbook, "TEMPLATE")
+        self.service.current_workbook = workbook
+        info = self.service.get_single_day_schedule_info(worksheet, 2023, 10, 1)
+        with self.assertRaises(ValidationError):
+            self.service.get_schedule_for_single_day(info, engine="unknown")
+
+
+class TestBulkLogActions(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("test_user", "test@test.django.com")
+        self.rooms = [Room.objects.create(name=f"Room{i}") for i in range(5)]
+
+    def test_log_entries_are_saved_in_one_query(self):
+        ContentType.objects.get_for_model(Room)
+        with self.assertNumQueries(1):
+            with BulkLogActions():
+                for room in self.rooms:
+                    entry = django_log_action(user=self.user, obj=room, action_flag=ADDITION)
+                    self.assertIsNone(entry.pk)
+
+        entries = LogEntry.objects.filter(
+            content_type=ContentType.objects.get_for_model(Room), object_id=str(self.rooms[0].pk)
+        )
+        self.assertEqual(entries.count(), 1)
+        self.assertEqual(entries[0].get_edited_object(), self.rooms[0])
+        self.assertEqual(entries[0].get_change_message(), "Dodanie")
+
+    def test_log_entries_are_saved_in_batches(self):
+        with BulkLogActions(batch_size=2) as bulk_log:
+            for room in self.rooms:
+                django_log_action(user=self.user, obj=room, action_flag=CHANGE)
+            self.assertEqual(LogEntry.objects.count(), 4)
+            self.assertEqual(len(bulk_log.entries), 1)
+        self.assertEqual(LogEntry.objects.count(), 5)
+
+    def test_nested_contexts_use_one_buffer(self):
+        with BulkLogActions() as outer:
+            with BulkLogActions():
+                django_log_action(user=self.user, obj=self.rooms[0], action_flag=ADDITION)
+            self.assertEqual(len(outer.entries), 1)
+            self.assertEqual(LogEntry.objects.count(), 0)
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+    def test_log_entries_are_not_saved_on_error(self):
+        with self.assertRaises(ValueError):
+            with BulkLogActions():
+                django_log_action(user=self.user, obj=self.rooms[0], action_flag=ADDITION)
+                raise ValueError()
+        self.assertEqual(LogEntry.objects.count(), 0)
+        # without context entries are saved right away
+        django_log_action(user=self.user, obj=self.rooms[0], action_flag=ADDITION)
+        self.assertEqual(LogEntry.objects.count(), 1)
+
+
+@override_settings(SCHEDULE_PARSE_CACHE_DIR="")
 class TestScheduleServiceUpdate(TestCase):
+    databases = {"default", "progress"}
+
     def setUp(self):
         logging.disable()
 
@@ -749,8 +1572,132 @@ class TestScheduleServiceUpdate(TestCase):
         self.assertEqual(Lecturer.objects.count(), 125)
         self.assertEqual(Room.objects.count(), 59)
         self.assertEqual(Course.objects.count(), 352)
+        self.assertEqual(LogEntry.objects.count(), 1076 + 23 + 125 + 59 + 352)
 
-    def test_publicate_schedule(self):
+    def test_entities_are_loaded_with_one_query_per_model(self):
+        oldest_room = Room.objects.create(name="Room1")
+        Room.objects.create(name="Room1")
+
+        with self.assertNumQueries(2):
+            rooms, created_rooms = container().schedule_service.get_or_create_by_names(
+                Room, "name", ["Room1", "Room2", "Room1", "Room3", "R" * 33]
+            )
+
+        self.assertEqual(rooms["Room1"], oldest_room)
+        self.assertEqual([room.name for room in created_rooms], ["Room2", "Room3"])
+        self.assertEqual(set(rooms.keys()), {"Room1", "Room2", "Room3"})
+        self.assertEqual(Room.objects.count(), 4)
+
+    def test_resolve_schedule_entities(self):
+        user = User.objects.create_user("test_user", "test@test.django.com")
+        existing_course = Course.objects.create(name="test")
+        schedule_days = [
+            {"date": date(2023, 10, 1), "error": "Brak daty w arkuszu"},
+            {
+                "date": date(2023, 10, 2),
+                "schedule": [
+                    {
+                        "name": "test",
+                        "groups": ["Group1", "Group2"],
+                        "rooms": ["Room1"],
+                        "lecturers": [{"name": "Lecturer1", "room": "Room2"}],
+                    },
+                    {
+                        "name": "test (L)",
+                        "groups": ["Group1"],
+                        "rooms": [],
+                        "lecturers": [{"name": "Lecturer1", "room": "Room1"}],
+                    },
+                ],
+            },
+        ]
+
+        entities = container().schedule_service.resolve_schedule_entities(user, schedule_days)
+
+        self.assertEqual(entities.courses["test"], existing_course)
+        self.assertEqual([course.name for course in entities.created_courses], ["test (L)"])
+        self.assertEqual([group.name for group in entities.created_groups], ["Group1", "Group2"])
+        self.assertEqual([room.name for room in entities.created_rooms], ["Room1", "Room2"])
+        self.assertEqual([lecturer.last_name for lecturer in entities.created_lecturers], ["Lecturer1"])
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Lecturer.objects.get().last_name, "Lecturer1")
+
+    @override_settings(SCHEDULE_IMPORT_BATCH_SIZE=2)
+    def test_blocks_are_saved_in_batches_and_wrong_blocks_are_reported_by_cells(self):
+        service = container().schedule_service
+        user = User.objects.create_user("test_user", "test@test.django.com")
+        entities = ScheduleEntities(
+            courses={"Course1": Course.objects.create(name="Course1")},
+            groups={"Group1": Group.objects.create(name="Group1")},
+            rooms={"Room1": Room.objects.create(name="Room1")},
+            lecturers={"Lecturer1": Lecturer.objects.create(last_name="Lecturer1")},
+        )
+        start = datetime(2023, 10, 2, 8)
+        modules = [
+            {
+                "name": "Course1",
+                "type": module_type,
+                "start": start,
+                "end": start + timedelta(hours=1),
+                "colour": "#00FFFFFF",
+                "groups": ["Group1"],
+                "rooms": ["Room1", "Room1"],
+                "lecturers": [{"name": "Lecturer1", "room": "Room1"}],
+                "starting_cell": CachedCell(row, 2),
+                "ending_cell": CachedCell(row + 2, 3),
+            }
+            for row, module_type in ((3, "W"), (6, "W" * 33), (9, "L"))
+        ]
+        result = {"added_blocks": [], "errors": []}
+
+        service.create_schedule_blocks(
+            user, [service.build_schedule_block(module, entities) for module in modules], result
+        )
+
+        self.assertEqual([block.type for block in result["added_blocks"]], ["W", "L"])
+        self.assertEqual(result["errors"], ["B6:C8 Nieznany błąd"])
+        self.assertEqual(ScheduleBlock.objects.count(), 2)
+        for schedule_block in ScheduleBlock.objects.all():
+            self.assertEqual(list(schedule_block.groups.all()), [entities.groups["Group1"]])
+            self.assertEqual(list(schedule_block.rooms.all()), [entities.rooms["Room1"]])
+            self.assertEqual(list(schedule_block.lecturers.all()), [entities.lecturers["Lecturer1"]])
+
+    def test_replaced_blocks_are_found_with_one_query(self):
+        group1 = Group.objects.create(name="Group1")
+        group2 = Group.objects.create(name="Group2")
+        other_group = Group.objects.create(name="Group3")
+
+        def create_block(start: datetime, groups: List[Group], is_public: bool = True) -> ScheduleBlock:
+            schedule_block = ScheduleBlock.objects.create(
+                course_name="Course1", start=start, end=start + timedelta(hours=1), is_public=is_public
+            )
+            schedule_block.groups.set(groups)
+            return schedule_block
+
+        replaced_blocks = [
+            create_block(datetime(2023, 10, 2, 8), [group1, group2]),
+            create_block(datetime(2023, 10, 3, 0), [group2]),
+        ]
+        create_block(datetime(2023, 10, 2, 10), [group1], is_public=False)
+        create_block(datetime(2023, 10, 2, 12), [other_group])
+        create_block(datetime(2023, 10, 3, 8), [group1])
+        create_block(datetime(2023, 10, 4, 8), [group1, group2])
+        create_block(datetime(2023, 10, 5, 8), [group1])
+        schedule_days = [
+            {"date": date(2023, 10, 2), "groups": [{"name": "Group1"}, {"name": "Group2"}]},
+            {"date": date(2023, 10, 3), "groups": [{"name": "Group2"}]},
+            {"date": date(2023, 10, 4), "groups": []},
+            {"date": date(2023, 10, 5), "error": "Brak daty w arkuszu"},
+        ]
+
+        with self.assertNumQueries(1):
+            result = container().schedule_service.get_replaced_schedule_blocks(schedule_days)
+
+        self.assertEqual(sorted(block.id for block in result), sorted(block.id for block in replaced_blocks))
+        with self.assertNumQueries(0):
+            self.assertEqual(container().schedule_service.get_replaced_schedule_blocks(schedule_days[2:]), [])
+
+    def create_schedule_revision(self, status: str) -> Schedule:
         schedule = Schedule.objects.create(
             creator=User.objects.create_user("test_user", "test@test.django.com"),
             name="TEST",
@@ -758,72 +1705,256 @@ class TestScheduleServiceUpdate(TestCase):
             year=2023,
             month=10,
             worksheet_name="PAŹDZIERNIK",
-            status="FINISHED",
+            status=status,
         )
 
         start = timezone.now()
         end = start + timedelta(hours=1)
-        schedule_block = ScheduleBlock.objects.create(course_name="Course1", start=start, end=end, is_public=False)
-        room = Room.objects.create(name="Room1", is_public=False)
-        course = Course.objects.create(name="Course1", is_public=False)
-        group = Group.objects.create(name="Group1", is_public=False)
-        lecturer = Lecturer.objects.create(first_name="Lecturer", last_name="1", is_public=False)
-
+        self.replaced_block = ScheduleBlock.objects.create(course_name="Course0", start=start, end=end, is_public=True)
+        schedule_block = ScheduleBlock.objects.create(course_name="Course1", start=start, end=end, revision=schedule)
+        schedule.replaced_schedule_blocks.add(self.replaced_block)
         schedule.schedule_blocks.add(schedule_block)
-        schedule.rooms.add(room)
-        schedule.courses.add(course)
-        schedule.groups.add(group)
-        schedule.lecturers.add(lecturer)
+        schedule.rooms.add(Room.objects.create(name="Room1"))
+        schedule.courses.add(Course.objects.create(name="Course1"))
+        schedule.groups.add(Group.objects.create(name="Group1"))
+        schedule.lecturers.add(Lecturer.objects.create(first_name="Lecturer", last_name="1"))
+        return schedule
+
+    def assertScheduleIsPublic(self, schedule: Schedule, is_public: bool) -> None:
+        self.assertEqual(
+            list(ScheduleBlockSelector.publicated()),
+            list(schedule.schedule_blocks.all()) if is_public else [self.replaced_block],
+        )
+        self.assertEqual(GroupSelector.publicated().exists(), is_public)
+        self.assertEqual(LecturerSelector.publicated().exists(), is_public)
+        self.assertEqual(RoomSelector.publicated().exists(), is_public)
+        self.assertEqual(CourseSelector.publicated().exists(), is_public)
 
-        self.assertFalse(ScheduleBlock.objects.filter(is_public=True).exists())
-        self.assertFalse(Group.objects.filter(is_public=True).exists())
-        self.assertFalse(Lecturer.objects.filter(is_public=True).exists())
-        self.assertFalse(Room.objects.filter(is_public=True).exists())
-        self.assertFalse(Course.objects.filter(is_public=True).exists())
+    def test_publicate_schedule(self):
+        schedule = self.create_schedule_revision(status="FINISHED")
+        self.assertScheduleIsPublic(schedule, False)
 
-        container().schedule_service.publicate_schedule(schedule)
+        # small writes (publication and data version), whatever the size of the schedule (and test savepoints)
+        with self.assertNumQueries(8):
+            container().schedule_service.publicate_schedule(schedule)
 
-        self.assertTrue(ScheduleBlock.objects.filter(is_public=True).exists())
-        self.assertTrue(Group.objects.filter(is_public=True).exists())
-        self.assertTrue(Lecturer.objects.filter(is_public=True).exists())
-        self.assertTrue(Room.objects.filter(is_public=True).exists())
-        self.assertTrue(Course.objects.filter(is_public=True).exists())
+        self.assertEqual(schedule.status, "PUBLICATED")
+        self.assertTrue(SchedulePublication.objects.filter(schedule=schedule).exists())
+        self.assertScheduleIsPublic(schedule, True)
 
     def test_revert_schedule_publication(self):
+        schedule = self.create_schedule_revision(status="PUBLICATED")
+        SchedulePublication.objects.create(schedule=schedule)
+        self.assertScheduleIsPublic(schedule, True)
+
+        container().schedule_service.revert_schedule_publication(schedule)
+
+        self.assertEqual(schedule.status, "REVERTED")
+        self.assertFalse(SchedulePublication.objects.exists())
+        self.assertScheduleIsPublic(schedule, False)
+
+    def test_blocks_of_published_schedule_can_be_replaced_by_next_schedule(self):
+        schedule = self.create_schedule_revision(status="FINISHED")
+        container().schedule_service.publicate_schedule(schedule)
+        schedule_block = schedule.schedule_blocks.get()
+        next_schedule = Schedule.objects.create(
+            creator=schedule.creator, name="TEST2", file=schedule.file, year=2023, month=10, status="FINISHED"
+        )
+        next_block = ScheduleBlock.objects.create(
+            course_name="Course2", start=schedule_block.start, end=schedule_block.end, revision=next_schedule
+        )
+        next_schedule.replaced_schedule_blocks.add(schedule_block)
+
+        container().schedule_service.publicate_schedule(next_schedule)
+        self.assertEqual(list(ScheduleBlockSelector.publicated()), [next_block])
+
+        container().schedule_service.revert_schedule_publication(next_schedule)
+        self.assertEqual(list(ScheduleBlockSelector.publicated()), [schedule_block])
+
+    def test_blocks_of_previous_import_are_not_published(self):
         schedule = Schedule.objects.create(
             creator=User.objects.create_user("test_user", "test@test.django.com"),
             name="TEST",
-            file="schedule/test_cassettes/full_schedule.xlsx",
+            file="schedule/test_cassettes/schedule_with_test_cases.xlsx",
             year=2023,
             month=10,
-            worksheet_name="PAŹDZIERNIK",
-            status="PUBLICATED",
+            worksheet_name="TEST_CASES",
         )
+        container().schedule_service.update_schedule_from_excel(schedule)
+        container().schedule_service.update_schedule_from_excel(schedule)
+        container().schedule_service.publicate_schedule(schedule)
 
-        start = timezone.now()
-        end = start + timedelta(hours=1)
-        schedule_block = ScheduleBlock.objects.create(course_name="Course1", start=start, end=end, is_public=True)
-        room = Room.objects.create(name="Room1", is_public=True)
-        course = Course.objects.create(name="Course1", is_public=True)
-        group = Group.objects.create(name="Group1", is_public=True)
-        lecturer = Lecturer.objects.create(first_name="Lecturer", last_name="1", is_public=True)
+        self.assertTrue(schedule.schedule_blocks.exists())
+        self.assertEqual(
+            sorted(ScheduleBlockSelector.publicated().values_list("id", flat=True)),
+            sorted(schedule.schedule_blocks.values_list("id", flat=True)),
+        )
 
-        schedule.schedule_blocks.add(schedule_block)
-        schedule.rooms.add(room)
-        schedule.courses.add(course)
-        schedule.groups.add(group)
-        schedule.lecturers.add(lecturer)
+    def test_published_schedule_can_not_be_deleted(self):
+        schedule = self.create_schedule_revision(status="FINISHED")
+        container().schedule_service.publicate_schedule(schedule)
+
+        with self.assertRaises(ProtectedError):
+            schedule.delete()
+        self.assertScheduleIsPublic(schedule, True)
+
+        container().schedule_service.revert_schedule_publication(schedule)
+        schedule.delete()
+        self.assertEqual(list(ScheduleBlockSelector.publicated()), [self.replaced_block])
+
+
+@override_settings(SCHEDULE_PARSE_CACHE_DIR="")
+class TestScheduleImportJobs(TransactionTestCase):
+    databases = {"default", "progress"}
+
+    def setUp(self):
+        logging.disable()
+        self.service = container().schedule_import_job_service
+        self.user = User.objects.create_user("test_user", "test@test.django.com")
+
+    def create_schedule(self, worksheet_name: str = "TEST_CASES") -> Schedule:
+        return Schedule.objects.create(
+            creator=self.user,
+            name="TEST",
+            file="schedule/test_cassettes/schedule_with_test_cases.xlsx",
+            year=2023,
+            month=10,
+            worksheet_name=worksheet_name,
+        )
+
+    def test_enqueue_schedule_import(self):
+        schedule = self.create_schedule()
+        job = self.service.enqueue_schedule_import(schedule)
+
+        schedule.refresh_from_db()
+        self.assertEqual(job.status, "QUEUED")
+        self.assertEqual(schedule.status, "QUEUED")
+        with self.assertRaises(ValidationError):
+            self.service.enqueue_schedule_import(schedule)
+
+    def test_published_schedule_can_not_be_imported_again(self):
+        schedule = self.create_schedule()
+        self.service.enqueue_schedule_import(schedule)
+        self.service.run_next_schedule_import_job("worker")
+        schedule.refresh_from_db()
+        container().schedule_service.publicate_schedule(schedule)
+        published_blocks = list(ScheduleBlockSelector.publicated().values_list("id", flat=True))
+
+        with self.assertRaises(ValidationError):
+            self.service.enqueue_schedule_import(schedule)
+        admin_user = User.objects.create_superuser("admin", "admin@test.django.com", "password")
+        client = Client()
+        client.force_login(admin_user)
+        response = client.get(reverse("admin:schedule-init-excel", args=[schedule.id]))
 
-        self.assertTrue(ScheduleBlock.objects.filter(is_public=True).exists())
-        self.assertTrue(Group.objects.filter(is_public=True).exists())
-        self.assertTrue(Lecturer.objects.filter(is_public=True).exists())
-        self.assertTrue(Room.objects.filter(is_public=True).exists())
-        self.assertTrue(Course.objects.filter(is_public=True).exists())
+        schedule.refresh_from_db()
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(schedule.status, "PUBLICATED")
+        self.assertEqual(schedule.import_jobs.count(), 1)
+        self.assertEqual(list(ScheduleBlockSelector.publicated().values_list("id", flat=True)), published_blocks)
 
         container().schedule_service.revert_schedule_publication(schedule)
+        self.assertEqual(self.service.enqueue_schedule_import(schedule).status, "QUEUED")
+
+    def test_jobs_locked_by_other_workers_are_skipped(self):
+        first_job = self.service.enqueue_schedule_import(self.create_schedule())
+        second_job = self.service.enqueue_schedule_import(self.create_schedule())
+
+        # other worker is claiming the first job at the moment
+        with transaction.atomic(using="progress"):
+            ScheduleImportJob.objects.using("progress").select_for_update().get(id=first_job.id)
+            claimed_job = self.service.claim_schedule_import_job("worker")
+            self.assertEqual(claimed_job, second_job)
+            self.assertIsNone(self.service.claim_schedule_import_job("worker"))
+
+        claimed_job.refresh_from_db()
+        self.assertEqual(claimed_job.status, "RUNNING")
+        self.assertEqual(claimed_job.worker, "worker")
+        self.assertEqual(self.service.claim_schedule_import_job("worker"), first_job)
+
+    @override_settings(SCHEDULE_IMPORT_JOB_TIMEOUT=60)
+    def test_jobs_left_running_by_dead_workers_are_failed(self):
+        schedule = self.create_schedule()
+        job = self.service.enqueue_schedule_import(schedule)
+        self.assertEqual(self.service.claim_schedule_import_job("worker"), job)
+        with self.assertRaises(ValidationError):
+            self.service.enqueue_schedule_import(schedule)
+
+        # worker was killed in the middle of the import
+        ScheduleImportJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(seconds=61))
+        new_job = self.service.enqueue_schedule_import(schedule)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertIn("przerwany", job.error)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(new_job.status, "QUEUED")
+        self.assertEqual(self.service.claim_schedule_import_job("worker"), new_job)
+
+    def test_progress_is_visible_during_import(self):
+        schedule = self.create_schedule()
+        self.service.enqueue_schedule_import(schedule)
+        schedule_service = self.service.schedule_service
+        seen_statuses = []
+
+        def resolve_schedule_entities(*args: Any) -> ScheduleEntities:
+            # read with other connection, while import transaction is still open
+            seen_statuses.append(Schedule.objects.using("progress").get(id=schedule.id).status)
+            return ScheduleService.resolve_schedule_entities(schedule_service, *args)
+
+        with mock.patch.object(schedule_service, "resolve_schedule_entities", resolve_schedule_entities):
+            job = self.service.run_next_schedule_import_job("worker")
+
+        schedule.refresh_from_db()
+        self.assertEqual(seen_statuses, ["ONGOING"])
+        self.assertEqual(job.status, "FINISHED")
+        self.assertEqual(schedule.status, "FINISHED")
+        self.assertEqual(schedule.progress, 100)
+        self.assertTrue(schedule.schedule_blocks.exists())
+
+    def test_failed_import_is_reported(self):
+        schedule = self.create_schedule(worksheet_name="NOT_EXISTING")
+        self.service.enqueue_schedule_import(schedule)
+
+        job = self.service.run_next_schedule_import_job("worker")
+
+        schedule.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertIn("Arkusz nie istnieje w pliku", job.error)
+        self.assertEqual(schedule.status, "FAILED")
+        self.assertFalse(ScheduleBlock.objects.exists())
+
+    def test_worker_command_runs_queued_jobs(self):
+        schedules = [self.create_schedule(), self.create_schedule(worksheet_name="NOT_EXISTING")]
+        for schedule in schedules:
+            self.service.enqueue_schedule_import(schedule)
+
+        call_command("run_schedule_import_worker", "--once", stdout=StringIO())
+
+        self.assertEqual(
+            sorted(ScheduleImportJob.objects.values_list("status", flat=True)), ["FAILED", "FINISHED"]
+        )
+
+    def test_admin_action_queues_import(self):
+        schedule = self.create_schedule()
+        admin_user = User.objects.create_superuser("admin", "admin@test.django.com", "password")
+        client = Client()
+        client.force_login(admin_user)
+
+        response = client.get(reverse("admin:schedule-init-excel", args=[schedule.id]))
 
-        self.assertFalse(ScheduleBlock.objects.filter(is_public=True).exists())
-        self.assertFalse(Group.objects.filter(is_public=True).exists())
-        self.assertFalse(Lecturer.objects.filter(is_public=True).exists())
-        self.assertFalse(Room.objects.filter(is_public=True).exists())
-        self.assertFalse(Course.objects.filter(is_public=True).exists())
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(schedule.import_jobs.get().status, "QUEUED")
+        self.assertFalse(ScheduleBlock.objects.exists())
+
+
+class TestBenchmarkScheduleQueriesCommand(TestCase):
+    def test_benchmark_command_does_not_leave_generated_data(self):
+        out = StringIO()
+        call_command(
+            "benchmark_schedule_queries", semesters=1, groups=1, blocks_per_day=1, repeat=1, no_plans=True, stdout=out
+        )
+        self.assertIn("half-open datetime ranges", out.getvalue())
+        self.assertIn("ScheduleBlockListSerializer", out.getvalue())
+        self.assertFalse(ScheduleBlock.objects.exists())
+        self.assertFalse(Schedule.objects.exists())
@@ -1,36 +1,88 @@
-from typing import Union, Type
+from typing import Union, Type, Dict, Any, Sequence
 from uuid import UUID
 
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.settings import api_settings
 from rest_framework.request import Request
 from rest_framework.response import Response
 
 from common.container import container
+from common.serializers import get_requested_fields, SparseFieldsQuerySerializer
+from schedule.pagination import ScheduleBlockCursorPagination, PAGINATION_QUERY_PARAMS
+from schedule.renderers import CompactJSONRenderer, COMPACT_FORMAT
+from schedule.response_cache import (
+    get_cached_response_data, normalize_query, SCHEDULE_DATA, conditional_on_data_version, get_request_data_version,
+)
+from schedule.models import ScheduleBlock
 from schedule.selectors import ScheduleBlockSelector
-from schedule.serializers import ScheduleBlockSerializer, ScheduleBlockCreateSerializer, ScheduleFilterQuerySerializer
+from schedule.serializers import (
+    ScheduleBlockSerializer, ScheduleBlockCreateSerializer, ScheduleFilterQuerySerializer,
+    ScheduleBlockPageQuerySerializer, ScheduleBlockListSerializer, ScheduleBlockCompactListSerializer,
+    ScheduleBlockFormatQuerySerializer,
+)
 
 
 class ScheduleBlockListView(GenericAPIView):
     serializer_class = ScheduleBlockSerializer
     create_serializer_class = ScheduleBlockCreateSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    pagination_class = ScheduleBlockCursorPagination
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, CompactJSONRenderer]
 
     def get_serializer_class(self) -> Union[Type[ScheduleBlockSerializer], Type[ScheduleBlockCreateSerializer]]:
         if self.request.method == "POST":
             return self.create_serializer_class
         return self.serializer_class
 
-    @extend_schema(parameters=[ScheduleFilterQuerySerializer, ])
+    @extend_schema(
+        parameters=[
+            ScheduleFilterQuerySerializer, ScheduleBlockPageQuerySerializer, ScheduleBlockFormatQuerySerializer,
+            SparseFieldsQuerySerializer,
+        ]
+    )
+    @conditional_on_data_version(SCHEDULE_DATA)
     def get(self, request: Request) -> Response:
-        """Returns list of schedule blocks"""
+        """
+        Returns list of schedule blocks (paginated by cursor when `cursor` or `page_size` is given).
+        With `format=compact` lecturers, rooms, groups and courses are returned once and referenced by blocks.
+        With `fields` / `exclude` only requested fields (and relations) of blocks are read and returned.
+        """
         query = ScheduleFilterQuerySerializer(data=request.query_params)
         query.is_valid(raise_exception=True)
-
-        result = ScheduleBlockSelector.filtered(**query.validated_data)
-        return Response(self.get_serializer(result, many=True).data, status=status.HTTP_200_OK)
+        fields = get_requested_fields(request.query_params, ScheduleBlockListSerializer.fields)
+
+        # same responses are served to everyone, so they are cached until published schedule is changed
+        cache_query = {
+            "url": request.build_absolute_uri("/"),
+            "filters": normalize_query(query.validated_data),
+            "page": normalize_query({param: request.query_params.get(param) for param in PAGINATION_QUERY_PARAMS}),
+            "format": request.accepted_renderer.format,
+            "fields": fields,
+        }
+        version = get_request_data_version(request, SCHEDULE_DATA)
+        data = get_cached_response_data(
+            SCHEDULE_DATA, cache_query, lambda: self.get_list_data(query.validated_data, fields), version=version
+        )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def get_list_serializer_class(
+        self
+    ) -> Union[Type[ScheduleBlockListSerializer], Type[ScheduleBlockCompactListSerializer]]:
+        if self.request.accepted_renderer.format == COMPACT_FORMAT:
+            return ScheduleBlockCompactListSerializer
+        return ScheduleBlockListSerializer
+
+    def get_list_data(self, filters: Dict[str, Any], fields: Sequence[str]) -> Any:
+        # lists are read as flat rows by `ScheduleBlockListSerializer` (same data as `serializer_class`)
+        list_serializer_class = self.get_list_serializer_class()
+        result = ScheduleBlockSelector.filtered(**filters)
+        if (page := self.paginate_queryset(result.only("id", "start"))) is not None:
+            page_blocks = ScheduleBlock.objects.filter(id__in=[block.id for block in page]).order_by("start", "id")
+            return self.get_paginated_response(list_serializer_class(page_blocks, fields).data).data
+        return list_serializer_class(result, fields).data
 
     def post(self, request: Request) -> Response:
         """Creates single schedule block"""
@@ -55,7 +107,7 @@ class ScheduleBlockDetailsView(GenericAPIView):
 
     def get(self, request: Request, schedule_block_id: UUID) -> Response:
         """Returns single schedule block details"""
-        result = ScheduleBlockSelector.get_by_id(schedule_block_id)
+        result = ScheduleBlockSelector.get_by_id_with_details(schedule_block_id)
         return Response(self.get_serializer(result).data, status=status.HTTP_200_OK)
 
     def put(self, request: Request, schedule_block_id: UUID) -> Response:
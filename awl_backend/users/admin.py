@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group as BaseGroup
+from schedule.response_cache import BumpDataVersionAdminMixin, SCHEDULE_DATA, GROUPS_DATA
 from .models import User, Group
 
 admin.site.unregister(BaseGroup)
@@ -20,5 +21,6 @@ class UserAdmin(BaseUserAdmin):
 
 
 @admin.register(Group)
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(BumpDataVersionAdminMixin, admin.ModelAdmin):
     list_display = ("name",)
+    data_versions = (SCHEDULE_DATA, GROUPS_DATA)
@@ -1,6 +1,6 @@
 from uuid import UUID
 
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Q
 
 from users.models import Group
 
@@ -20,7 +20,9 @@ class GroupSelector:
 
     @classmethod
     def publicated(cls) -> QuerySet[Group]:
-        return cls.all().filter(is_public=True)
+        # groups added by the schedule are visible while the schedule is published
+        published = Group.objects.filter(schedules__publication__isnull=False).values("id")
+        return cls.all().filter(Q(is_public=True) | Q(id__in=published))
 
     @staticmethod
     def get_by_id(pk: int) -> Group:
@@ -1,6 +1,7 @@
 from users.models import Group
 from rest_framework import serializers
 
+from common.serializers import SparseFieldsSerializerMixin
 from users.models import User
 
 
@@ -22,7 +23,7 @@ class UserDetailsSerializer(serializers.ModelSerializer):
         )
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = (
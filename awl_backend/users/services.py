@@ -6,6 +6,7 @@ from django.db import transaction
 
 from common.utils import django_log_action
 from common.validators import validate_user_permission
+from schedule.response_cache import bump_data_version, SCHEDULE_DATA, GROUPS_DATA
 from users.models import User, Group
 from users.selectors import GroupSelector
 
@@ -41,6 +42,7 @@ class GroupService:
         group.save()
 
         django_log_action(user=user, obj=group, action_flag=ADDITION)
+        bump_data_version(GROUPS_DATA)
         return group
 
     @staticmethod
@@ -57,6 +59,7 @@ class GroupService:
         if changed:
             change_message = [{"changed": {"fields": changed}}]
             django_log_action(user=user, obj=group, action_flag=CHANGE, change_message=change_message)
+        bump_data_version(SCHEDULE_DATA, GROUPS_DATA)
         return group
 
     @staticmethod
@@ -65,4 +68,5 @@ class GroupService:
         group = GroupSelector.get_by_id(group_id)
         validate_user_permission(user, group.DELETE_PERMISSION_CODENAME, raise_error=True)
         group.delete()
+        bump_data_version(SCHEDULE_DATA, GROUPS_DATA)
         return None
@@ -29,3 +29,10 @@ class TestGroupListViewGet(TestCase):
         self.assertEqual(len(response.data), 1)
         self.assertIn(GroupSerializer(group1).data, response.data)
         self.assertNotIn(GroupSerializer(group2).data, response.data)
+
+    def test_only_requested_fields_are_returned(self):
+        Group.objects.create(name="Group1", is_public=True)
+
+        response = self.client.get(self.endpoint + "?fields=name")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [{"name": "Group1"}])
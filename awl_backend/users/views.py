@@ -1,3 +1,4 @@
+from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
@@ -5,6 +6,8 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from common.container import container
+from common.serializers import get_requested_fields, SparseFieldsQuerySerializer
+from schedule.response_cache import conditional_on_data_version, GROUPS_DATA
 from users.selectors import GroupSelector
 from users.serializers import UserDetailsSerializer, GroupSerializer
 
@@ -38,10 +41,13 @@ class GroupListView(GenericAPIView):
     serializer_class = GroupSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    @extend_schema(parameters=[SparseFieldsQuerySerializer])
+    @conditional_on_data_version(GROUPS_DATA)
     def get(self, request: Request) -> Response:
-        """Returns all groups"""
-        groups = GroupSelector.publicated().order_by("name")
-        return Response(self.get_serializer(groups, many=True).data, status=status.HTTP_200_OK)
+        """Returns all groups (only `fields` / `exclude` requested fields are read and returned)"""
+        fields = get_requested_fields(request.query_params, self.serializer_class.Meta.fields)
+        groups = GroupSelector.publicated().only(*fields).order_by("name")
+        return Response(self.get_serializer(groups, many=True, fields=fields).data, status=status.HTTP_200_OK)
 
     def post(self, request: Request) -> Response:
         """Creates new group"""